@@ -0,0 +1,103 @@
+﻿from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# each benchmark returns (label, seconds) pairs: the baseline first, then the faster path
+Timings = List[Tuple[str, float]]
+BENCHMARKS: Dict[str, Callable[[], Timings]] = {}
+
+
+def benchmark(func: Callable[[], Timings]) -> Callable[[], Timings]:
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _timed(func: Callable[[], object], repeat: int = 1) -> float:
+    """Best wall time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@benchmark
+def batch_metrics() -> Timings:
+    """compute_metrics per equity curve vs compute_metrics_batch over 300 ragged runs of 2000 bars."""
+    from src.backtest.metrics import METRIC_FIELDS, compute_metrics, compute_metrics_batch
+
+    rng = np.random.default_rng(1)
+    runs, bars = 300, 2000
+    equity = np.full((bars, runs), np.nan)
+    for j in range(runs):
+        start = int(rng.integers(0, bars // 3))
+        stop = int(rng.integers(start + 2, bars + 1))
+        equity[start:stop, j] = 1000 * np.cumprod(1 + rng.normal(0.0005, 0.01, stop - start))
+    run = rng.integers(0, runs, 5 * runs)
+    trades = pd.DataFrame({"run": run, "PnL": rng.normal(1.0, 10.0, len(run))})
+
+    def per_curve() -> None:
+        for j in range(runs):
+            metrics = compute_metrics(pd.Series(equity[:, j]).dropna(), trades[trades["run"] == j])
+            [getattr(metrics, name) for name in METRIC_FIELDS]
+
+    return [
+        ("per-curve loop", _timed(per_curve)),
+        ("batch", _timed(lambda: compute_metrics_batch(equity, trades), repeat=3)),
+    ]
+
+
+@benchmark
+def online_model_scoring() -> Timings:
+    """One-row OnlineModel.predict_proba on a frame vs predict_up on a preallocated array."""
+    from src.ml.online_model import OnlineModel
+
+    columns = ["sma_10", "rsi", "atr", "roc"]
+    rng = np.random.default_rng(1)
+    model = OnlineModel(feature_cols=columns)
+    for _ in range(5):
+        X = pd.DataFrame(rng.normal([100, 50, 2, 0], [10, 15, 0.5, 1], (64, 4)), columns=columns)
+        model.partial_fit_on_barclose(X, (X["roc"] + rng.normal(0, 1, 64) > 0).astype(float).to_numpy())
+    frame = pd.DataFrame(rng.normal(size=(1, 4)), columns=columns)
+    row = frame.to_numpy()
+    out = np.empty(1)
+    calls = 300
+
+    def loop(func: Callable[[], object]) -> Callable[[], None]:
+        return lambda: [func() for _ in range(calls)]
+
+    # per call, so the ms column reads as latency of one score
+    return [
+        ("predict_proba", _timed(loop(lambda: model.predict_proba(frame)), repeat=3) / calls),
+        ("predict_up", _timed(loop(lambda: model.predict_up(row, out=out)), repeat=3) / calls),
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the fast paths against the code they replace")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, from {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.names) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        timings = BENCHMARKS[name]()
+        baseline = timings[0][1]
+        print(name)
+        for label, seconds in timings:
+            print(f"  {label:<24} {seconds * 1e3:10.3f} ms  {baseline / seconds:6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
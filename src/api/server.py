@@ -10,27 +10,32 @@ from ..state.store import compute_equity_metrics, load_status
 
 app = FastAPI(title="TradeIt Bot API")
 
+
 @app.get("/health")
 def health() -> Dict[str, str]:
-return {"status": "ok"}
+    return {"status": "ok"}
+
 
 @app.get("/config")
 def config_view() -> Dict[str, object]:
-settings = get_settings()
-return asdict(settings)
+    settings = get_settings()
+    return asdict(settings)
+
 
 @app.get("/status")
 def status() -> Dict[str, object]:
-settings = get_settings()
-default_mode = "paper" if (settings.binance_testnet or not settings.binance_api_key) else "live"
-payload = load_status(default_mode=default_mode)
-payload.setdefault("mode", default_mode)
-payload.setdefault("paused", False)
-return payload
+    settings = get_settings()
+    default_mode = "paper" if (settings.binance_testnet or not settings.binance_api_key) else "live"
+    payload = load_status(default_mode=default_mode)
+    payload.setdefault("mode", default_mode)
+    payload.setdefault("paused", False)
+    return payload
+
 
 @app.get("/metrics")
 def metrics() -> Dict[str, float]:
-equity = compute_equity_metrics()
-return {"sharpe": equity.sharpe, "max_drawdown": equity.max_drawdown}
+    # served from the bot's running accumulator, not a rescan of equity.csv
+    return asdict(compute_equity_metrics())
+
 
-all = ["app"]
+__all__ = ["app"]
@@ -0,0 +1,187 @@
+﻿from __future__ import annotations
+
+import csv
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.columnar_store import ColumnarCandleStore, ColumnarMarketDataService
+from ..data.market_data import OHLCV_COLUMNS
+from ..data.panel_features import compute_features_many
+from .engine import prepare_strategies
+from .result_cache import BacktestResultCache, result_key
+from .vectorized import VectorizedBacktestEngine
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = [
+    "symbol",
+    "timeframe",
+    "strategy",
+    "bars",
+    "Equity Final",
+    "CAGR",
+    "Sharpe",
+    "Sortino",
+    "Max Drawdown",
+    "Win Rate",
+    "Profit Factor",
+    "Trades",
+    "seconds",
+    "cached",
+    "error",
+]
+
+# per-process reader over the shared candle files and result cache, opened once by the pool initializer
+_WORKER_SERVICE: Optional[ColumnarMarketDataService] = None
+_WORKER_CACHE: Optional[BacktestResultCache] = None
+
+
+@dataclass(frozen=True)
+class BacktestJob:
+    symbol: str
+    timeframe: str
+    strategy: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
+def stage_candles(
+    service,
+    symbols: Iterable[str],
+    timeframes: Iterable[str],
+    root: Path,
+    start=None,
+    end=None,
+) -> ColumnarCandleStore:
+    """Copy candles into column files under ``root`` so workers can memory-map them."""
+    store = ColumnarCandleStore(Path(root))
+    for timeframe in timeframes:
+        for symbol in symbols:
+            df = service.fetch_range(symbol, timeframe, start=start, end=end)
+            if df.empty:
+                continue
+            ts_ns = pd.DatetimeIndex(df.index).asi8
+            store.append(symbol, timeframe, ts_ns, df[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+    return store
+
+
+def _init_worker(root: str, cache_dir: Optional[str] = None) -> None:
+    global _WORKER_SERVICE, _WORKER_CACHE
+    _WORKER_SERVICE = ColumnarMarketDataService(root=root)
+    _WORKER_CACHE = BacktestResultCache(Path(cache_dir)) if cache_dir else None
+
+
+def run_job(
+    job: BacktestJob,
+    engine: VectorizedBacktestEngine,
+    root: Optional[str] = None,
+    cache: Optional[BacktestResultCache] = None,
+) -> Dict[str, object]:
+    """Backtest one (symbol, timeframe, strategy) cell on memory-mapped candles.
+
+    With a result cache, an unchanged cell is answered from disk before any
+    features are computed.
+    """
+    started = time.perf_counter()
+    row: Dict[str, object] = {"symbol": job.symbol, "timeframe": job.timeframe, "strategy": job.strategy}
+    try:
+        service = _WORKER_SERVICE if root is None else ColumnarMarketDataService(root=root)
+        cache = cache if root is not None else _WORKER_CACHE
+        df = service.fetch_range(job.symbol, job.timeframe, start=job.start, end=job.end)
+        row["bars"] = len(df)
+        if len(df) < 2:
+            raise ValueError("not enough candles")
+        strategy = prepare_strategies()[job.strategy]
+        key = result_key(df, strategy, engine, {"atr": "features"}) if cache is not None else None
+        result = cache.get(key) if cache is not None else None
+        row["cached"] = result is not None
+        if result is None:
+            # NumPy feature kernels: same values as compute_features without pandas_ta per worker
+            features = compute_features_many({job.symbol: df})[job.symbol]
+            signals = strategy.generate_signals(df, features=features)
+            result = engine.run(df, signals, symbol=job.symbol, atr=features["atr"])
+            if cache is not None:
+                cache.put(key, result)
+        row.update(result.stats)
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+
+def run_backtest_matrix(
+    service,
+    symbols: Sequence[str],
+    timeframes: Sequence[str],
+    output: Path,
+    strategies: Optional[Sequence[str]] = None,
+    start=None,
+    end=None,
+    engine: Optional[VectorizedBacktestEngine] = None,
+    max_workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Backtest symbols x strategies x timeframes across a process pool.
+
+    Candles reach the workers as memory-mapped column files: a columnar
+    ``service`` is read in place, anything else is staged into a temporary
+    columnar copy first. Each finished cell is appended to ``output`` (CSV)
+    immediately, so partial results survive an interrupted run. With
+    ``cache_dir``, results are shared through a ``BacktestResultCache``.
+    """
+    engine = engine or VectorizedBacktestEngine()
+    strategies = list(strategies or prepare_strategies())
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        BacktestJob(symbol, timeframe, strategy, start or None, end or None)
+        for timeframe in timeframes
+        for symbol in symbols
+        for strategy in strategies
+    ]
+    store = getattr(service, "store_backend", None)
+    staging = None
+    if not isinstance(store, ColumnarCandleStore):
+        staging = tempfile.TemporaryDirectory(prefix="backtest-candles-")
+        store = stage_candles(service, symbols, timeframes, Path(staging.name), start, end)
+
+    rows: List[Dict[str, object]] = []
+    started = time.perf_counter()
+    try:
+        with output.open("w", newline="", encoding="utf-8") as handle, ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(str(store.root), str(cache_dir) if cache_dir else None),
+        ) as pool:
+            writer = csv.DictWriter(handle, fieldnames=RESULT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            futures = {pool.submit(run_job, job, engine): job for job in jobs}
+            for future in as_completed(futures):
+                row = future.result()
+                writer.writerow(row)
+                handle.flush()
+                rows.append(row)
+                if row.get("error"):
+                    logger.warning("Backtest %s failed: %s", asdict(futures[future]), row["error"])
+    finally:
+        if staging is not None:
+            staging.cleanup()
+    logger.info(
+        "Backtest matrix: %d cells in %.2fs, results in %s",
+        len(jobs),
+        time.perf_counter() - started,
+        output,
+    )
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+__all__ = ["BacktestJob", "RESULT_COLUMNS", "run_backtest_matrix", "run_job", "stage_candles"]
@@ -1,77 +1,107 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional
 
 import numpy as np
 import pandas as pd
-from backtesting import Backtest, Strategy
+
+try:
+    from backtesting import Strategy
+    from backtesting.lib import FractionalBacktest
+except ImportError:  # pragma: no cover - optional dependency
+    FractionalBacktest = None  # type: ignore
+    Strategy = object  # type: ignore
 
 from ..strategy.base import SignalResult
 from ..strategy.ensemble import EnsembleSelector
 from ..strategy.momentum_rsi import MomentumRSIStrategy
 from ..strategy.mean_reversion import MeanReversionStrategy
 from ..strategy.breakout_atr import BreakoutATRStrategy
-from ..strategy.position_sizing import position_size
+from ..strategy.position_sizing import position_fraction
+
 
 @dataclass
 class BacktestResult:
-equity_curve: pd.Series
-trades: pd.DataFrame
-stats: Dict[str, float]
+    equity_curve: pd.Series
+    trades: pd.DataFrame
+    stats: Dict[str, float]
+
 
 class BacktestEngine:
-def __init__(self, cash: float = 10_000.0, commission: float = 0.001):
-self.cash = cash
-self.commission = commission
-
-def run(self, df: pd.DataFrame, signals: SignalResult, symbol: str) -> BacktestResult:
-    class WrappedStrategy(Strategy):
-        def __init__(inner_self):
-            inner_self.signal_entries = signals.entries.astype(bool)
-            inner_self.signal_exits = signals.exits.astype(bool)
-
-        def next(inner_self):
-            if inner_self.signal_entries.iloc[-1] and not inner_self.position:
-                size = position_size(
-                    inner_self.equity,
-                    inner_self.data.Close[-1],
-                    max(inner_self.data.Close[-1] * 0.01, 1e-6),
-                    risk_per_trade=0.01,
-                    stop_atr_mult=2.0,
-                )
-                if size > 0:
-                    inner_self.buy(size=size)
-            elif inner_self.signal_exits.iloc[-1] and inner_self.position:
-                inner_self.position.close()
-
-    bt = Backtest(
-        df,
-        WrappedStrategy,
-        cash=self.cash,
-        commission=self.commission,
-        trade_on_close=True,
-    )
-    stats = bt.run()
-    equity_curve = stats["_equity_curve"]["Equity"]
-    trades = stats["_trades"].copy()
-    return BacktestResult(
-        equity_curve=equity_curve,
-        trades=trades,
-        stats={
-            "Equity Final": float(stats["Equity Final [$]"]),
-            "CAGR": float(stats.get("Return (Ann.)", 0.0)),
-            "Sharpe": float(stats.get("Sharpe Ratio", 0.0)),
-            "Win Rate": float(stats.get("Win Rate [%]", 0.0)),
-        },
-    )
+    def __init__(self, cash: float = 10_000.0, commission: float = 0.001):
+        self.cash = cash
+        self.commission = commission
+
+    def run(
+        self,
+        df: pd.DataFrame,
+        signals: SignalResult,
+        symbol: str,
+        atr: Optional[pd.Series] = None,
+    ) -> BacktestResult:
+        if FractionalBacktest is None:
+            raise ImportError("backtesting is required for BacktestEngine")
+        # capped so price plus fee fits in cash; strictly below 1, which would mean one unit
+        max_fraction = min(1.0 / (1.0 + self.commission), 0.9999)
+        # FractionalBacktest scales the prices it shows the strategy, so size on the originals
+        closes = df["close"].to_numpy(dtype=np.float64)
+        if atr is None:
+            # stand-in stop distance, as in VectorizedBacktestEngine.simulate
+            atr = closes * 0.01
+        stops = np.asarray(atr, dtype=np.float64)
+
+        class WrappedStrategy(Strategy):
+            def init(inner_self):
+                inner_self.signal_entries = signals.entries.astype(bool).to_numpy()
+                inner_self.signal_exits = signals.exits.astype(bool).to_numpy()
+
+            def next(inner_self):
+                # ``self.data`` grows bar by bar, so its length locates the current bar
+                bar = len(inner_self.data) - 1
+                if inner_self.signal_entries[bar] and not inner_self.position:
+                    price = closes[bar]
+                    # backtesting.py reads a size in (0, 1) as a share of equity
+                    fraction = min(
+                        float(position_fraction(price, max(stops[bar], 1e-6), risk_per_trade=0.01, stop_atr_mult=2.0)),
+                        max_fraction,
+                    )
+                    if fraction > 0:
+                        inner_self.buy(size=fraction)
+                elif inner_self.signal_exits[bar] and inner_self.position:
+                    inner_self.position.close()
+
+        # whole units of one satoshi, so a position can be smaller than one coin
+        bt = FractionalBacktest(
+            df.rename(columns=str.capitalize),
+            WrappedStrategy,
+            cash=self.cash,
+            commission=self.commission,
+            trade_on_close=True,
+        )
+        stats = bt.run()
+        equity_curve = stats["_equity_curve"]["Equity"]
+        trades = stats["_trades"].copy()
+        return BacktestResult(
+            equity_curve=equity_curve,
+            trades=trades,
+            stats={
+                "Equity Final": float(stats["Equity Final [$]"]),
+                "CAGR": float(stats.get("Return (Ann.)", 0.0)),
+                "Sharpe": float(stats.get("Sharpe Ratio", 0.0)),
+                "Win Rate": float(stats.get("Win Rate [%]", 0.0)),
+            },
+        )
+
+
 def prepare_strategies() -> Dict[str, object]:
-return {
-"momentum_rsi": MomentumRSIStrategy(),
-"mean_reversion": MeanReversionStrategy(),
-"breakout_atr": BreakoutATRStrategy(),
-}
+    return {
+        "momentum_rsi": MomentumRSIStrategy(),
+        "mean_reversion": MeanReversionStrategy(),
+        "breakout_atr": BreakoutATRStrategy(),
+    }
+
 
 def ensemble_select(signals: Dict[str, SignalResult]) -> SignalResult:
-selector = EnsembleSelector()
-return selector.blend_signals(signals)
+    selector = EnsembleSelector()
+    return selector.blend_signals(signals)
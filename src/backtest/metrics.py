@@ -1,48 +1,141 @@
 ﻿from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Union
 
 import numpy as np
 import pandas as pd
 
+
 @dataclass
 class PerformanceMetrics:
-cagr: float
-sharpe: float
-sortino: float
-max_drawdown: float
-win_rate: float
-profit_factor: float
+    cagr: float
+    sharpe: float
+    sortino: float
+    max_drawdown: float
+    win_rate: float
+    profit_factor: float
+
+
+METRIC_FIELDS = [f.name for f in fields(PerformanceMetrics)]
+# field name -> the label used in stats dicts and result tables
+METRIC_LABELS = {
+    "cagr": "CAGR",
+    "sharpe": "Sharpe",
+    "sortino": "Sortino",
+    "max_drawdown": "Max Drawdown",
+    "win_rate": "Win Rate",
+    "profit_factor": "Profit Factor",
+}
+
 
 def compute_metrics(equity_curve: pd.Series, trades: pd.DataFrame) -> PerformanceMetrics:
-returns = equity_curve.pct_change().dropna()
-cagr = (equity_curve.iloc[-1] / equity_curve.iloc[0]) ** (365 / len(equity_curve)) - 1
-sharpe = returns.mean() / (returns.std() + 1e-9) * (len(returns) ** 0.5)
-downside = returns[returns < 0]
-sortino = returns.mean() / (downside.std() + 1e-9) * (len(returns) ** 0.5)
-running_max = equity_curve.cummax()
-max_drawdown = ((equity_curve / running_max) - 1).min()
-wins = trades[trades["PnL"] > 0]
-win_rate = len(wins) / max(len(trades), 1)
-gross_profit = trades[trades["PnL"] > 0]["PnL"].sum()
-gross_loss = trades[trades["PnL"] < 0]["PnL"].abs().sum()
-profit_factor = gross_profit / max(gross_loss, 1e-9)
-return PerformanceMetrics(
-cagr=float(cagr),
-sharpe=float(sharpe),
-sortino=float(sortino),
-max_drawdown=float(max_drawdown),
-win_rate=float(win_rate),
-profit_factor=float(profit_factor),
-)
+    returns = equity_curve.pct_change().dropna()
+    cagr = (equity_curve.iloc[-1] / equity_curve.iloc[0]) ** (365 / len(equity_curve)) - 1
+    sharpe = returns.mean() / (returns.std() + 1e-9) * (len(returns) ** 0.5)
+    downside = returns[returns < 0]
+    sortino = returns.mean() / (downside.std() + 1e-9) * (len(returns) ** 0.5)
+    running_max = equity_curve.cummax()
+    max_drawdown = ((equity_curve / running_max) - 1).min()
+    wins = trades[trades["PnL"] > 0]
+    win_rate = len(wins) / max(len(trades), 1)
+    gross_profit = trades[trades["PnL"] > 0]["PnL"].sum()
+    gross_loss = trades[trades["PnL"] < 0]["PnL"].abs().sum()
+    profit_factor = gross_profit / max(gross_loss, 1e-9)
+    return PerformanceMetrics(
+        cagr=float(cagr),
+        sharpe=float(sharpe),
+        sortino=float(sortino),
+        max_drawdown=float(max_drawdown),
+        win_rate=float(win_rate),
+        profit_factor=float(profit_factor),
+    )
+
+
+def curve_metrics(equity: np.ndarray, periods: Optional[Union[int, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """CAGR, Sharpe, Sortino and max drawdown of every column of a (time x run) matrix.
+
+    Same formulas as ``compute_metrics``. NaN marks bars outside a run, so runs
+    of different lengths share one matrix; each run is expected to be one
+    contiguous block. ``periods`` overrides the bar count in the CAGR exponent.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    valid = ~np.isnan(equity)
+    bars = valid.sum(axis=0)
+    cols = np.arange(equity.shape[1])
+    first = equity[valid.argmax(axis=0), cols]
+    last = equity[len(equity) - 1 - valid[::-1].argmax(axis=0), cols]
+    returns = equity[1:] / equity[:-1] - 1.0
+    steps = (~np.isnan(returns)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = (last / first) ** (365 / (bars if periods is None else periods)) - 1
+        mean = np.nansum(returns, axis=0) / steps
+        centred = np.where(np.isnan(returns), 0.0, returns - mean)
+        std = np.sqrt((centred**2).sum(axis=0) / (steps - 1))
+        sharpe = mean / (std + 1e-9) * np.sqrt(steps)
+        # downside deviation over the negative returns only, like ``returns[returns < 0].std()``
+        negative = returns < 0
+        count = negative.sum(axis=0)
+        neg_mean = np.where(negative, returns, 0.0).sum(axis=0) / count
+        neg_var = np.where(negative, (returns - neg_mean) ** 2, 0.0).sum(axis=0) / (count - 1)
+        downside = np.where(count > 1, np.sqrt(neg_var), np.nan)
+        sortino = mean / (downside + 1e-9) * np.sqrt(steps)
+        drawdown = equity / np.fmax.accumulate(equity, axis=0) - 1
+    max_drawdown = np.where(bars > 0, np.nanmin(np.where(valid, drawdown, np.inf), axis=0), np.nan)
+    empty = bars == 0
+    return {
+        "cagr": np.where(empty, np.nan, cagr),
+        "sharpe": np.where(steps > 1, sharpe, np.nan),
+        "sortino": np.where(steps > 1, sortino, np.nan),
+        "max_drawdown": max_drawdown,
+    }
+
+
+def compute_metrics_batch(
+    equity: Union[np.ndarray, pd.DataFrame],
+    trades: Optional[pd.DataFrame] = None,
+    run_column: str = "run",
+) -> pd.DataFrame:
+    """``compute_metrics`` for many runs in one vectorized pass.
+
+    ``equity`` is a (time x run) matrix, NaN-padded where runs are shorter;
+    ``trades`` holds a ``PnL`` column plus ``run_column`` naming each trade's
+    run (a column label of a DataFrame ``equity``, else a column position).
+    Returns one row per run with the ``PerformanceMetrics`` fields.
+    """
+    labels = equity.columns if isinstance(equity, pd.DataFrame) else pd.RangeIndex(np.shape(equity)[1])
+    values = equity.to_numpy(dtype=np.float64) if isinstance(equity, pd.DataFrame) else np.asarray(equity, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    runs = len(labels)
+    result = curve_metrics(values)
+
+    if trades is not None and len(trades):
+        run = labels.get_indexer(trades[run_column])
+        if (run < 0).any():
+            raise KeyError(f"trades reference runs missing from the equity matrix: {set(trades[run_column][run < 0])}")
+        pnl = trades["PnL"].to_numpy(dtype=np.float64)
+        count = np.bincount(run, minlength=runs)
+        wins = np.bincount(run, weights=pnl > 0, minlength=runs)
+        gross_profit = np.bincount(run, weights=np.where(pnl > 0, pnl, 0.0), minlength=runs)
+        gross_loss = np.bincount(run, weights=np.where(pnl < 0, -pnl, 0.0), minlength=runs)
+    else:
+        count = wins = gross_profit = gross_loss = np.zeros(runs)
+    result["win_rate"] = wins / np.maximum(count, 1)
+    result["profit_factor"] = gross_profit / np.maximum(gross_loss, 1e-9)
+    return pd.DataFrame(result, index=labels, columns=METRIC_FIELDS)
+
 
 def format_metrics(metrics: PerformanceMetrics) -> Dict[str, float]:
-return {
-"CAGR": metrics.cagr,
-"Sharpe": metrics.sharpe,
-"Sortino": metrics.sortino,
-"Max Drawdown": metrics.max_drawdown,
-"Win Rate": metrics.win_rate,
-"Profit Factor": metrics.profit_factor,
-}
+    return {label: getattr(metrics, name) for name, label in METRIC_LABELS.items()}
+
+
+__all__ = [
+    "METRIC_FIELDS",
+    "METRIC_LABELS",
+    "PerformanceMetrics",
+    "compute_metrics",
+    "compute_metrics_batch",
+    "curve_metrics",
+    "format_metrics",
+]
@@ -0,0 +1,158 @@
+﻿from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import BacktestResult
+from .metrics import METRIC_FIELDS, curve_metrics
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("bootstrap", "shuffle", "block")
+
+
+@dataclass
+class MonteCarloResult:
+    """Metrics of every resampled path, one row per path and one column per metric."""
+
+    method: str
+    metrics: pd.DataFrame
+    paths: Optional[np.ndarray] = None
+
+    def confidence_intervals(self, levels: Sequence[float] = (0.05, 0.5, 0.95)) -> pd.DataFrame:
+        """Quantiles of each ``PerformanceMetrics`` field across paths (NaN paths ignored)."""
+        return self.metrics.quantile(list(levels)).T
+
+    def summary(self, confidence: float = 0.9) -> pd.DataFrame:
+        tail = (1.0 - confidence) / 2.0
+        table = self.metrics.quantile([tail, 0.5, 1.0 - tail]).T
+        table.columns = ["lower", "median", "upper"]
+        return table
+
+
+def path_metrics(equity: np.ndarray, periods: Optional[int] = None) -> pd.DataFrame:
+    """``compute_metrics`` for every column of a (step x path) equity matrix.
+
+    Returns are step-to-step changes of each path and each step's change in
+    equity counts as one trade for win rate and profit factor. ``periods``
+    replaces the step count in the CAGR exponent so trade-level paths annualise
+    over the backtest's bars rather than over their trade count.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.ndim == 1:
+        equity = equity[:, None]
+    result = curve_metrics(equity, periods=periods or len(equity))
+    pnl = np.diff(equity, axis=0)
+    result["win_rate"] = (pnl > 0).sum(axis=0) / max(len(pnl), 1)
+    gross_loss = -np.where(pnl < 0, pnl, 0.0).sum(axis=0)
+    result["profit_factor"] = np.where(pnl > 0, pnl, 0.0).sum(axis=0) / np.maximum(gross_loss, 1e-9)
+    return pd.DataFrame(result, columns=METRIC_FIELDS)
+
+
+def trade_returns(result: BacktestResult) -> np.ndarray:
+    """Each closed trade's PnL as a fraction of equity before it, in exit order."""
+    trades = result.trades
+    if "ExitTime" in trades:
+        trades = trades.sort_values("ExitTime", kind="stable")
+    pnl = trades["PnL"].to_numpy(dtype=np.float64)
+    start = float(result.equity_curve.iloc[0])
+    before = start + np.concatenate([[0.0], np.cumsum(pnl)[:-1]])
+    return pnl / before
+
+
+def resample_indices(
+    size: int,
+    n_paths: int,
+    method: str,
+    rng: np.random.Generator,
+    block_size: int = 1,
+) -> np.ndarray:
+    """(size x n_paths) row indices for one resampling scheme."""
+    if method == "bootstrap":
+        return rng.integers(0, size, (size, n_paths))
+    if method == "shuffle":
+        return np.argsort(rng.random((size, n_paths)), axis=0)
+    if method == "block":
+        # circular block bootstrap: consecutive runs of ``block_size`` from random starts
+        blocks = -(-size // block_size)
+        starts = rng.integers(0, size, (blocks, 1, n_paths))
+        offsets = np.arange(block_size)[None, :, None]
+        return ((starts + offsets) % size).reshape(blocks * block_size, n_paths)[:size]
+    raise ValueError(f"Unknown resampling method {method!r}; expected one of {METHODS}")
+
+
+def run_monte_carlo(
+    result: BacktestResult,
+    n_paths: int = 1000,
+    method: str = "bootstrap",
+    block_size: Optional[int] = None,
+    seed: Optional[int] = None,
+    keep_paths: bool = False,
+    max_cells: int = 1 << 24,
+) -> MonteCarloResult:
+    """Resample a backtest ``n_paths`` times and measure every path.
+
+    ``bootstrap`` draws trades with replacement and ``shuffle`` reorders them;
+    both compound each trade's return on the equity before it. ``block``
+    resamples bar returns of the equity curve in blocks of ``block_size`` bars
+    (default: about the cube root of the bar count) to keep short-range
+    autocorrelation, so its win rate and profit factor count bars rather than
+    trades. Paths are built as (step x path) matrices, ``max_cells`` elements
+    at a time.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method {method!r}; expected one of {METHODS}")
+    rng = np.random.default_rng(seed)
+    equity = result.equity_curve.to_numpy(dtype=np.float64)
+    start = float(equity[0])
+    if method == "block":
+        sample = equity[1:] / equity[:-1] - 1.0
+        block_size = block_size or max(int(round(len(sample) ** (1 / 3))), 1)
+    else:
+        sample = trade_returns(result)
+        block_size = 1
+    if len(sample) == 0:
+        raise ValueError("Nothing to resample: the backtest has no closed trades")
+
+    started = time.perf_counter()
+    chunk = max(max_cells // (len(sample) + 1), 1)
+    frames = []
+    kept = []
+    for offset in range(0, n_paths, chunk):
+        width = min(chunk, n_paths - offset)
+        index = resample_indices(len(sample), width, method, rng, block_size)
+        paths = np.empty((len(sample) + 1, width))
+        paths[0] = start
+        np.cumprod(1.0 + sample[index], axis=0, out=paths[1:])
+        paths[1:] *= start
+        frames.append(path_metrics(paths, periods=len(equity)))
+        if keep_paths:
+            kept.append(paths)
+    metrics = pd.concat(frames, ignore_index=True)
+    logger.info(
+        "Monte Carlo (%s): %d paths of %d steps in %.2fs",
+        method,
+        n_paths,
+        len(sample),
+        time.perf_counter() - started,
+    )
+    return MonteCarloResult(
+        method=method,
+        metrics=metrics,
+        paths=np.concatenate(kept, axis=1) if keep_paths else None,
+    )
+
+
+__all__ = [
+    "METHODS",
+    "MonteCarloResult",
+    "path_metrics",
+    "resample_indices",
+    "run_monte_carlo",
+    "trade_returns",
+]
@@ -0,0 +1,165 @@
+﻿from __future__ import annotations
+
+import logging
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import Settings, get_settings
+from ..data.panel_features import PricePanel, atr as panel_atr
+from ..strategy.base import SignalResult
+from ..strategy.position_sizing import position_fraction
+from ..strategy.risk import RiskManager
+from .engine import BacktestResult
+from .metrics import compute_metrics, format_metrics
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_TRADE_COLUMNS = [
+    "Symbol",
+    "Size",
+    "EntryBar",
+    "ExitBar",
+    "EntryPrice",
+    "ExitPrice",
+    "PnL",
+    "ReturnPct",
+    "EntryTime",
+    "ExitTime",
+]
+
+
+def _signal_panel(panel: PricePanel, signals: Mapping[str, SignalResult], attr: str) -> np.ndarray:
+    out = np.zeros(panel.close.shape, dtype=bool)
+    for j, symbol in enumerate(panel.symbols):
+        series = getattr(signals[symbol], attr)
+        rows = panel.index.get_indexer(series.index)
+        keep = rows >= 0
+        out[rows[keep], j] = series.to_numpy()[keep].astype(bool)
+    return out
+
+
+class PortfolioBacktestEngine:
+    """Long-only backtest of several symbols sharing one cash balance.
+
+    Symbols are aligned on the union of their timestamps and every bar is
+    processed for all symbols at once. Risk limits follow ``PaperBot``: the
+    daily-loss pause blocks entries, and entries are checked against the
+    position count and exposure limits in symbol order after that bar's exits.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        cash: float = 10_000.0,
+        stop_atr_mult: float = 2.0,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self.risk_manager = RiskManager(settings=self.settings)
+        self.cash = cash
+        self.commission = self.settings.taker_fee_bps / 10_000
+        self.slippage = self.settings.slippage_bps / 10_000
+        self.risk_per_trade = self.settings.risk_per_trade
+        self.stop_atr_mult = stop_atr_mult
+
+    def run(
+        self,
+        frames: Mapping[str, pd.DataFrame],
+        signals: Mapping[str, SignalResult],
+        atr: Optional[np.ndarray] = None,
+    ) -> BacktestResult:
+        panel = PricePanel.from_frames(frames)
+        entries = _signal_panel(panel, signals, "entries")
+        exits = _signal_panel(panel, signals, "exits")
+        if atr is None:
+            atr = panel_atr(panel.high, panel.low, panel.close, 14)
+        live = ~np.isnan(panel.close)
+        # last traded price marks positions on bars where a symbol has no candle
+        marks = pd.DataFrame(panel.close).ffill().fillna(0.0).to_numpy()
+        entry_px = panel.close * (1.0 + self.slippage)
+        weight = position_fraction(entry_px, atr, self.risk_per_trade, self.stop_atr_mult)
+        days = pd.DatetimeIndex(panel.index).normalize().asi8
+
+        n_bars, n_symbols = panel.close.shape
+        units = np.zeros(n_symbols)
+        opened_bar = np.full(n_symbols, -1)
+        opened_px = np.zeros(n_symbols)
+        opened_cost = np.zeros(n_symbols)
+        cash = self.cash
+        equity = np.empty(n_bars)
+        day_start_equity = cash
+        current_day = None
+        paused_bars = 0
+        trades: List[Dict[str, object]] = []
+
+        for t in range(n_bars):
+            px = marks[t]
+            value = cash + units @ px
+            if days[t] != current_day:
+                current_day, day_start_equity = days[t], value
+            loss_pct = (value / day_start_equity - 1.0) * 100.0 if day_start_equity > 0 else 0.0
+            paused = self.risk_manager.loss_limit_hit(loss_pct)
+            paused_bars += paused
+
+            sell = np.flatnonzero((units > 0) & exits[t] & live[t])
+            if len(sell):
+                exit_px = px[sell] * (1.0 - self.slippage)
+                proceeds = units[sell] * exit_px * (1.0 - self.commission)
+                cash += float(proceeds.sum())
+                for j, price, amount in zip(sell, exit_px, proceeds):
+                    pnl = amount - opened_cost[j]
+                    trades.append(
+                        {
+                            "Symbol": panel.symbols[j],
+                            "Size": units[j],
+                            "EntryBar": opened_bar[j],
+                            "ExitBar": t,
+                            "EntryPrice": opened_px[j],
+                            "ExitPrice": price,
+                            "PnL": pnl,
+                            "ReturnPct": pnl / opened_cost[j] if opened_cost[j] > 0 else 0.0,
+                            "EntryTime": panel.index[opened_bar[j]],
+                            "ExitTime": panel.index[t],
+                        }
+                    )
+                units[sell] = 0.0
+
+            candidates = np.flatnonzero(entries[t] & live[t] & (units == 0) & (weight[t] > 0))
+            if len(candidates) and not paused:
+                for j in candidates:
+                    held = units > 0
+                    value = cash + units @ px
+                    if value <= 0 or not self.risk_manager.check_position_limit(int(held.sum())):
+                        break
+                    qty = weight[t, j] * value / entry_px[t, j]
+                    qty = min(qty, cash / (entry_px[t, j] * (1.0 + self.commission)))
+                    if qty <= 0:
+                        continue
+                    projected = (units @ px + qty * px[j]) / value
+                    if not self.risk_manager.check_exposure(projected):
+                        continue
+                    cost = qty * entry_px[t, j] * (1.0 + self.commission)
+                    cash -= cost
+                    units[j] = qty
+                    opened_bar[j], opened_px[j], opened_cost[j] = t, entry_px[t, j], cost
+            equity[t] = cash + units @ px
+
+        equity_curve = pd.Series(equity, index=panel.index, name="Equity")
+        trade_frame = pd.DataFrame(trades, columns=PORTFOLIO_TRADE_COLUMNS)
+        stats = {"Equity Final": float(equity[-1]) if n_bars else self.cash}
+        if n_bars > 1:
+            stats.update(format_metrics(compute_metrics(equity_curve, trade_frame)))
+        stats["Trades"] = float(len(trade_frame))
+        stats["Paused Bars"] = float(paused_bars)
+        logger.info(
+            "Portfolio backtest: %d symbols x %d bars, %d trades, final equity %.2f",
+            n_symbols,
+            n_bars,
+            len(trade_frame),
+            stats["Equity Final"],
+        )
+        return BacktestResult(equity_curve=equity_curve, trades=trade_frame, stats=stats)
+
+
+__all__ = ["PORTFOLIO_TRADE_COLUMNS", "PortfolioBacktestEngine"]
@@ -0,0 +1,157 @@
+﻿from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..data.market_data import OHLCV_COLUMNS
+from .engine import BacktestResult
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".npz"
+# bump when the stored layout or engine semantics change
+CACHE_VERSION = 1
+
+
+def _params(obj) -> dict:
+    if dataclasses.is_dataclass(obj):
+        values = dataclasses.asdict(obj)
+    else:
+        values = {k: v for k, v in vars(obj).items() if not k.startswith("_")}
+    return {k: v for k, v in values.items() if isinstance(v, (int, float, str, bool, type(None)))}
+
+
+def result_key(df: pd.DataFrame, strategy, engine, extra: Optional[Mapping[str, object]] = None) -> str:
+    """sha256 over the candle slice, the strategy class and parameters and the engine settings."""
+    digest = hashlib.sha256()
+    spec = {
+        "version": CACHE_VERSION,
+        "strategy": f"{type(strategy).__module__}.{type(strategy).__qualname__}",
+        "strategy_params": _params(strategy),
+        "engine": f"{type(engine).__module__}.{type(engine).__qualname__}",
+        "engine_params": _params(engine),
+        "extra": dict(extra or {}),
+    }
+    digest.update(json.dumps(spec, sort_keys=True, default=str).encode())
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(df.index).asi8).tobytes())
+    digest.update(np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class BacktestResultCache:
+    """``BacktestResult`` objects stored as one ``.npz`` per key under ``root``.
+
+    Reads refresh a file's mtime; writes evict the least recently used files
+    until the directory fits in ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                index = pd.DatetimeIndex(data["equity_index"], name=meta["equity_index_name"])
+                if meta.get("tz"):
+                    index = index.tz_localize("UTC").tz_convert(meta["tz"])
+                if meta.get("freq"):
+                    index.freq = meta["freq"]
+                equity = pd.Series(data["equity"], index=index, name=meta["equity_name"])
+                trades = pd.DataFrame({col: data[f"trade_{i}"] for i, col in enumerate(meta["trade_columns"])})
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Dropping unreadable backtest cache entry %s: %s", path.name, exc)
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return BacktestResult(equity_curve=equity, trades=trades, stats=meta["stats"])
+
+    def put(self, key: str, result: BacktestResult) -> None:
+        arrays = {
+            "equity": result.equity_curve.to_numpy(dtype=np.float64),
+            "equity_index": pd.DatetimeIndex(result.equity_curve.index).asi8.astype("datetime64[ns]"),
+        }
+        for i, col in enumerate(result.trades.columns):
+            values = result.trades[col].to_numpy()
+            arrays[f"trade_{i}"] = values.astype(str) if values.dtype == object else values
+        meta = {
+            "stats": {k: float(v) for k, v in result.stats.items()},
+            "trade_columns": [str(col) for col in result.trades.columns],
+            "equity_name": result.equity_curve.name,
+            "equity_index_name": result.equity_curve.index.name,
+            "tz": str(getattr(result.equity_curve.index, "tz", None) or "") or None,
+            "freq": getattr(result.equity_curve.index, "freqstr", None),
+        }
+        arrays["meta"] = np.array(json.dumps(meta))
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez_compressed(handle, **arrays)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.root.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.root.glob(f"*{CACHE_SUFFIX}"))
+
+    def run(
+        self,
+        engine,
+        strategy,
+        df: pd.DataFrame,
+        symbol: str,
+        features: Optional[pd.DataFrame] = None,
+        extra: Optional[Mapping[str, object]] = None,
+        **run_kwargs,
+    ) -> BacktestResult:
+        """``engine.run(df, strategy.generate_signals(df, features), ...)``, served from disk when unchanged."""
+        key = result_key(df, strategy, engine, extra)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        signals = strategy.generate_signals(df, features=features)
+        result = engine.run(df, signals, symbol=symbol, **run_kwargs)
+        self.put(key, result)
+        return result
+
+
+__all__ = ["BacktestResultCache", "result_key"]
@@ -0,0 +1,71 @@
+﻿from __future__ import annotations
+
+import itertools
+import logging
+import time
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.features import compute_features
+from .metrics import METRIC_LABELS, compute_metrics_batch
+from .vectorized import VectorizedBacktestEngine
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_grid(**values: Sequence) -> pd.DataFrame:
+    """Cartesian product of parameter values, one row per combination."""
+    names = list(values)
+    rows = list(itertools.product(*(list(values[name]) for name in names)))
+    return pd.DataFrame(rows, columns=names)
+
+
+def run_sweep(
+    strategy,
+    df: pd.DataFrame,
+    grid: Mapping[str, Sequence],
+    features: Optional[pd.DataFrame] = None,
+    engine: Optional[VectorizedBacktestEngine] = None,
+    atr: Optional[np.ndarray] = None,
+    chunk_size: int = 1024,
+) -> pd.DataFrame:
+    """Backtest every combination in ``grid`` on ``df`` in one pass per chunk.
+
+    Features are computed once; ``strategy.signal_grid`` broadcasts the swept
+    thresholds into (bar x combination) signal matrices that the vectorized
+    engine runs column by column in a single call, and every column is scored
+    in one batched metrics pass. Parameters missing from ``grid`` keep
+    ``strategy``'s values. Returns the grid with one metrics row per
+    combination.
+    """
+    engine = engine or VectorizedBacktestEngine()
+    params = parameter_grid(**grid)
+    if features is None:
+        features = compute_features(df, names=strategy.required_features)
+    close = df["close"].to_numpy(dtype=np.float64)
+    started = time.perf_counter()
+    rows = []
+    for start in range(0, len(params), chunk_size):
+        chunk = params.iloc[start : start + chunk_size]
+        entries, exits = strategy.signal_grid(df, features, {name: chunk[name].to_numpy() for name in chunk})
+        equity, trades = engine.simulate_matrix(close, entries, exits, atr)
+        metrics = compute_metrics_batch(equity, pd.DataFrame({"run": trades["column"], "PnL": trades["pnl"]}))
+        metrics = metrics.rename(columns=METRIC_LABELS)
+        metrics["Equity Final"] = equity[-1]
+        metrics["Trades"] = np.bincount(trades["column"], minlength=len(chunk)).astype(float)
+        rows.append(metrics)
+    seconds = time.perf_counter() - started
+    logger.info(
+        "Swept %d %s combinations over %d bars in %.2fs",
+        len(params),
+        strategy.name(),
+        len(df),
+        seconds,
+    )
+    scores = pd.concat(rows, ignore_index=True).set_axis(params.index)
+    return pd.concat([params, scores], axis=1)
+
+
+__all__ = ["parameter_grid", "run_sweep"]
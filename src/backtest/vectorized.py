@@ -0,0 +1,197 @@
+﻿from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..strategy.base import SignalResult
+from ..strategy.position_sizing import position_fraction
+from .engine import BacktestResult
+from .metrics import compute_metrics, format_metrics
+
+TRADE_COLUMNS = [
+    "Size",
+    "EntryBar",
+    "ExitBar",
+    "EntryPrice",
+    "ExitPrice",
+    "PnL",
+    "ReturnPct",
+    "EntryTime",
+    "ExitTime",
+]
+
+
+def position_state(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """Long/flat state after each bar for a long-only entry/exit toggle, down axis 0.
+
+    Flat + entry opens, long + exit closes; a bar with both flips the state.
+    Solved without a loop: the state is the value of the last one-sided signal,
+    flipped once per "both" bar since then. 2D inputs hold one run per column.
+    """
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    both = entries & exits
+    decisive = entries ^ exits
+    rows = np.arange(len(entries)).reshape((-1,) + (1,) * (entries.ndim - 1))
+    last = np.maximum.accumulate(np.where(decisive, rows, -1), axis=0)
+    anchor = np.maximum(last, 0)
+    base = (last >= 0) & np.take_along_axis(entries, anchor, axis=0)
+    flips = np.cumsum(both, axis=0)
+    flips_since = flips - np.where(last >= 0, np.take_along_axis(flips, anchor, axis=0), 0)
+    return base ^ (flips_since % 2 == 1)
+
+
+@dataclass
+class VectorizedBacktestEngine:
+    """Long-only backtest over entry/exit arrays, computed with array operations only.
+
+    Orders fill on the signal bar's close, moved against us by ``slippage`` and
+    charged ``commission`` on both legs. Position size follows
+    ``position_size`` (risk per trade over an ATR stop), capped at the equity
+    available at entry.
+    """
+
+    cash: float = 10_000.0
+    commission: float = 0.001
+    slippage: float = 0.0
+    risk_per_trade: float = 0.01
+    stop_atr_mult: float = 2.0
+
+    @classmethod
+    def from_settings(cls, settings, cash: float = 10_000.0) -> "VectorizedBacktestEngine":
+        return cls(
+            cash=cash,
+            commission=settings.taker_fee_bps / 10_000,
+            slippage=settings.slippage_bps / 10_000,
+            risk_per_trade=settings.risk_per_trade,
+        )
+
+    def simulate(
+        self,
+        close: np.ndarray,
+        entries: np.ndarray,
+        exits: np.ndarray,
+        atr: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, dict]:
+        """Equity per bar plus per-trade arrays (closed trades only)."""
+        equity, trades = self.simulate_matrix(
+            close,
+            np.asarray(entries, dtype=bool)[:, None],
+            np.asarray(exits, dtype=bool)[:, None],
+            atr,
+        )
+        trades.pop("column")
+        return equity[:, 0], trades
+
+    def simulate_matrix(
+        self,
+        close: np.ndarray,
+        entries: np.ndarray,
+        exits: np.ndarray,
+        atr: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, dict]:
+        """Equity for every column of (bar x run) entry/exit matrices over one price series.
+
+        Closed trades come back as flat arrays ordered by column, then time, with
+        their run in ``column``.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        if atr is None:
+            # same stand-in stop distance the backtesting.py wrapper uses
+            atr = np.maximum(close * 0.01, 1e-6)
+        atr = np.asarray(atr, dtype=np.float64)
+        entry_px = close * (1.0 + self.slippage)
+        exit_px = close * (1.0 - self.slippage)
+        # share of equity spent on the position, capped so price plus fee fits in cash
+        weight = np.minimum(
+            position_fraction(entry_px, atr, self.risk_per_trade, self.stop_atr_mult),
+            1.0 / (1.0 + self.commission),
+        )
+        entries = np.asarray(entries, dtype=bool) & (weight > 0)[:, None]
+        held = position_state(entries, exits)
+        prev = np.zeros_like(held)
+        prev[1:] = held[:-1]
+        opened = held & ~prev
+        closed = ~held & prev
+        n_runs = held.shape[1]
+
+        entry_col, entry_bar = np.nonzero(opened.T)
+        exit_col, exit_bar = np.nonzero(closed.T)
+        entry_count = np.bincount(entry_col, minlength=n_runs)
+        exit_count = np.bincount(exit_col, minlength=n_runs)
+        first_entry = np.cumsum(entry_count) - entry_count
+        exit_rank = np.arange(len(exit_col)) - (np.cumsum(exit_count) - exit_count)[exit_col]
+        # the k-th exit of a run closes its k-th entry
+        matched = first_entry[exit_col] + exit_rank
+
+        w = weight[entry_bar]
+        p_in = entry_px[entry_bar]
+        # equity multiple over each closed trade, compounded per run
+        growth = 1.0 - w[matched] * (1.0 + self.commission)
+        growth += w[matched] * exit_px[exit_bar] / p_in[matched] * (1.0 - self.commission)
+        multiples = np.ones((n_runs, entry_count.max(initial=0) + 1))
+        multiples[exit_col, exit_rank + 1] = growth
+        start_equity = self.cash * np.cumprod(multiples, axis=1)
+
+        runs = np.broadcast_to(np.arange(n_runs), held.shape)
+        equity = start_equity[runs, np.cumsum(closed, axis=0)]
+        bars, cols = np.nonzero(held)
+        if len(bars):
+            k = np.cumsum(opened, axis=0)[bars, cols] - 1
+            trade = first_entry[cols] + k
+            equity[bars, cols] = start_equity[cols, k] * (
+                1.0 - w[trade] * (1.0 + self.commission) + w[trade] * close[bars] / p_in[trade]
+            )
+
+        trades = {
+            "column": exit_col,
+            "size": w[matched] * start_equity[exit_col, exit_rank] / p_in[matched],
+            "entry_bar": entry_bar[matched],
+            "exit_bar": exit_bar,
+            "entry_price": p_in[matched],
+            "exit_price": exit_px[exit_bar],
+            "pnl": start_equity[exit_col, exit_rank + 1] - start_equity[exit_col, exit_rank],
+        }
+        return equity, trades
+
+    def run(
+        self,
+        df: pd.DataFrame,
+        signals: SignalResult,
+        symbol: str,
+        atr: Optional[pd.Series] = None,
+    ) -> BacktestResult:
+        close = df["close"].to_numpy(dtype=np.float64)
+        equity, trades = self.simulate(
+            close,
+            signals.entries.to_numpy(dtype=bool),
+            signals.exits.to_numpy(dtype=bool),
+            None if atr is None else np.asarray(atr, dtype=np.float64),
+        )
+        equity_curve = pd.Series(equity, index=df.index, name="Equity")
+        cost = trades["size"] * trades["entry_price"]
+        trade_frame = pd.DataFrame(
+            {
+                "Size": trades["size"],
+                "EntryBar": trades["entry_bar"],
+                "ExitBar": trades["exit_bar"],
+                "EntryPrice": trades["entry_price"],
+                "ExitPrice": trades["exit_price"],
+                "PnL": trades["pnl"],
+                "ReturnPct": np.divide(trades["pnl"], cost, out=np.zeros_like(cost), where=cost > 0),
+                "EntryTime": df.index[trades["entry_bar"]],
+                "ExitTime": df.index[trades["exit_bar"]],
+            },
+            columns=TRADE_COLUMNS,
+        )
+        stats = {"Equity Final": float(equity[-1]) if len(equity) else self.cash}
+        if len(equity) > 1:
+            stats.update(format_metrics(compute_metrics(equity_curve, trade_frame)))
+        stats["Trades"] = float(len(trade_frame))
+        return BacktestResult(equity_curve=equity_curve, trades=trade_frame, stats=stats)
+
+
+__all__ = ["TRADE_COLUMNS", "VectorizedBacktestEngine", "position_state"]
@@ -0,0 +1,168 @@
+﻿from __future__ import annotations
+
+import copy
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.features import compute_features
+from .metrics import compute_metrics, format_metrics
+from .sweep import run_sweep
+from .vectorized import VectorizedBacktestEngine
+
+logger = logging.getLogger(__name__)
+
+# (strategy, df, features, grid, engine, metric, atr) shipped once per worker process
+_WORKER_PAYLOAD: Optional[tuple] = None
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Bar offsets of one in-sample/out-of-sample split; ends are exclusive."""
+
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+@dataclass
+class WalkForwardResult:
+    folds: pd.DataFrame
+    equity_curve: pd.Series
+    stats: Dict[str, float]
+
+
+def walk_forward_folds(n_bars: int, train_bars: int, test_bars: int, step: Optional[int] = None) -> List[Fold]:
+    """Rolling folds: train on ``train_bars``, test on the next ``test_bars``, advance by ``step``."""
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars and test_bars must be positive")
+    step = step or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        train_end = start + train_bars
+        folds.append(Fold(len(folds), start, train_end, train_end, train_end + test_bars))
+        start += step
+    return folds
+
+
+def _init_worker(payload: tuple) -> None:
+    global _WORKER_PAYLOAD
+    _WORKER_PAYLOAD = payload
+
+
+def _python_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def run_fold(fold: Fold, payload: Optional[tuple] = None) -> Dict[str, object]:
+    """Optimise on the fold's in-sample window, then trade the winner out of sample."""
+    strategy, df, features, grid, engine, metric, atr = payload or _WORKER_PAYLOAD
+    train = slice(fold.train_start, fold.train_end)
+    scores = run_sweep(
+        strategy,
+        df.iloc[train],
+        grid,
+        features=features.iloc[train],
+        engine=engine,
+        atr=None if atr is None else atr[train],
+    )
+    best = scores[metric].fillna(-np.inf).idxmax()
+    params = {name: _python_value(scores.at[best, name]) for name in grid}
+    chosen = copy.copy(strategy)
+    for name, value in params.items():
+        setattr(chosen, name, value)
+
+    # signals see the history before the test window; trading starts flat at its first bar
+    history = slice(0, fold.test_end)
+    signals = chosen.generate_signals(df.iloc[history], features=features.iloc[history])
+    test = slice(fold.test_start, fold.test_end)
+    equity, trades = engine.simulate(
+        df["close"].to_numpy(dtype=np.float64)[test],
+        signals.entries.to_numpy(dtype=bool)[test],
+        signals.exits.to_numpy(dtype=bool)[test],
+        None if atr is None else atr[test],
+    )
+    return {
+        "fold": fold.index,
+        "params": params,
+        "in_sample": float(scores.at[best, metric]),
+        "equity": equity,
+        "pnl": trades["pnl"],
+    }
+
+
+def run_walk_forward(
+    strategy,
+    df: pd.DataFrame,
+    grid: Mapping[str, Sequence],
+    train_bars: int,
+    test_bars: int,
+    step: Optional[int] = None,
+    features: Optional[pd.DataFrame] = None,
+    engine: Optional[VectorizedBacktestEngine] = None,
+    metric: str = "Sharpe",
+    atr: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None,
+) -> WalkForwardResult:
+    """Walk-forward optimisation of ``strategy`` over ``grid`` with folds run in parallel.
+
+    Features are computed once for the whole history and sliced per fold, so
+    overlapping windows never recompute them. Each fold's out-of-sample equity
+    starts where the previous fold ended, giving one stitched curve.
+    """
+    engine = engine or VectorizedBacktestEngine()
+    if features is None:
+        features = compute_features(df, names=strategy.required_features)
+    folds = walk_forward_folds(len(df), train_bars, test_bars, step)
+    if not folds:
+        raise ValueError("Not enough bars for a single walk-forward fold")
+    payload = (strategy, df, features, dict(grid), engine, metric, atr)
+    workers = min(max_workers or os.cpu_count() or 1, len(folds))
+    if workers == 1:
+        outcomes = [run_fold(fold, payload) for fold in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(payload,)) as pool:
+            outcomes = list(pool.map(run_fold, folds))
+
+    curves = []
+    pnl = []
+    rows = []
+    capital = engine.cash
+    for fold, outcome in zip(folds, outcomes):
+        scale = capital / engine.cash
+        equity = outcome["equity"] * scale
+        curves.append(pd.Series(equity, index=df.index[fold.test_start : fold.test_end]))
+        pnl.append(outcome["pnl"] * scale)
+        rows.append(
+            {
+                "fold": fold.index,
+                "train_start": df.index[fold.train_start],
+                "test_start": df.index[fold.test_start],
+                "test_end": df.index[fold.test_end - 1],
+                "in_sample": outcome["in_sample"],
+                "out_of_sample_return": equity[-1] / capital - 1.0,
+                **outcome["params"],
+            }
+        )
+        capital = float(equity[-1])
+    equity_curve = pd.concat(curves).rename("Equity")
+    trades = pd.DataFrame({"PnL": np.concatenate(pnl)})
+    stats = {"Equity Final": capital, **format_metrics(compute_metrics(equity_curve, trades))}
+    logger.info(
+        "Walk-forward %s: %d folds, out-of-sample equity %.2f",
+        strategy.name(),
+        len(folds),
+        capital,
+    )
+    return WalkForwardResult(folds=pd.DataFrame(rows), equity_curve=equity_curve, stats=stats)
+
+
+__all__ = ["Fold", "WalkForwardResult", "run_fold", "run_walk_forward", "walk_forward_folds"]
@@ -1,90 +1,329 @@
 ﻿from __future__ import annotations
 
+import json
 import logging
+import math
+import os
+import threading
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Optional
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
 
 import ccxt
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# seconds cached market metadata is trusted before a background refresh
+MARKETS_TTL_SECONDS = 3600.0
+
+
 @dataclass
 class OrderResponse:
-id: str
-status: str
-symbol: str
-side: str
-price: float
-amount: float
-
-def _client() -> ccxt.binance:
-settings = get_settings()
-exchange = ccxt.binance(
-{
-"apiKey": settings.binance_api_key,
-"secret": settings.binance_api_secret,
-"enableRateLimit": True,
-"options": {"defaultType": "spot"},
-"timeout": 20000,
-}
-)
-if settings.binance_testnet:
-exchange.set_sandbox_mode(True)
-exchange.load_markets()
-return exchange
-
-def _round(exchange: ccxt.binance, symbol: str, amount: float, price: Optional[float]):
-rounded_amount = float(exchange.amount_to_precision(symbol, amount))
-rounded_price = float(exchange.price_to_precision(symbol, price)) if price is not None else None
-return rounded_amount, rounded_price
+    id: str
+    status: str
+    symbol: str
+    side: str
+    price: float
+    amount: float
 
-def _order_id() -> str:
-return f"bot-{uuid.uuid4().hex[:16]}"
 
-class BinanceAdapter:
-def __init__(self, settings=None):
-self.settings = settings or get_settings()
-self.exchange = _client()
-
-@retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
-def get_balance(self) -> Dict[str, float]:
-    balance = self.exchange.fetch_balance()
-    return {k: float(v["free"]) for k, v in balance.get("free", {}).items()}
-
-@retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
-def fetch_ohlcv(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500):
-    return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
-
-@retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
-def create_order(
-    self,
+def mk_exchange(settings) -> ccxt.binance:
+    """ccxt client without markets loaded; one instance keeps its HTTP session for every request."""
+    exchange = ccxt.binance(
+        {
+            "apiKey": settings.binance_api_key,
+            "secret": settings.binance_api_secret,
+            "enableRateLimit": True,
+            "options": {"defaultType": "spot"},
+            "timeout": 20000,
+        }
+    )
+    if settings.binance_testnet:
+        exchange.set_sandbox_mode(True)
+    return exchange
+
+
+def _decimals(step: float) -> int:
+    return max(-Decimal(repr(step)).normalize().as_tuple().exponent, 0)
+
+
+@dataclass(frozen=True)
+class StepTable:
+    """Order increments of one market, resolved once from its ccxt precision.
+
+    Amounts truncate to ``amount_step`` and prices round to ``price_step``,
+    matching ccxt's ``amount_to_precision``/``price_to_precision`` on Binance.
+    """
+
+    amount_step: float
+    price_step: float
+    amount_decimals: int
+    price_decimals: int
+    min_amount: float = 0.0
+    min_cost: float = 0.0
+
+    @classmethod
+    def from_market(cls, market: Mapping, precision_mode: int = ccxt.TICK_SIZE) -> Optional["StepTable"]:
+        precision = market.get("precision") or {}
+        if precision.get("amount") is None or precision.get("price") is None:
+            return None
+
+        def step(value) -> float:
+            return float(value) if precision_mode == ccxt.TICK_SIZE else 10.0 ** -int(value)
+
+        limits = market.get("limits") or {}
+        amount_step, price_step = step(precision["amount"]), step(precision["price"])
+        return cls(
+            amount_step=amount_step,
+            price_step=price_step,
+            amount_decimals=_decimals(amount_step),
+            price_decimals=_decimals(price_step),
+            min_amount=float((limits.get("amount") or {}).get("min") or 0.0),
+            min_cost=float((limits.get("cost") or {}).get("min") or 0.0),
+        )
+
+    def amount(self, value: float) -> float:
+        # the epsilon keeps exact multiples such as 0.3 / 0.1 from flooring one step short
+        return round(math.floor(value / self.amount_step + 1e-9) * self.amount_step, self.amount_decimals)
+
+    def price(self, value: float) -> float:
+        return round(round(value / self.price_step) * self.price_step, self.price_decimals)
+
+
+def step_tables(markets: Mapping[str, Mapping], precision_mode: int = ccxt.TICK_SIZE) -> Dict[str, StepTable]:
+    tables = {}
+    for symbol, market in markets.items():
+        table = StepTable.from_market(market, precision_mode)
+        if table is not None:
+            tables[symbol] = table
+    return tables
+
+
+def _round(
+    exchange: ccxt.binance,
     symbol: str,
-    side: str,
     amount: float,
-    price: Optional[float] = None,
-    order_type: str = "limit",
-) -> Dict:
-    rounded_amount, rounded_price = _round(self.exchange, symbol, amount, price)
-    logger.info(
-        "Creating order %s %s amount=%sâ†’%s price=%sâ†’%s",
-        side,
-        symbol,
-        amount,
-        rounded_amount,
-        price,
-        rounded_price,
-    )
-    order = self.exchange.create_order(
-        symbol,
-        order_type,
-        side,
-        rounded_amount,
-        rounded_price,
-        params={"newClientOrderId": _order_id()},
+    price: Optional[float],
+    steps: Optional[Mapping[str, StepTable]] = None,
+):
+    table = steps.get(symbol) if steps else None
+    if table is None:
+        # no step table for this market: let ccxt format it
+        rounded_amount = float(exchange.amount_to_precision(symbol, amount))
+        rounded_price = float(exchange.price_to_precision(symbol, price)) if price is not None else None
+        return rounded_amount, rounded_price
+    return table.amount(amount), table.price(price) if price is not None else None
+
+
+def _order_id() -> str:
+    return f"bot-{uuid.uuid4().hex[:16]}"
+
+
+class MarketMetadataCache:
+    """Exchange markets as JSON on disk with the time they were fetched.
+
+    Without a ``path`` nothing is persisted and every process loads markets
+    from the exchange once.
+    """
+
+    def __init__(self, path: Optional[Path], ttl: float = MARKETS_TTL_SECONDS) -> None:
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl
+
+    def load(self) -> Optional[Tuple[float, List[Dict]]]:
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text())
+            return float(data["fetched_at"]), list(data["markets"])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable market cache %s: %s", self.path, exc)
+            return None
+
+    def save(self, markets: List[Dict], fetched_at: float) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"fetched_at": fetched_at, "markets": markets}, default=str))
+        os.replace(tmp, self.path)
+
+    def is_stale(self, fetched_at: float, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) - fetched_at >= self.ttl
+
+
+def _default_cache_path(settings) -> Optional[Path]:
+    state_path = getattr(settings, "state_path", None)
+    if not state_path:
+        return None
+    suffix = "-testnet" if settings.binance_testnet else ""
+    return Path(state_path) / f"binance_markets{suffix}.json"
+
+
+class BinanceAdapter:
+    """Binance spot client that loads market metadata once and keeps it fresh in the background.
+
+    Markets come from the on-disk cache when it is younger than the TTL, so a
+    restart sends its first order without a ``load_markets`` round trip. Once
+    the TTL passes, the next call schedules a reload on a background thread
+    while orders keep using the current tables.
+    """
+
+    def __init__(self, settings=None, exchange=None, cache: Optional[MarketMetadataCache] = None) -> None:
+        self.settings = settings or get_settings()
+        self.exchange = exchange or mk_exchange(self.settings)
+        ttl = float(getattr(self.settings, "market_cache_ttl_seconds", MARKETS_TTL_SECONDS))
+        self.cache = cache or MarketMetadataCache(_default_cache_path(self.settings), ttl=ttl)
+        self.steps: Dict[str, StepTable] = {}
+        self.fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="binance-markets")
+        cached = self.cache.load()
+        if cached is not None:
+            fetched_at, markets = cached
+            self._install(markets, fetched_at)
+            logger.info("Loaded %d markets from %s", len(markets), self.cache.path)
+        else:
+            self.refresh_markets()
+
+    def _install(self, markets: List[Dict], fetched_at: float) -> None:
+        if markets:
+            self.exchange.set_markets(markets)
+        precision_mode = getattr(self.exchange, "precisionMode", ccxt.TICK_SIZE)
+        tables = step_tables({market["symbol"]: market for market in markets}, precision_mode)
+        with self._lock:
+            self.steps = tables
+            self.fetched_at = fetched_at
+
+    def refresh_markets(self) -> int:
+        """Reload markets from the exchange, rebuild the step tables and persist them."""
+        loaded = self.exchange.load_markets(reload=True) or {}
+        markets = list(loaded.values())
+        fetched_at = time.time()
+        self._install(markets, fetched_at)
+        self.cache.save(markets, fetched_at)
+        return len(markets)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            count = self.refresh_markets()
+            logger.info("Refreshed %d markets", count)
+        except Exception as exc:  # pragma: no cover - network errors keep the previous tables
+            logger.warning("Market refresh failed: %s", exc)
+
+    def maybe_refresh(self) -> Optional[Future]:
+        with self._lock:
+            if not self.cache.is_stale(self.fetched_at):
+                return None
+            if self._pending is not None and not self._pending.done():
+                return None
+            self._pending = self._refresher.submit(self._refresh_in_background)
+            return self._pending
+
+    def close(self) -> None:
+        self._refresher.shutdown(wait=True)
+
+    @retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
+    def get_balance(self) -> Dict[str, float]:
+        balance = self.exchange.fetch_balance()
+        return {k: float(v["free"]) for k, v in balance.get("free", {}).items()}
+
+    @retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
+    def fetch_ohlcv(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500):
+        return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    def create_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        order_type: str = "limit",
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        """Round and send an order under one client order id, however many attempts it takes.
+
+        If a retry is rejected as a duplicate, an earlier attempt reached the
+        exchange before failing locally, and that order is returned instead.
+        """
+        self.maybe_refresh()
+        rounded_amount, rounded_price = _round(self.exchange, symbol, amount, price, self.steps)
+        client_order_id = client_order_id or _order_id()
+        logger.info(
+            "Creating order %s %s amount=%s→%s price=%s→%s id=%s",
+            side,
+            symbol,
+            amount,
+            rounded_amount,
+            price,
+            rounded_price,
+            client_order_id,
+        )
+        try:
+            return self._send_order(symbol, order_type, side, rounded_amount, rounded_price, client_order_id)
+        except ccxt.InvalidOrder as exc:
+            if "Duplicate order" not in str(exc):
+                raise
+            logger.warning("Order %s already on the exchange; fetching it", client_order_id)
+            return self.exchange.fetch_order(None, symbol, params={"origClientOrderId": client_order_id})
+
+    # rejected orders are final; anything else (timeouts, rate limits) is retried with the same id
+    @retry(
+        reraise=True,
+        retry=retry_if_not_exception_type(ccxt.InvalidOrder),
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
     )
-    return order
-all = ["BinanceAdapter", "OrderResponse"]
+    def _send_order(
+        self,
+        symbol: str,
+        order_type: str,
+        side: str,
+        amount: float,
+        price: Optional[float],
+        client_order_id: str,
+    ) -> Dict:
+        return self.exchange.create_order(
+            symbol,
+            order_type,
+            side,
+            amount,
+            price,
+            params={"newClientOrderId": client_order_id},
+        )
+
+
+# one adapter per (account, network) in this process, shared by every executor
+_ADAPTERS: Dict[Tuple[str, bool], BinanceAdapter] = {}
+_ADAPTERS_LOCK = threading.Lock()
+
+
+def get_adapter(settings=None) -> BinanceAdapter:
+    """The process-wide adapter for ``settings``' account, created on first use."""
+    settings = settings or get_settings()
+    key = (settings.binance_api_key, bool(settings.binance_testnet))
+    with _ADAPTERS_LOCK:
+        adapter = _ADAPTERS.get(key)
+        if adapter is None:
+            adapter = _ADAPTERS[key] = BinanceAdapter(settings=settings)
+        return adapter
+
+
+__all__ = [
+    "BinanceAdapter",
+    "MARKETS_TTL_SECONDS",
+    "MarketMetadataCache",
+    "OrderResponse",
+    "StepTable",
+    "get_adapter",
+    "mk_exchange",
+    "step_tables",
+]
@@ -6,40 +6,48 @@ from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
+
 @dataclass
 class Fill:
-price: float
-fee: float
+    price: float
+    fee: float
+
 
 class PaperWallet:
-def __init__(self, balance: Dict[str, float]):
-self.balance = balance.copy()
-self.equity_history: List[tuple[str, float]] = []
-
-def execute(self, symbol: str, side: str, quantity: float, price: float) -> Fill:
-    base = symbol.split("/")[0]
-    quote = symbol.split("/")[1]
-    notional = quantity * price
-    fee = notional * 0.001
-    if side.lower() == "buy":
-        if self.balance.get(quote, 0.0) < notional + fee:
-            raise ValueError("Insufficient balance")
-        self.balance[quote] = self.balance.get(quote, 0.0) - notional - fee
-        self.balance[base] = self.balance.get(base, 0.0) + quantity
-    else:
-        if self.balance.get(base, 0.0) < quantity:
-            raise ValueError("Insufficient balance")
-        self.balance[base] = self.balance.get(base, 0.0) - quantity
-        self.balance[quote] = self.balance.get(quote, 0.0) + notional - fee
-    total = sum(self.balance.values())
-    self.equity_history.append(("UTC", total))
-    return Fill(price=price, fee=fee)
-
-def total_value(self, prices: Dict[str, float] | None = None) -> float:
-    if not prices:
-        return sum(self.balance.values())
-    total = 0.0
-    for asset, qty in self.balance.items():
-        total += qty * prices.get(asset, 1.0)
-    return total
-all = ["PaperWallet", "Fill"]
+    def __init__(self, balance: Dict[str, float], fee_bps: float = 10.0, slippage_bps: float = 0.0):
+        self.balance = balance.copy()
+        self.fee_bps = fee_bps
+        self.slippage_bps = slippage_bps
+        self.equity_history: List[tuple[str, float]] = []
+
+    def execute(self, symbol: str, side: str, quantity: float, price: float) -> Fill:
+        base = symbol.split("/")[0]
+        quote = symbol.split("/")[1]
+        slip = self.slippage_bps / 10_000.0
+        price = price * (1.0 + slip) if side.lower() == "buy" else price * (1.0 - slip)
+        notional = quantity * price
+        fee = notional * self.fee_bps / 10_000.0
+        if side.lower() == "buy":
+            if self.balance.get(quote, 0.0) < notional + fee:
+                raise ValueError("Insufficient balance")
+            self.balance[quote] = self.balance.get(quote, 0.0) - notional - fee
+            self.balance[base] = self.balance.get(base, 0.0) + quantity
+        else:
+            if self.balance.get(base, 0.0) < quantity:
+                raise ValueError("Insufficient balance")
+            self.balance[base] = self.balance.get(base, 0.0) - quantity
+            self.balance[quote] = self.balance.get(quote, 0.0) + notional - fee
+        total = sum(self.balance.values())
+        self.equity_history.append(("UTC", total))
+        return Fill(price=price, fee=fee)
+
+    def total_value(self, prices: Dict[str, float] | None = None) -> float:
+        if not prices:
+            return sum(self.balance.values())
+        total = 0.0
+        for asset, qty in self.balance.items():
+            total += qty * prices.get(asset, 1.0)
+        return total
+
+
+__all__ = ["PaperWallet", "Fill"]
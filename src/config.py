@@ -2,36 +2,54 @@
 
 import functools
 from dataclasses import dataclass
-from typing import List
+from typing import Annotated, List
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
-binance_api_key: str = ""
-binance_api_secret: str = ""
-binance_testnet: bool = True
-base_symbols: List[str] = ["BTC/USDT", "ETH/USDT"]
-timeframe: str = "1h"
-risk_per_trade: float = 0.01
-max_concurrent_positions: int = 3
-max_total_exposure: float = 0.8
-max_daily_loss: float = 0.03
-db_url: str = "sqlite:///./data/bot.db"
-telegram_bot_token: str = ""
-telegram_chat_id: str = ""
-allow_toggle: bool = False
-state_path: str = "./data/state"
-poll_interval_seconds: int = 60
-slippage_bps: int = 5
-taker_fee_bps: int = 10
-ml_probability_threshold: float = 0.55
-telegram_daily_report_time: str = "08:00"
-telegram_weekly_report_time: str = "18:00"
-
-model_config = SettingsConfigDict(env_file=".env", extra="ignore")
-
-def symbols_list(self) -> List[str]:
-    return [s.strip() for s in self.base_symbols]
+    binance_api_key: str = ""
+    binance_api_secret: str = ""
+    binance_testnet: bool = True
+    base_symbols: Annotated[List[str], NoDecode] = ["BTC/USDT", "ETH/USDT"]
+    timeframe: str = "1h"
+    risk_per_trade: float = 0.01
+    max_concurrent_positions: int = 3
+    max_total_exposure: float = 0.8
+    max_daily_loss: float = 0.03
+    db_url: str = "sqlite:///./data/bot.db"
+    market_data_backend: str = "sqlite"  # "sqlite" or "columnar"
+    columnar_path: str = "./data/candles"
+    telegram_bot_token: str = ""
+    telegram_chat_id: str = ""
+    allow_toggle: bool = False
+    state_path: str = "./data/state"
+    model_path: str = "./data/models"
+    model_checkpoint_seconds: int = 300
+    market_cache_ttl_seconds: int = 3600
+    max_orders_in_flight: int = 4
+    poll_interval_seconds: int = 60
+    slippage_bps: int = 5
+    taker_fee_bps: int = 10
+    ml_probability_threshold: float = 0.55
+    telegram_daily_report_time: str = "08:00"
+    telegram_weekly_report_time: str = "18:00"
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    @field_validator("base_symbols", mode="before")
+    @classmethod
+    def _split_symbols(cls, value):
+        # .env uses BASE_SYMBOLS=BTC/USDT,ETH/USDT rather than a JSON list
+        if isinstance(value, str):
+            return [s for s in value.split(",") if s.strip()]
+        return value
+
+    def symbols_list(self) -> List[str]:
+        return [s.strip() for s in self.base_symbols]
+
+
 @functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
-return Settings()
+    return Settings()
@@ -0,0 +1,214 @@
+﻿from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_UNIT_MS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Length of a ccxt-style timeframe ("1m", "4h", "1d", ...) in milliseconds."""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _UNIT_MS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(amount) * _UNIT_MS[unit]
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate_per_sec`` apart across all threads."""
+
+    def __init__(self, rate_per_sec: float) -> None:
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Last stored bar per (symbol, timeframe), persisted as JSON after every flush."""
+
+    path: Path
+    _state: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+        if self.path.exists():
+            try:
+                self._state = {k: int(v) for k, v in json.loads(self.path.read_text()).items()}
+            except (json.JSONDecodeError, ValueError) as exc:
+                logger.error("Ignoring unreadable backfill checkpoint %s: %s", self.path, exc)
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str) -> str:
+        return f"{symbol}|{timeframe}"
+
+    def get(self, symbol: str, timeframe: str) -> Optional[int]:
+        with self._lock:
+            return self._state.get(self._key(symbol, timeframe))
+
+    def update(self, symbol: str, timeframe: str, last_ts: int) -> None:
+        with self._lock:
+            self._state[self._key(symbol, timeframe)] = int(last_ts)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._state, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+
+@dataclass
+class BackfillReport:
+    pages: int = 0
+    bars: int = 0
+    seconds: float = 0.0
+    per_symbol: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bars_per_sec(self) -> float:
+        return self.bars / self.seconds if self.seconds > 0 else 0.0
+
+
+def backfill_symbol(
+    exchange,
+    service,
+    symbol: str,
+    timeframe: str,
+    since_ms: int,
+    until_ms: int,
+    limiter: RateLimiter,
+    checkpoint: BackfillCheckpoint,
+    page_limit: int = 1000,
+    flush_rows: int = 20_000,
+    write_lock: Optional[threading.Lock] = None,
+) -> Tuple[int, int]:
+    """Page ``exchange.fetch_ohlcv`` forward from the checkpoint; returns (pages, bars).
+
+    Bars still open at ``until_ms`` are left for a later run.
+    """
+    step = timeframe_to_ms(timeframe)
+    done = checkpoint.get(symbol, timeframe)
+    cursor = max(since_ms, done + step) if done is not None else since_ms
+    write_lock = write_lock or threading.Lock()
+    pages = bars = 0
+    pending: List[np.ndarray] = []
+    pending_rows = 0
+
+    def flush() -> None:
+        nonlocal pending, pending_rows
+        if not pending:
+            return
+        batch = np.concatenate(pending)
+        with write_lock:
+            service.store(symbol, timeframe, batch)
+        checkpoint.update(symbol, timeframe, int(batch[-1, 0]))
+        pending, pending_rows = [], 0
+
+    while cursor < until_ms:
+        limiter.acquire()
+        page = exchange.fetch_ohlcv(symbol, timeframe, since=cursor, limit=page_limit)
+        pages += 1
+        if not page:
+            break
+        rows = np.asarray(page, dtype=np.float64)
+        # only bars that closed by ``until_ms``: the store never overwrites, so a partial bar would stick
+        rows = rows[(rows[:, 0] >= cursor) & (rows[:, 0] + step <= until_ms)]
+        if len(rows) == 0:
+            break
+        pending.append(rows)
+        pending_rows += len(rows)
+        bars += len(rows)
+        cursor = int(rows[-1, 0]) + step
+        if pending_rows >= flush_rows:
+            flush()
+    flush()
+    return pages, bars
+
+
+def run_backfill(
+    exchange,
+    service,
+    symbols: Iterable[str],
+    timeframe: str,
+    since_ms: int,
+    checkpoint_path: Path,
+    until_ms: Optional[int] = None,
+    max_workers: int = 4,
+    rate_per_sec: float = 10.0,
+    page_limit: int = 1000,
+    flush_rows: int = 20_000,
+) -> BackfillReport:
+    """Backfill ``symbols`` concurrently under one shared request rate limit."""
+    until_ms = until_ms if until_ms is not None else int(time.time() * 1000)
+    limiter = RateLimiter(rate_per_sec)
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+    write_lock = threading.Lock()
+    report = BackfillReport()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                backfill_symbol,
+                exchange,
+                service,
+                symbol,
+                timeframe,
+                since_ms,
+                until_ms,
+                limiter,
+                checkpoint,
+                page_limit,
+                flush_rows,
+                write_lock,
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            pages, bars = future.result()
+            report.pages += pages
+            report.bars += bars
+            report.per_symbol[symbol] = bars
+            logger.info("Backfilled %d %s %s bars in %d pages", bars, symbol, timeframe, pages)
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        "Backfill finished: %d pages, %d bars in %.2fs (%.1f pages/s, %.0f bars/s)",
+        report.pages,
+        report.bars,
+        report.seconds,
+        report.pages_per_sec,
+        report.bars_per_sec,
+    )
+    return report
+
+
+__all__ = [
+    "BackfillCheckpoint",
+    "BackfillReport",
+    "RateLimiter",
+    "backfill_symbol",
+    "run_backfill",
+    "timeframe_to_ms",
+]
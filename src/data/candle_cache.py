@@ -0,0 +1,123 @@
+﻿from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .market_data import OHLCV_COLUMNS, MarketDataService, to_ohlcv_arrays
+
+logger = logging.getLogger(__name__)
+
+
+class OHLCVRingBuffer:
+    """Fixed-size OHLCV window for one (symbol, timeframe).
+
+    Every bar is written twice, at ``pos`` and ``pos + capacity``, so the most
+    recent ``capacity`` bars always form one contiguous slice and windows can be
+    handed out as views instead of copies.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((2 * capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp_ns(self) -> Optional[int]:
+        if self._size == 0:
+            return None
+        return int(self._ts[self._head + self.capacity - 1])
+
+    def append(self, ts_ns: np.ndarray, values: np.ndarray) -> None:
+        count = len(ts_ns)
+        if count == 0:
+            return
+        if count > self.capacity:
+            ts_ns = ts_ns[-self.capacity :]
+            values = values[-self.capacity :]
+            count = self.capacity
+        positions = (self._head + np.arange(count)) % self.capacity
+        self._ts[positions] = ts_ns
+        self._ts[positions + self.capacity] = ts_ns
+        self._values[positions] = values
+        self._values[positions + self.capacity] = values
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def window(self, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Views over the newest ``limit`` bars; overwritten by later appends."""
+        count = self._size if limit is None else min(limit, self._size)
+        end = self._head + self.capacity
+        return self._ts[end - count : end], self._values[end - count : end]
+
+    def frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        ts, values = self.window(limit)
+        # the index is copied (8 bytes/bar) because derived frames such as cached
+        # features keep it alive after the buffer has moved on
+        index = pd.DatetimeIndex(ts.copy().view("datetime64[ns]"), name="timestamp")
+        return pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+
+@dataclass
+class CachedMarketData:
+    """Read-through cache over ``MarketDataService`` that only pulls new bars.
+
+    Exposes the same ``fetch`` signature so ``PaperBot`` can use it in place of
+    the service. Returned frames share memory with the ring buffer and are only
+    valid until the next ``fetch``/``refresh`` for the same key.
+    """
+
+    service: MarketDataService
+    capacity: int = 500
+    _buffers: Dict[Tuple[str, str], OHLCVRingBuffer] = field(default_factory=dict, init=False, repr=False)
+
+    def buffer(self, symbol: str, timeframe: str) -> OHLCVRingBuffer:
+        key = (symbol, timeframe)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = OHLCVRingBuffer(self.capacity)
+            self._buffers[key] = buf
+        return buf
+
+    def refresh(self, symbol: str, timeframe: str) -> int:
+        """Pull bars newer than the cached tail; returns how many were added."""
+        buf = self.buffer(symbol, timeframe)
+        last_ns = buf.last_timestamp_ns
+        since = None if last_ns is None else last_ns // 1_000_000
+        delta = self.service.fetch(symbol, timeframe, since=since, limit=self.capacity)
+        if delta is None or delta.empty:
+            return 0
+        ts_ms, values = to_ohlcv_arrays(delta)
+        ts_ns = ts_ms * 1_000_000
+        if last_ns is not None:
+            newer = ts_ns > last_ns
+            ts_ns, values = ts_ns[newer], values[newer]
+        buf.append(ts_ns, values)
+        return len(ts_ns)
+
+    def fetch(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500) -> pd.DataFrame:
+        self.refresh(symbol, timeframe)
+        frame = self.buffer(symbol, timeframe).frame(limit)
+        if since is not None:
+            frame = frame.loc[frame.index > pd.Timestamp(since, unit="ms")]
+        return frame
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        if symbol is None:
+            self._buffers.clear()
+            return
+        for key in [k for k in self._buffers if k[0] == symbol and (timeframe is None or k[1] == timeframe)]:
+            del self._buffers[key]
+
+
+__all__ = ["CachedMarketData", "OHLCVRingBuffer"]
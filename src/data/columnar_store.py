@@ -0,0 +1,200 @@
+﻿from __future__ import annotations
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from .market_data import OHLCV_COLUMNS, IngestReport, MarketDataService, candles, to_ohlcv_arrays
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FILE = "timestamp.i8"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _column_file(column: str) -> str:
+    return f"{column}.f8"
+
+
+def _to_ns(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(pd.Timestamp(value).value)
+
+
+class ColumnarCandleStore:
+    """Append-only column files per (symbol, timeframe), read through ``np.memmap``.
+
+    Layout: ``<root>/<symbol>/<timeframe>/timestamp.i8`` holds epoch nanoseconds
+    in ascending order, with one ``<column>.f8`` file per OHLCV column. The
+    timestamp file is written last, so its length is the committed row count.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[Tuple[str, str], Tuple[int, np.ndarray, Dict[str, np.ndarray]]] = {}
+
+    def _dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / _SAFE_NAME.sub("_", symbol) / _SAFE_NAME.sub("_", timeframe)
+
+    def _row_count(self, path: Path) -> int:
+        ts_path = path / TIMESTAMP_FILE
+        return ts_path.stat().st_size // 8 if ts_path.exists() else 0
+
+    def columns(self, symbol: str, timeframe: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Read-only memory maps over every committed row."""
+        key = (symbol, timeframe)
+        path = self._dir(symbol, timeframe)
+        rows = self._row_count(path)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == rows:
+            return cached[1], cached[2]
+        if rows == 0:
+            ts = np.empty(0, dtype=np.int64)
+            values = {col: np.empty(0, dtype=np.float64) for col in OHLCV_COLUMNS}
+        else:
+            ts = np.memmap(path / TIMESTAMP_FILE, dtype=np.int64, mode="r", shape=(rows,))
+            values = {
+                col: np.memmap(path / _column_file(col), dtype=np.float64, mode="r", shape=(rows,))
+                for col in OHLCV_COLUMNS
+            }
+        self._maps[key] = (rows, ts, values)
+        return ts, values
+
+    def last_timestamp_ns(self, symbol: str, timeframe: str) -> Optional[int]:
+        ts, _ = self.columns(symbol, timeframe)
+        return int(ts[-1]) if len(ts) else None
+
+    def append(self, symbol: str, timeframe: str, ts_ns: np.ndarray, values: np.ndarray) -> int:
+        """Append bars newer than the stored tail; older or duplicate bars are skipped."""
+        order = np.argsort(ts_ns, kind="stable")
+        ts_ns, values = ts_ns[order], values[order]
+        keep = np.ones(len(ts_ns), dtype=bool)
+        keep[1:] = ts_ns[1:] != ts_ns[:-1]
+        last = self.last_timestamp_ns(symbol, timeframe)
+        if last is not None:
+            keep &= ts_ns > last
+        ts_ns, values = ts_ns[keep], values[keep]
+        if len(ts_ns) == 0:
+            return 0
+        path = self._dir(symbol, timeframe)
+        path.mkdir(parents=True, exist_ok=True)
+        committed = self._row_count(path)
+        for i, col in enumerate(OHLCV_COLUMNS):
+            col_path = path / _column_file(col)
+            with col_path.open("r+b" if col_path.exists() else "wb") as handle:
+                # drop bytes left behind by a write interrupted before the timestamp commit
+                handle.truncate(committed * 8)
+                handle.seek(committed * 8)
+                handle.write(np.ascontiguousarray(values[:, i], dtype=np.float64).tobytes())
+        with (path / TIMESTAMP_FILE).open("ab") as handle:
+            handle.write(np.ascontiguousarray(ts_ns, dtype=np.int64).tobytes())
+        return len(ts_ns)
+
+    def range(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Views over bars with ``start_ns <= ts <= end_ns`` found by binary search."""
+        ts, values = self.columns(symbol, timeframe)
+        lo = 0 if start_ns is None else int(np.searchsorted(ts, start_ns, side="left"))
+        hi = len(ts) if end_ns is None else int(np.searchsorted(ts, end_ns, side="right"))
+        return ts[lo:hi], {col: arr[lo:hi] for col, arr in values.items()}
+
+
+def _frame(ts: np.ndarray, values: Dict[str, np.ndarray]) -> pd.DataFrame:
+    index = pd.DatetimeIndex(np.asarray(ts).view("datetime64[ns]"), name="timestamp")
+    return pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+
+@dataclass
+class ColumnarMarketDataService:
+    """``MarketDataService`` drop-in backed by ``ColumnarCandleStore``.
+
+    Frames returned by ``fetch``/``fetch_range`` wrap read-only memory maps.
+    """
+
+    root: str
+    store_backend: ColumnarCandleStore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.store_backend = ColumnarCandleStore(Path(self.root))
+
+    def fetch(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500) -> pd.DataFrame:
+        start_ns = None if since is None else int(since) * 1_000_000 + 1
+        ts, values = self.store_backend.range(symbol, timeframe, start_ns=start_ns)
+        if limit is not None and len(ts) > limit:
+            ts = ts[-limit:]
+            values = {col: arr[-limit:] for col, arr in values.items()}
+        return _frame(ts, values)
+
+    def fetch_range(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        ts, values = self.store_backend.range(symbol, timeframe, _to_ns(start), _to_ns(end))
+        return _frame(ts, values)
+
+    def store(self, symbol: str, timeframe: str, data, chunk_rows: Optional[int] = None) -> IngestReport:
+        started = time.perf_counter()
+        if data is None or len(data) == 0:
+            return IngestReport(rows=0, inserted=0, seconds=0.0)
+        ts_ms, values = to_ohlcv_arrays(data)
+        inserted = self.store_backend.append(symbol, timeframe, ts_ms * 1_000_000, values)
+        report = IngestReport(rows=len(ts_ms), inserted=inserted, seconds=time.perf_counter() - started)
+        logger.info(
+            "Stored %d/%d %s %s candles in %.3fs (%.0f rows/s)",
+            inserted,
+            report.rows,
+            symbol,
+            timeframe,
+            report.seconds,
+            report.rows_per_sec,
+        )
+        return report
+
+
+def migrate_sqlite_to_columnar(
+    source: MarketDataService,
+    target: ColumnarMarketDataService,
+    chunk_rows: int = 100_000,
+) -> Dict[Tuple[str, str], int]:
+    """Copy every (symbol, timeframe) from the ``candles`` table into column files."""
+    copied: Dict[Tuple[str, str], int] = {}
+    with source.engine.begin() as conn:
+        keys = conn.execute(select(candles.c.symbol, candles.c.timeframe).distinct()).fetchall()
+    for symbol, timeframe in keys:
+        last = ""
+        total = 0
+        while True:
+            with source.engine.begin() as conn:
+                rows = conn.exec_driver_sql(
+                    "SELECT timestamp, open, high, low, close, volume FROM candles "
+                    "WHERE symbol = ? AND timeframe = ? AND timestamp > ? ORDER BY timestamp LIMIT ?",
+                    (symbol, timeframe, last, chunk_rows),
+                ).fetchall()
+            if not rows:
+                break
+            stamps, *cols = zip(*rows)
+            ts_ns = np.array(stamps, dtype="datetime64[ns]").astype(np.int64)
+            values = np.column_stack([np.asarray(col, dtype=np.float64) for col in cols])
+            total += target.store_backend.append(symbol, timeframe, ts_ns, values)
+            last = stamps[-1]
+        copied[(symbol, timeframe)] = total
+        logger.info("Migrated %d %s %s candles to columnar store", total, symbol, timeframe)
+    return copied
+
+
+__all__ = [
+    "ColumnarCandleStore",
+    "ColumnarMarketDataService",
+    "migrate_sqlite_to_columnar",
+]
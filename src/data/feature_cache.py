@@ -0,0 +1,86 @@
+﻿from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+
+from .features import compute_features
+
+CacheKey = Tuple[str, str, object, Hashable]
+
+
+class FeatureCache:
+    """Bounded LRU of feature frames keyed by (symbol, timeframe, last bar, spec).
+
+    One closed bar is featurized once and the frame is shared by the bot, the
+    strategies and the online model. Callers must treat cached frames as
+    read-only.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[CacheKey, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key: CacheKey, frame: pd.DataFrame) -> None:
+        with self._lock:
+            self._entries[key] = frame
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        spec: Hashable = "default",
+        compute: Callable[[pd.DataFrame], pd.DataFrame] = compute_features,
+    ) -> pd.DataFrame:
+        key = (symbol, timeframe, df.index[-1], spec)
+        frame = self.get(key)
+        if frame is None:
+            frame = compute(df)
+            self.put(key, frame)
+        return frame
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+__all__ = ["FeatureCache"]
@@ -1,37 +1,199 @@
 ﻿from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
 try:
-import pandas as pd
-except ImportError: # pragma: no cover
-pd = None # type: ignore
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None  # type: ignore
 try:
-import pandas_ta as ta
-except ImportError: # pragma: no cover
-ta = None # type: ignore
-
-def compute_features(df: pd.DataFrame) -> pd.DataFrame:
-if pd is None or ta is None:
-raise ImportError("pandas and pandas_ta are required for feature computation")
-feats = pd.DataFrame(index=df.index)
-feats["sma_10"] = df["close"].rolling(window=10, min_periods=10).mean()
-feats["sma_50"] = df["close"].rolling(window=50, min_periods=50).mean()
-feats["sma_200"] = df["close"].rolling(window=200, min_periods=200).mean()
-feats["rsi"] = ta.rsi(df["close"], length=14)
-feats["atr"] = ta.atr(df["high"], df["low"], df["close"], length=14)
-bands = ta.bbands(df["close"], length=20)
-feats["bollinger_low"] = bands["BBL_20_2.0"]
-feats["bollinger_mid"] = bands["BBM_20_2.0"]
-feats["bollinger_high"] = bands["BBU_20_2.0"]
-feats["roc"] = ta.roc(df["close"], length=12)
-feats["volatility"] = df["close"].rolling(window=20, min_periods=20).std()
-return feats
-
-def make_feature_label(df: pd.DataFrame):
-feats = compute_features(df)
-forward_return = df["close"].shift(-1) / df["close"] - 1.0
-label = (forward_return > 0).astype(int)
-aligned = feats.iloc[:-1]
-label = label.iloc[:-1]
-return aligned, label
-
-all = ["compute_features", "make_feature_label"]
+    import pandas_ta as ta
+except ImportError:  # pragma: no cover
+    ta = None  # type: ignore
+
+FEATURE_COLUMNS = [
+    "sma_10",
+    "sma_50",
+    "sma_200",
+    "rsi",
+    "atr",
+    "bollinger_low",
+    "bollinger_mid",
+    "bollinger_high",
+    "roc",
+    "volatility",
+]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """One named feature: the OHLCV columns it reads, the bars it needs and what it builds on.
+
+    ``lookback`` counts the bars of its inputs (including the current one) needed
+    before the first non-NaN value; ``compute`` receives the candle frame and the
+    already computed dependencies.
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    lookback: int
+    compute: Callable[["pd.DataFrame", Dict[str, "pd.Series"]], "pd.Series"]
+    deps: Tuple[str, ...] = ()
+
+
+FEATURE_REGISTRY: Dict[str, FeatureSpec] = {}
+
+
+def register_feature(spec: FeatureSpec) -> FeatureSpec:
+    for dep in spec.deps:
+        if dep not in FEATURE_REGISTRY:
+            raise KeyError(f"Feature {spec.name} depends on unknown feature {dep}")
+    FEATURE_REGISTRY[spec.name] = spec
+    return spec
+
+
+def _require_ta():
+    if ta is None:
+        raise ImportError("pandas_ta is required for this feature")
+    return ta
+
+
+def _sma(length: int) -> Callable:
+    return lambda df, _: df["close"].rolling(window=length, min_periods=length).mean()
+
+
+register_feature(FeatureSpec("sma_10", ("close",), 10, _sma(10)))
+register_feature(FeatureSpec("sma_50", ("close",), 50, _sma(50)))
+register_feature(FeatureSpec("sma_200", ("close",), 200, _sma(200)))
+register_feature(
+    FeatureSpec("rsi", ("close",), 15, lambda df, _: _require_ta().rsi(df["close"], length=14))
+)
+register_feature(
+    FeatureSpec(
+        "atr",
+        ("high", "low", "close"),
+        15,
+        lambda df, _: _require_ta().atr(df["high"], df["low"], df["close"], length=14),
+    )
+)
+# same rolling mean / population std pair that pandas_ta's bbands(length=20) builds on
+register_feature(FeatureSpec("bollinger_mid", ("close",), 20, _sma(20)))
+register_feature(
+    FeatureSpec(
+        "bollinger_std",
+        ("close",),
+        20,
+        lambda df, _: df["close"].rolling(window=20, min_periods=20).std(ddof=0),
+    )
+)
+register_feature(
+    FeatureSpec(
+        "bollinger_low",
+        (),
+        1,
+        lambda _, f: f["bollinger_mid"] - 2.0 * f["bollinger_std"],
+        deps=("bollinger_mid", "bollinger_std"),
+    )
+)
+register_feature(
+    FeatureSpec(
+        "bollinger_high",
+        (),
+        1,
+        lambda _, f: f["bollinger_mid"] + 2.0 * f["bollinger_std"],
+        deps=("bollinger_mid", "bollinger_std"),
+    )
+)
+register_feature(
+    FeatureSpec("roc", ("close",), 13, lambda df, _: _require_ta().roc(df["close"], length=12))
+)
+register_feature(
+    FeatureSpec(
+        "volatility",
+        ("close",),
+        20,
+        lambda df, _: df["close"].rolling(window=20, min_periods=20).std(),
+    )
+)
+
+
+def resolve_features(names: Iterable[str]) -> List[str]:
+    """``names`` plus everything they depend on, dependencies first."""
+    ordered: List[str] = []
+    visiting: set = set()
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        if name not in FEATURE_REGISTRY:
+            raise KeyError(f"Unknown feature: {name}")
+        if name in visiting:
+            raise ValueError(f"Circular feature dependency at {name}")
+        visiting.add(name)
+        for dep in FEATURE_REGISTRY[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def warmup_bars(names: Optional[Iterable[str]] = None) -> int:
+    """Bars of history needed before every requested feature has a value."""
+    memo: Dict[str, int] = {}
+
+    def bars(name: str) -> int:
+        if name not in memo:
+            spec = FEATURE_REGISTRY[name]
+            upstream = max((bars(dep) for dep in spec.deps), default=1)
+            memo[name] = spec.lookback + upstream - 1
+        return memo[name]
+
+    return max((bars(name) for name in resolve_features(FEATURE_COLUMNS if names is None else names)), default=0)
+
+
+def compute_features(df: pd.DataFrame, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Feature frame for ``df``; all of ``FEATURE_COLUMNS`` by default.
+
+    With ``names`` only those features and their dependencies are computed and
+    returned.
+    """
+    if pd is None:
+        raise ImportError("pandas is required for feature computation")
+    if names is None and ta is None:
+        raise ImportError("pandas and pandas_ta are required for feature computation")
+    wanted = FEATURE_COLUMNS if names is None else list(names)
+    computed: Dict[str, pd.Series] = {}
+    for name in resolve_features(wanted):
+        computed[name] = FEATURE_REGISTRY[name].compute(df, computed)
+    columns = list(wanted)
+    if names is not None:
+        columns += [name for name in computed if name not in columns]
+    feats = pd.DataFrame(index=df.index)
+    for name in columns:
+        feats[name] = computed[name]
+    return feats
+
+
+def make_feature_label(df: pd.DataFrame, features: Optional[pd.DataFrame] = None):
+    feats = compute_features(df) if features is None else features
+    forward_return = df["close"].shift(-1) / df["close"] - 1.0
+    label = (forward_return > 0).astype(int)
+    aligned = feats.iloc[:-1]
+    label = label.iloc[:-1]
+    return aligned, label
+
+
+__all__ = [
+    "FEATURE_COLUMNS",
+    "FEATURE_REGISTRY",
+    "FeatureSpec",
+    "compute_features",
+    "make_feature_label",
+    "register_feature",
+    "resolve_features",
+    "warmup_bars",
+]
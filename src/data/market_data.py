@@ -1,12 +1,27 @@
 ﻿from __future__ import annotations
 
 import logging
+import sqlite3
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, select
-from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
 
 from ..config import get_settings
 
@@ -15,72 +30,190 @@ logger = logging.getLogger(__name__)
 metadata = MetaData()
 
 candles = Table(
-"candles",
-metadata,
-Column("id", Integer, primary_key=True),
-Column("symbol", String, nullable=False),
-Column("timeframe", String, nullable=False),
-Column("timestamp", DateTime, nullable=False),
-Column("open", Float, nullable=False),
-Column("high", Float, nullable=False),
-Column("low", Float, nullable=False),
-Column("close", Float, nullable=False),
-Column("volume", Float, nullable=False),
+    "candles",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("symbol", String, nullable=False),
+    Column("timeframe", String, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Column("open", Float, nullable=False),
+    Column("high", Float, nullable=False),
+    Column("low", Float, nullable=False),
+    Column("close", Float, nullable=False),
+    Column("volume", Float, nullable=False),
+)
+
+candles_unique_idx = Index(
+    "ux_candles_symbol_timeframe_timestamp",
+    candles.c.symbol,
+    candles.c.timeframe,
+    candles.c.timestamp,
+    unique=True,
 )
 
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+_INSERT_COLUMNS = ("symbol", "timeframe", "timestamp", *OHLCV_COLUMNS)
+# SQLite caps bound parameters per statement (999 before 3.32, 32766 after).
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+DEFAULT_CHUNK_ROWS = SQLITE_MAX_VARIABLES // len(_INSERT_COLUMNS)
+
+
+@dataclass
+class IngestReport:
+    rows: int
+    inserted: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+def to_ohlcv_arrays(data) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalise ccxt rows, an (N, 6) array or a DataFrame to (timestamp_ms, ohlcv)."""
+    if isinstance(data, pd.DataFrame):
+        if "timestamp" in data.columns:
+            stamps = pd.Index(data["timestamp"])
+        else:
+            stamps = data.index
+        if isinstance(stamps, pd.DatetimeIndex) or pd.api.types.is_datetime64_any_dtype(stamps):
+            stamps = pd.DatetimeIndex(stamps)
+            if stamps.tz is not None:
+                stamps = stamps.tz_convert(None)
+            ts_ms = stamps.values.astype("datetime64[ms]").astype(np.int64)
+        else:
+            ts_ms = np.asarray(stamps, dtype=np.int64)
+        values = data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        return ts_ms, values
+    array = np.asarray(data, dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] != 6:
+        raise ValueError("expected rows of [timestamp_ms, open, high, low, close, volume]")
+    return array[:, 0].astype(np.int64), array[:, 1:]
+
+
+def _format_timestamps(ts_ms: np.ndarray) -> np.ndarray:
+    # Same text layout SQLAlchemy's SQLite DateTime type writes, so the unique
+    # index sees rows stored through either path as equal.
+    text_ts = np.datetime_as_string(ts_ms.astype("datetime64[ms]").astype("datetime64[us]"), unit="us")
+    return np.char.replace(text_ts, "T", " ")
+
+
+def _insert_sql(rows: int) -> str:
+    row = "(" + ", ".join("?" * len(_INSERT_COLUMNS)) + ")"
+    return (
+        f"INSERT INTO candles ({', '.join(_INSERT_COLUMNS)}) VALUES "
+        + ", ".join([row] * rows)
+        + " ON CONFLICT (symbol, timeframe, timestamp) DO NOTHING"
+    )
+
+
 @dataclass
 class MarketDataService:
-engine_url: str
+    engine_url: str
 
-def __post_init__(self):
-    self.engine = create_engine(self.engine_url, future=True)
-    metadata.create_all(self.engine)
+    def __post_init__(self):
+        self.engine = create_engine(self.engine_url, future=True)
+        metadata.create_all(self.engine)
+        self._ensure_unique_index()
 
-def fetch(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500) -> pd.DataFrame:
-    with self.engine.begin() as conn:
+    def _ensure_unique_index(self) -> None:
+        existing = {idx["name"] for idx in inspect(self.engine).get_indexes(candles.name)}
+        if candles_unique_idx.name in existing:
+            return
+        # Tables created before the index existed may hold duplicates; keep the
+        # first copy of each bar so the unique index can be built.
+        with self.engine.begin() as conn:
+            removed = conn.execute(
+                text(
+                    "DELETE FROM candles WHERE id NOT IN "
+                    "(SELECT MIN(id) FROM candles GROUP BY symbol, timeframe, timestamp)"
+                )
+            ).rowcount
+            candles_unique_idx.create(conn)
+        if removed:
+            logger.info("Removed %d duplicate candles while adding unique index", removed)
+
+    def fetch(self, symbol: str, timeframe: str, since: Optional[int] = None, limit: int = 500) -> pd.DataFrame:
+        """Latest ``limit`` candles, restricted to bars after ``since`` (epoch ms) when given."""
+        with self.engine.begin() as conn:
+            stmt = (
+                select(candles)
+                .where(candles.c.symbol == symbol)
+                .where(candles.c.timeframe == timeframe)
+                .order_by(candles.c.timestamp.desc())
+                .limit(limit)
+            )
+            if since is not None:
+                stmt = stmt.where(candles.c.timestamp > pd.Timestamp(since, unit="ms").to_pydatetime())
+            result = conn.execute(stmt)
+            columns = list(result.keys())
+            rows = result.fetchall()
+        if not rows:
+            return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+        df = pd.DataFrame(rows, columns=columns)
+        df.sort_values("timestamp", inplace=True)
+        df.set_index("timestamp", inplace=True)
+        return df
+
+    def fetch_range(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        """All candles with ``start <= timestamp <= end``; either bound may be omitted."""
         stmt = (
-            select(candles)
+            select(candles.c.timestamp, *[candles.c[col] for col in OHLCV_COLUMNS])
             .where(candles.c.symbol == symbol)
             .where(candles.c.timeframe == timeframe)
-            .order_by(candles.c.timestamp.desc())
-            .limit(limit)
+            .order_by(candles.c.timestamp)
         )
-        rows = conn.execute(stmt).fetchall()
-    if not rows:
-        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
-    df = pd.DataFrame(rows, columns=rows[0].keys())
-    df.sort_values("timestamp", inplace=True)
-    df.set_index("timestamp", inplace=True)
-    return df
-
-def store(self, symbol: str, timeframe: str, data) -> None:
-    if not data:
-        return
-    records = []
-    for entry in data:
-        ts, open_, high, low, close, volume = entry
-        records.append(
-            {
-                "symbol": symbol,
-                "timeframe": timeframe,
-                "timestamp": pd.to_datetime(ts, unit="ms"),
-                "open": float(open_),
-                "high": float(high),
-                "low": float(low),
-                "close": float(close),
-                "volume": float(volume),
-            }
+        if start:
+            stmt = stmt.where(candles.c.timestamp >= pd.Timestamp(start).to_pydatetime())
+        if end:
+            stmt = stmt.where(candles.c.timestamp <= pd.Timestamp(end).to_pydatetime())
+        with self.engine.begin() as conn:
+            rows = conn.execute(stmt).fetchall()
+        df = pd.DataFrame(rows, columns=["timestamp", *OHLCV_COLUMNS])
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df.set_index("timestamp")
+
+    def store(self, symbol: str, timeframe: str, data, chunk_rows: Optional[int] = None) -> IngestReport:
+        """Bulk upsert candles; rows already stored for the same bar are skipped."""
+        started = time.perf_counter()
+        if data is None or len(data) == 0:
+            return IngestReport(rows=0, inserted=0, seconds=0.0)
+        ts_ms, values = to_ohlcv_arrays(data)
+        rows = len(ts_ms)
+        params = np.empty((rows, len(_INSERT_COLUMNS)), dtype=object)
+        params[:, 0] = symbol
+        params[:, 1] = timeframe
+        params[:, 2] = _format_timestamps(ts_ms)
+        params[:, 3:] = values
+        flat = params.ravel().tolist()
+
+        chunk = max(1, min(chunk_rows or DEFAULT_CHUNK_ROWS, DEFAULT_CHUNK_ROWS))
+        width = len(_INSERT_COLUMNS)
+        full_sql = _insert_sql(chunk)
+        inserted = 0
+        with self.engine.begin() as conn:
+            for start in range(0, rows, chunk):
+                stop = min(start + chunk, rows)
+                sql = full_sql if stop - start == chunk else _insert_sql(stop - start)
+                result = conn.exec_driver_sql(sql, tuple(flat[start * width : stop * width]))
+                inserted += max(result.rowcount, 0)
+        report = IngestReport(rows=rows, inserted=inserted, seconds=time.perf_counter() - started)
+        logger.info(
+            "Stored %d/%d %s %s candles in %.3fs (%.0f rows/s)",
+            inserted,
+            rows,
+            symbol,
+            timeframe,
+            report.seconds,
+            report.rows_per_sec,
         )
-    if not records:
-        return
-    with self.engine.begin() as conn:
-        for record in records:
-            stmt = (
-                insert(candles)
-                .values(**record)
-                .on_conflict_do_nothing(index_elements=["symbol", "timeframe", "timestamp"])
-            )
-            conn.execute(stmt)
+        return report
+
+
 def default_market_data_service() -> MarketDataService:
-settings = get_settings()
-return MarketDataService(engine_url=settings.db_url)
+    settings = get_settings()
+    if settings.market_data_backend == "columnar":
+        from .columnar_store import ColumnarMarketDataService
+
+        return ColumnarMarketDataService(root=settings.columnar_path)
+    return MarketDataService(engine_url=settings.db_url)
@@ -0,0 +1,239 @@
+﻿from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+try:
+    from scipy.signal import lfilter
+except ImportError:  # pragma: no cover - optional dependency
+    lfilter = None  # type: ignore
+
+from .features import FEATURE_COLUMNS
+
+# upper bound on elements materialised at once by the sliding-window kernels
+_BLOCK_ELEMENTS = 4_000_000
+
+
+def _as_panel(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.ndim != 2:
+        raise ValueError("panel inputs must be 2D (time x symbol)")
+    return arr
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if periods < len(x):
+        out[periods:] = x[:-periods]
+    return out
+
+
+def rolling_mean(x: np.ndarray, length: int) -> np.ndarray:
+    """``rolling(length, min_periods=length).mean()`` down every column."""
+    x = _as_panel(x)
+    out = np.full_like(x, np.nan)
+    if len(x) < length:
+        return out
+    valid = ~np.isnan(x)
+    # subtracting a per-column reference keeps the running sum small
+    ref = np.nan_to_num(x[np.argmax(valid, axis=0), np.arange(x.shape[1])])
+    sums = np.cumsum(np.where(valid, x - ref, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    window_sum = sums[length - 1 :].copy()
+    window_sum[1:] -= sums[:-length]
+    window_count = counts[length - 1 :].copy()
+    window_count[1:] -= counts[:-length]
+    out[length - 1 :] = np.where(window_count == length, window_sum / length + ref, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, length: int, ddof: int = 1) -> np.ndarray:
+    """``rolling(length, min_periods=length).std(ddof=ddof)`` down every column."""
+    x = _as_panel(x)
+    out = np.full_like(x, np.nan)
+    if len(x) < length or length - ddof <= 0:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, length, axis=0)
+    step = max(1, _BLOCK_ELEMENTS // max(1, x.shape[1] * length))
+    for start in range(0, len(windows), step):
+        block = windows[start : start + step]
+        out[length - 1 + start : length - 1 + start + len(block)] = block.std(axis=-1, ddof=ddof)
+    return out
+
+
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """``ewm(alpha=alpha, min_periods=min_periods).mean()`` (adjust=True) down every column.
+
+    NaNs decay the existing weights without adding an observation, as pandas
+    does with ``ignore_na=False``.
+    """
+    x = _as_panel(x)
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    weights = valid.astype(np.float64)
+    decay = 1.0 - alpha
+    if lfilter is not None:
+        num = lfilter([1.0], [1.0, -decay], filled, axis=0)
+        den = lfilter([1.0], [1.0, -decay], weights, axis=0)
+    else:
+        num = np.empty_like(x)
+        den = np.empty_like(x)
+        acc_num = np.zeros(x.shape[1])
+        acc_den = np.zeros(x.shape[1])
+        for t in range(len(x)):
+            acc_num = decay * acc_num + filled[t]
+            acc_den = decay * acc_den + weights[t]
+            num[t] = acc_num
+            den[t] = acc_den
+    ready = np.cumsum(valid, axis=0) >= max(min_periods, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(ready, num / den, np.nan)
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's moving average as used by pandas_ta for RSI and ATR."""
+    return ewm_mean(x, 1.0 / length, min_periods=length)
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    close = _as_panel(close)
+    change = close - _shift(close, 1)
+    positive = np.where(change < 0, 0.0, change)
+    negative = np.where(change > 0, 0.0, change)
+    gain = rma(positive, length)
+    loss = rma(negative, length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * gain / (gain + np.abs(loss))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high, low, close = _as_panel(high), _as_panel(low), _as_panel(close)
+    high_low = high - low
+    # pandas_ta nudges a series' whole high-low range when any bar has zero range
+    high_low = high_low + np.where((high_low == 0).any(axis=0), sys.float_info.epsilon, 0.0)
+    prev_close = _shift(close, 1)
+    ranges = np.fmax(np.fmax(np.abs(high_low), np.abs(high - prev_close)), np.abs(prev_close - low))
+    # a symbol's first bar has no previous close
+    first = np.argmax(~np.isnan(close), axis=0)
+    ranges[np.arange(len(close))[:, None] <= first[None, :]] = np.nan
+    return ranges
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    return rma(true_range(high, low, close), length)
+
+
+def roc(close: np.ndarray, length: int = 12) -> np.ndarray:
+    close = _as_panel(close)
+    base = _shift(close, length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * (close - base) / base
+
+
+def compute_panel_features(high, low, close) -> Dict[str, np.ndarray]:
+    """Every ``compute_features`` column for a (time x symbol) panel in one pass.
+
+    Each column of the inputs is one symbol. Leading NaNs mark bars before a
+    symbol was listed; results match the per-symbol path on the same bars.
+    """
+    high, low, close = _as_panel(high), _as_panel(low), _as_panel(close)
+    if not high.shape == low.shape == close.shape:
+        raise ValueError("high, low and close panels must have the same shape")
+    mid = rolling_mean(close, 20)
+    band_std = rolling_std(close, 20, ddof=0)
+    return {
+        "sma_10": rolling_mean(close, 10),
+        "sma_50": rolling_mean(close, 50),
+        "sma_200": rolling_mean(close, 200),
+        "rsi": rsi(close, 14),
+        "atr": atr(high, low, close, 14),
+        "bollinger_low": mid - 2.0 * band_std,
+        "bollinger_mid": mid,
+        "bollinger_high": mid + 2.0 * band_std,
+        "roc": roc(close, 12),
+        "volatility": band_std * np.sqrt(20.0 / 19.0),
+    }
+
+
+@dataclass
+class PricePanel:
+    """OHLC frames of several symbols aligned on the union of their timestamps."""
+
+    index: "pd.Index"
+    symbols: List[str]
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, "pd.DataFrame"]) -> "PricePanel":
+        if pd is None:
+            raise ImportError("pandas is required to build a price panel")
+        symbols = list(frames)
+        index: Optional[pd.Index] = None
+        for df in frames.values():
+            index = df.index if index is None else index.union(df.index)
+        index = index if index is not None else pd.Index([])
+        shape = (len(index), len(symbols))
+        high, low, close = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        for j, symbol in enumerate(symbols):
+            df = frames[symbol]
+            rows = index.get_indexer(df.index)
+            high[rows, j] = df["high"].to_numpy(dtype=float)
+            low[rows, j] = df["low"].to_numpy(dtype=float)
+            close[rows, j] = df["close"].to_numpy(dtype=float)
+        return cls(index=index, symbols=symbols, high=high, low=low, close=close)
+
+    def features(self) -> Dict[str, np.ndarray]:
+        return compute_panel_features(self.high, self.low, self.close)
+
+    def split(self, features: Dict[str, np.ndarray]) -> Dict[str, "pd.DataFrame"]:
+        """Per-symbol feature frames restricted to the bars each symbol actually has."""
+        stacked = np.stack([features[col] for col in FEATURE_COLUMNS], axis=-1)
+        present = ~np.isnan(self.close)
+        return {
+            symbol: pd.DataFrame(
+                stacked[present[:, j], j, :], index=self.index[present[:, j]], columns=FEATURE_COLUMNS
+            )
+            for j, symbol in enumerate(self.symbols)
+        }
+
+
+def compute_features_many(frames: Mapping[str, "pd.DataFrame"]) -> Dict[str, "pd.DataFrame"]:
+    """``{symbol: compute_features(df)}`` computed as one panel instead of a loop per symbol.
+
+    Bars are aligned on the union of timestamps; a symbol missing bars in the
+    middle of its history sees NaN windows there rather than a shorter series.
+    """
+    panel = PricePanel.from_frames(frames)
+    return panel.split(panel.features())
+
+
+def latest_panel_features(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Last row of every feature as a (symbol x feature) matrix in ``FEATURE_COLUMNS`` order."""
+    return np.stack([features[col][-1] for col in FEATURE_COLUMNS], axis=-1)
+
+
+__all__ = [
+    "PricePanel",
+    "atr",
+    "compute_features_many",
+    "compute_panel_features",
+    "ewm_mean",
+    "latest_panel_features",
+    "rma",
+    "roc",
+    "rolling_mean",
+    "rolling_std",
+    "rsi",
+    "true_range",
+]
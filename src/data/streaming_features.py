@@ -0,0 +1,246 @@
+﻿from __future__ import annotations
+
+import itertools
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+
+from .features import FEATURE_COLUMNS
+
+NAN = float("nan")
+
+
+class RollingWindow:
+    """Fixed-length window with add/remove Welford updates for mean and variance."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self._values: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        if len(self._values) == self.length:
+            old = self._values.popleft()
+            count = len(self._values)
+            if count == 0:
+                self._mean = self._m2 = 0.0
+            else:
+                delta = old - self._mean
+                self._mean -= delta / count
+                self._m2 -= delta * (old - self._mean)
+        self._values.append(value)
+        count = len(self._values)
+        delta = value - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (value - self._mean)
+
+    @property
+    def ready(self) -> bool:
+        return len(self._values) == self.length
+
+    def mean(self) -> float:
+        return self._mean if self.ready else NAN
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.ready or self.length - ddof <= 0:
+            return NAN
+        return math.sqrt(max(self._m2, 0.0) / (self.length - ddof))
+
+
+class WilderAverage:
+    """Streaming ``Series.ewm(alpha=1/length, min_periods=length).mean()`` (adjust=True)."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self._decay = 1.0 - 1.0 / length
+        self._weighted = NAN
+        self._old_wt = 1.0
+        self._count = 0
+
+    def push(self, value: float) -> float:
+        # mirrors pandas' ewma recursion so results agree to rounding error
+        self._count += 1
+        if self._count == 1:
+            self._weighted = value
+        else:
+            self._old_wt *= self._decay
+            if self._weighted != value:
+                self._weighted = (self._old_wt * self._weighted + value) / (self._old_wt + 1.0)
+            self._old_wt += 1.0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._weighted if self._count >= self.length else NAN
+
+
+class StreamingFeatureEngine:
+    """O(1)-per-bar equivalent of ``compute_features`` for a single series.
+
+    Feed closed bars in order through ``update``; ``values`` holds the latest
+    feature row in ``FEATURE_COLUMNS`` order.
+    """
+
+    def __init__(self) -> None:
+        self._sma = {10: RollingWindow(10), 50: RollingWindow(50), 200: RollingWindow(200)}
+        self._bands = RollingWindow(20)
+        self._gain = WilderAverage(14)
+        self._loss = WilderAverage(14)
+        self._atr = WilderAverage(14)
+        self._roc_window: deque = deque(maxlen=13)
+        self._prev_close: Optional[float] = None
+        self.bars = 0
+        self.values = np.full(len(FEATURE_COLUMNS), np.nan)
+
+    def update(self, high: float, low: float, close: float) -> np.ndarray:
+        for window in self._sma.values():
+            window.push(close)
+        self._bands.push(close)
+        self._roc_window.append(close)
+
+        rsi = atr = NAN
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            gain = self._gain.push(change if change > 0 else 0.0)
+            loss = self._loss.push(change if change < 0 else 0.0)
+            denom = gain + abs(loss)
+            rsi = 100.0 * gain / denom if denom == denom and denom != 0 else NAN
+            true_range = max(abs(high - low), abs(high - self._prev_close), abs(self._prev_close - low))
+            atr = self._atr.push(true_range)
+        self._prev_close = close
+
+        mid = self._bands.mean()
+        band_std = self._bands.std(ddof=0)
+        roc = NAN
+        if len(self._roc_window) == self._roc_window.maxlen:
+            base = self._roc_window[0]
+            roc = 100.0 * (close - base) / base if base != 0 else NAN
+
+        values = self.values
+        values[0] = self._sma[10].mean()
+        values[1] = self._sma[50].mean()
+        values[2] = self._sma[200].mean()
+        values[3] = rsi
+        values[4] = atr
+        values[5] = mid - 2.0 * band_std
+        values[6] = mid
+        values[7] = mid + 2.0 * band_std
+        values[8] = roc
+        values[9] = self._bands.std(ddof=1)
+        self.bars += 1
+        return values
+
+    def seed(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Replay history bar by bar; returns the feature frame it produced."""
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
+        out = np.empty((len(df), len(FEATURE_COLUMNS)))
+        for i in range(len(df)):
+            out[i] = self.update(high[i], low[i], close[i])
+        return pd.DataFrame(out, index=df.index, columns=FEATURE_COLUMNS)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(FEATURE_COLUMNS, self.values.tolist()))
+
+
+class StreamingFeatureSet:
+    """One ``StreamingFeatureEngine`` per symbol, fed only with bars not seen before.
+
+    With ``history`` the last that many feature rows are kept per symbol, so
+    ``frame`` can hand back a frame aligned with a candle window of up to
+    ``history`` bars.
+    """
+
+    def __init__(self, history: int = 0) -> None:
+        self.history = history
+        self.engines: Dict[str, StreamingFeatureEngine] = {}
+        self.last_timestamp: Dict[str, object] = {}
+        self.reseeds = 0
+        self._rows: Dict[str, deque] = {}
+
+    def _record(self, symbol: str, timestamp, values: np.ndarray) -> None:
+        if self.history:
+            self._rows.setdefault(symbol, deque(maxlen=self.history)).append((timestamp, values.copy()))
+
+    def seed(self, symbol: str, df: "pd.DataFrame") -> None:
+        engine = StreamingFeatureEngine()
+        self._rows.pop(symbol, None)
+        if len(df):
+            out = engine.seed(df)
+            self.last_timestamp[symbol] = df.index[-1]
+            tail = max(len(df) - self.history, 0)
+            for ts, values in zip(df.index[tail:], out.to_numpy()[tail:]):
+                self._record(symbol, ts, values)
+        self.engines[symbol] = engine
+
+    def update(self, symbol: str, timestamp, high: float, low: float, close: float) -> Optional[np.ndarray]:
+        """Advance ``symbol`` by one closed bar; returns None for already-seen bars."""
+        last = self.last_timestamp.get(symbol)
+        if last is not None and timestamp <= last:
+            return None
+        engine = self.engines.setdefault(symbol, StreamingFeatureEngine())
+        self.last_timestamp[symbol] = timestamp
+        values = engine.update(high, low, close)
+        self._record(symbol, timestamp, values)
+        return values
+
+    def update_frame(self, symbol: str, df: "pd.DataFrame") -> Optional[np.ndarray]:
+        """Feed every bar of ``df`` newer than the last one seen for ``symbol``."""
+        last = self.last_timestamp.get(symbol)
+        new = df if last is None else df.loc[df.index > last]
+        if new.empty:
+            return None
+        if symbol not in self.engines:
+            self.seed(symbol, new)
+            return self.engines[symbol].values
+        engine = self.engines[symbol]
+        for ts, high, low, close in zip(new.index, new["high"], new["low"], new["close"]):
+            self._record(symbol, ts, engine.update(float(high), float(low), float(close)))
+            self.last_timestamp[symbol] = ts
+        return engine.values
+
+    def frame(self, symbol: str, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Feature frame aligned with ``df``, running the engine over its unseen bars only.
+
+        ``symbol`` is re-seeded from ``df`` the first time and whenever ``df``
+        does not continue the bars already seen, e.g. after a gap in the feed.
+        """
+        if pd is None:
+            raise ImportError("pandas is required for feature frames")
+        if len(df) > self.history:
+            raise ValueError(f"frame of {len(df)} bars exceeds the kept history of {self.history}")
+        if len(df) == 0:
+            return pd.DataFrame(index=df.index, columns=FEATURE_COLUMNS, dtype=float)
+        rows = self._rows.get(symbol)
+        last = self.last_timestamp.get(symbol)
+        seen = 0 if last is None else int(df.index.searchsorted(last, side="right"))
+        if not rows or seen == 0 or seen > len(rows) or df.index[seen - 1] != last or rows[-seen][0] != df.index[0]:
+            self.reseeds += 1
+            self.seed(symbol, df)
+        else:
+            self.update_frame(symbol, df.iloc[seen:])
+        rows = self._rows[symbol]
+        values = np.array([row for _, row in itertools.islice(rows, len(rows) - len(df), None)])
+        return pd.DataFrame(values, index=df.index, columns=FEATURE_COLUMNS)
+
+    def latest(self, symbol: str) -> Dict[str, float]:
+        engine = self.engines.get(symbol)
+        return engine.as_dict() if engine else dict.fromkeys(FEATURE_COLUMNS, NAN)
+
+
+__all__ = [
+    "FEATURE_COLUMNS",
+    "RollingWindow",
+    "StreamingFeatureEngine",
+    "StreamingFeatureSet",
+    "WilderAverage",
+]
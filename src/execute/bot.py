@@ -1,311 +1,417 @@
 ﻿from __future__ import annotations
 
+import copy
+import functools
 import json
 import logging
+import queue
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
-try: # pragma: no cover - optional heavy deps
-import pandas as pd
-except ImportError: # pragma: no cover
-pd = None # type: ignore
+try:  # pragma: no cover - optional heavy deps
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+    pd = None  # type: ignore
 
 from ..config import Settings, get_settings
-from ..data.features import compute_features, make_feature_label
+from ..data.candle_cache import CachedMarketData
+from ..data.feature_cache import FeatureCache
+from ..data.features import FEATURE_COLUMNS, compute_features, warmup_bars
 from ..data.market_data import MarketDataService, default_market_data_service
+from ..data.streaming_features import StreamingFeatureSet
 from ..execute.executor import Executor
 from ..execute.notifier import Notifier
-from ..ml.online_model import OnlineModel
-from ..state.store import equity_file, state_dir, status_file, trades_file
+from ..ml.model_store import ModelCheckpointer, ModelStore
+from ..ml.online_model import MODEL_FEATURES, MODEL_NAME, OnlineModel
+from ..ml.sample_buffer import LabeledSampleBuffer
+from ..state.metrics import EquityAccumulator
+from ..state.store import equity_file, save_equity_accumulator, state_dir, status_file, trades_file
 from ..strategy.momentum_rsi import MomentumRSIStrategy
 from ..strategy.position_sizing import position_size
 from ..strategy.risk import RiskManager
 
 logger = logging.getLogger(__name__)
 
+# bars fetched beyond the feature warm-up so Wilder averages settle and the model has samples
+HISTORY_PADDING = 300
+
+
 @dataclass
 class PositionState:
-symbol: str
-quantity: float
-entry_price: float
+    symbol: str
+    quantity: float
+    entry_price: float
+
 
 class PaperBot:
-"""Simple bar-close driven paper trading loop for Docker deployments."""
-
-def __init__(
-    self,
-    settings: Optional[Settings] = None,
-    market_data: Optional[MarketDataService] = None,
-    executor: Optional[Executor] = None,
-    notifier: Optional[Notifier] = None,
-) -> None:
-    if pd is None:
-        raise ImportError("pandas is required for paper trading mode")
-    self.settings = settings or get_settings()
-    self.market_data = market_data or default_market_data_service()
-    self.notifier = notifier or Notifier(settings=self.settings)
-    self.executor = executor or Executor(settings=self.settings)
-    self.executor.context.order_callback = self._handle_fill
-    self.strategy = MomentumRSIStrategy()
-    self.risk_manager = RiskManager(settings=self.settings)
-    self.state_path = state_dir()
-    self.positions: Dict[str, PositionState] = {}
-    self.last_processed: Dict[str, pd.Timestamp] = {}
-    self.last_trained: Dict[str, pd.Timestamp] = {}
-    self.last_prices: Dict[str, float] = {}
-    self.equity_curve: list[tuple[datetime, float]] = []
-    self.paused = False
-    self.poll_interval = max(int(self.settings.poll_interval_seconds), 10)
-    self.model_features = [
-        "sma_10",
-        "sma_50",
-        "sma_200",
-        "rsi",
-        "atr",
-        "roc",
-        "volatility",
-    ]
-    self.wallet = self.executor.context.wallet
-    self.model = self._initialise_model()
-
-def _initialise_model(self) -> Optional[OnlineModel]:
-    try:
-        return OnlineModel(
-            feature_cols=self.model_features,
-            probability_threshold=self.settings.ml_probability_threshold,
+    """Simple bar-close driven paper trading loop for Docker deployments."""
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        market_data: Optional[MarketDataService] = None,
+        executor: Optional[Executor] = None,
+        notifier: Optional[Notifier] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+        state_path: Optional[Path] = None,
+    ) -> None:
+        if pd is None:
+            raise ImportError("pandas is required for paper trading mode")
+        self.settings = settings or get_settings()
+        # wall clock by default; replays substitute a simulated one
+        self.clock = clock or datetime.utcnow
+        self.market_data = market_data or default_market_data_service()
+        self.strategy = MomentumRSIStrategy()
+        self.model_features = list(MODEL_FEATURES)
+        # position sizing reads ATR regardless of strategy
+        self.feature_names = tuple(dict.fromkeys([*self.strategy.required_features, *self.model_features, "atr"]))
+        self.history_limit = max(self.strategy.warmup(), warmup_bars(self.feature_names)) + HISTORY_PADDING
+        self.candles = CachedMarketData(self.market_data, capacity=self.history_limit)
+        self.feature_cache = FeatureCache(maxsize=max(4 * len(self.settings.symbols_list()), 16))
+        # each closed bar advances per-symbol indicator state instead of recomputing the window
+        self.streaming_features = (
+            StreamingFeatureSet(history=self.history_limit)
+            if set(self.feature_names) <= set(FEATURE_COLUMNS)
+            else None
         )
-    except Exception as exc:  # pragma: no cover - optional dependency path
-        logger.warning("Online model unavailable: %s", exc)
-        return None
-
-def run_forever(self) -> None:
-    logger.info("Starting paper trading loop for symbols: %s", self.settings.symbols_list())
-    while True:
+        self.notifier = notifier or Notifier(settings=self.settings)
+        self.executor = executor or Executor(settings=self.settings)
+        self.executor.context.order_callback = self._handle_fill
+        self.executor.context.error_callback = self._handle_order_error
+        self.risk_manager = RiskManager(settings=self.settings, clock=self.clock)
+        self.state_path = state_dir(state_path)
+        self.positions: Dict[str, PositionState] = {}
+        # positions whose sell order is still in flight, restored if it fails
+        self.exiting: Dict[str, PositionState] = {}
+        # fills and failures from executor threads, applied on the trading loop's thread
+        self._order_events: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._trades_lock = threading.Lock()
+        self.last_processed: Dict[str, pd.Timestamp] = {}
+        self.samples = LabeledSampleBuffer(horizon=1)
+        self.last_prices: Dict[str, float] = {}
+        self.equity_curve: list[tuple[datetime, float]] = []
+        # running Sharpe/drawdown/period returns, persisted for the API and reports
+        self.metrics = EquityAccumulator()
+        self.paused = False
+        self.poll_interval = max(int(self.settings.poll_interval_seconds), 10)
+        self.wallet = self.executor.context.wallet
+        self.model_store = ModelStore(Path(self.settings.model_path))
+        self.model = self._initialise_model()
+        self.checkpointer = ModelCheckpointer(
+            self.model_store, MODEL_NAME, interval=self.settings.model_checkpoint_seconds
+        )
+        # reused every bar for batched scoring across symbols
+        self._score_rows = np.empty((len(self.settings.symbols_list()), len(self.model_features)))
+        self._scores = np.empty(len(self.settings.symbols_list()))
+
+    def _initialise_model(self) -> Optional[OnlineModel]:
+        checkpoint = self.model_store.latest(MODEL_NAME, feature_cols=self.model_features)
+        if checkpoint is not None:
+            try:
+                # the store's cached instance may be shared; this bot trains its own copy in place
+                model = copy.deepcopy(self.model_store.load_checkpoint(checkpoint))
+                if not getattr(model, "threshold_tuned", False):
+                    model.probability_threshold = self.settings.ml_probability_threshold
+                logger.info("Warm-started online model from checkpoint v%d", checkpoint.version)
+                return model
+            except Exception as exc:
+                logger.warning("Ignoring unreadable model checkpoint %s: %s", checkpoint.path.name, exc)
         try:
-            self.run_once()
-        except Exception as exc:  # pragma: no cover - resilience
-            logger.exception("Paper trading iteration failed: %s", exc)
-            time.sleep(self.poll_interval)
-        else:
-            time.sleep(self.poll_interval)
-
-def run_once(self) -> None:
-    # refresh equity snapshot before processing new bars
-    self._record_equity_snapshot()
-    self._update_risk_pause()
-
-    for symbol in self.settings.symbols_list():
-        df = self._fetch_frame(symbol)
-        if df is None or df.empty:
-            continue
-        last_ts = df.index[-1]
-        if self.last_processed.get(symbol) == last_ts:
-            # nothing new; update price cache and continue
+            return OnlineModel(
+                feature_cols=self.model_features,
+                probability_threshold=self.settings.ml_probability_threshold,
+            )
+        except Exception as exc:  # pragma: no cover - optional dependency path
+            logger.warning("Online model unavailable: %s", exc)
+            return None
+
+    def shutdown(self) -> None:
+        """Wait for in-flight orders, then write a final model checkpoint and wait for background writes."""
+        self.executor.close()
+        self._apply_order_events()
+        self.checkpointer.close(self.model)
+
+    def run_forever(self) -> None:
+        logger.info("Starting paper trading loop for symbols: %s", self.settings.symbols_list())
+        while True:
+            try:
+                self.run_once()
+            except Exception as exc:  # pragma: no cover - resilience
+                logger.exception("Paper trading iteration failed: %s", exc)
+                time.sleep(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+
+    def run_once(self) -> None:
+        # settle orders that completed since the last iteration, then refresh equity before new bars
+        self._apply_order_events()
+        self._record_equity_snapshot()
+        self._update_risk_pause()
+
+        closed = []
+        rows = []
+        for symbol in self.settings.symbols_list():
+            df = self._fetch_frame(symbol)
+            if df is None or df.empty:
+                continue
+            last_ts = df.index[-1]
+            if self.last_processed.get(symbol) == last_ts:
+                # nothing new; update price cache and continue
+                self.last_prices[symbol] = float(df["close"].iloc[-1])
+                continue
+
+            self.last_processed[symbol] = last_ts
             self.last_prices[symbol] = float(df["close"].iloc[-1])
-            continue
 
-        self.last_processed[symbol] = last_ts
-        self.last_prices[symbol] = float(df["close"].iloc[-1])
+            try:
+                features = self.feature_cache.get_or_compute(
+                    symbol,
+                    self.settings.timeframe,
+                    df,
+                    spec=self.feature_names,
+                    compute=functools.partial(self._compute_features, symbol=symbol),
+                )
+            except Exception as exc:
+                logger.error("Feature computation failed for %s: %s", symbol, exc)
+                continue
+            atr_series = features["atr"].fillna(0.0)
+            atr = float(atr_series.iloc[-1]) if not atr_series.empty else 0.0
+            try:
+                signal = self.strategy.evaluate_latest(df, features=features)
+            except Exception as exc:
+                logger.error("Signal generation failed for %s: %s", symbol, exc)
+                continue
 
-        try:
-            features = compute_features(df)
-        except Exception as exc:
-            logger.error("Feature computation failed for %s: %s", symbol, exc)
-            continue
-        atr_series = features["atr"].fillna(0.0)
-        atr = float(atr_series.iloc[-1]) if not atr_series.empty else 0.0
-        try:
-            signals = self.strategy.generate_signals(df)
-        except Exception as exc:
-            logger.error("Signal generation failed for %s: %s", symbol, exc)
-            continue
-        entry_signal = bool(signals.entries.iloc[-1])
-        exit_signal = bool(signals.exits.iloc[-1])
+            price = float(df["close"].iloc[-1])
+            closed.append((symbol, price, atr, signal))
+            rows.append(self._update_model(symbol, df, features))
 
-        price = float(df["close"].iloc[-1])
+        # one scoring call for every symbol that closed a bar, then act in symbol order
+        probabilities = self._latest_probabilities(rows)
+        for (symbol, price, atr, signal), probability in zip(closed, probabilities):
+            if symbol in self.positions and signal.exit:
+                self._exit_position(symbol, price)
 
-        self._update_model(symbol, df)
-        probability = self._latest_probability(features)
+            if self.paused:
+                continue
 
-        if symbol in self.positions and exit_signal:
-            self._exit_position(symbol, price)
+            if signal.entry and symbol not in self.positions:
+                if self.model and not self.model.should_enter(probability):
+                    logger.debug("ML gate blocked entry for %s (p=%.3f)", symbol, probability)
+                    continue
+                self._enter_position(symbol, price, atr)
 
-        if self.paused:
-            continue
+        # persist state after processing all symbols
+        self._record_equity_snapshot()
+        self._persist_state()
 
-        if entry_signal and symbol not in self.positions:
-            if self.model and not self.model.should_enter(probability):
-                logger.debug("ML gate blocked entry for %s (p=%.3f)", symbol, probability)
-                continue
-            self._enter_position(symbol, price, atr)
-
-    # persist state after processing all symbols
-    self._record_equity_snapshot()
-    self._persist_state()
-
-def _fetch_frame(self, symbol: str):
-    try:
-        since = None
-        last_ts = self.last_processed.get(symbol)
-        if last_ts is not None:
-            since = int(last_ts.value // 1_000_000)
-        return self.market_data.fetch(
-            symbol,
-            self.settings.timeframe,
-            limit=500,
-            since=since,
-        )
-    except Exception as exc:  # pragma: no cover - network path
-        logger.error("Failed to fetch market data for %s: %s", symbol, exc)
-        return None
-
-def _update_model(self, symbol: str, df) -> None:
-    if self.model is None:
-        return
-    features, labels = make_feature_label(df)
-    if features.empty:
-        return
-    current_bar = df.index[-1]
-    if symbol in self.last_trained:
-        features = features.loc[features.index > self.last_trained[symbol]]
-    features = features.loc[features.index < current_bar]
-    if features.empty:
-        return
-    y = labels.loc[features.index].to_numpy()
-    self.model.partial_fit_on_barclose(features, y)
-    self.last_trained[symbol] = features.index[-1]
-
-def _latest_probability(self, features) -> float:
-    if self.model is None:
-        return 1.0
-    try:
-        sample = features.tail(1)[self.model.feature_cols]
-        proba = self.model.predict_proba(sample)[0, 1]
-        return float(proba)
-    except Exception as exc:  # pragma: no cover - model edge cases
-        logger.debug("Probability prediction failed: %s", exc)
-        return 1.0
-
-def _enter_position(self, symbol: str, price: float, atr: float) -> None:
-    equity = self._current_equity()
-    quantity = position_size(
-        equity=equity,
-        entry_px=price,
-        atr=atr,
-        risk_per_trade=self.settings.risk_per_trade,
-    )
-    if quantity <= 0:
-        logger.debug("Position size zero for %s; skipping", symbol)
-        return
-    if not self._risk_allows_entry(quantity, price):
-        logger.info("Risk limits prevented entry for %s", symbol)
-        return
-    fill = self.executor.execute_order(symbol, "buy", quantity, price)
-    self.positions[symbol] = PositionState(
-        symbol=symbol,
-        quantity=float(fill.get("amount", quantity)),
-        entry_price=float(fill.get("price", price)),
-    )
-    self.notifier.notify(
-        "trade_open",
-        f"[{symbol}] momentum_rsi BUY qty={self.positions[symbol].quantity:.6f} @ {self.positions[symbol].entry_price:.2f}",
-        min_interval=10,
-    )
-
-def _exit_position(self, symbol: str, price: float) -> None:
-    position = self.positions.get(symbol)
-    if not position:
-        return
-    self.executor.execute_order(symbol, "sell", position.quantity, price)
-    pnl = (price - position.entry_price) * position.quantity
-    self.notifier.notify(
-        "trade_close",
-        f"[{symbol}] EXIT qty={position.quantity:.6f} @ {price:.2f} PnL={pnl:.2f}",
-        min_interval=10,
-    )
-    self.positions.pop(symbol, None)
-
-def _risk_allows_entry(self, quantity: float, price: float) -> bool:
-    if not self.risk_manager.check_position_limit(len(self.positions)):
-        return False
-    projected = self._projected_exposure(quantity * price)
-    return self.risk_manager.check_exposure(projected)
-
-def _projected_exposure(self, additional_value: float = 0.0) -> float:
-    equity = self._current_equity()
-    if equity <= 0:
-        return 0.0
-    open_value = 0.0
-    for pos in self.positions.values():
-        open_value += pos.quantity * self.last_prices.get(pos.symbol, pos.entry_price)
-    return (open_value + additional_value) / equity
-
-def _current_equity(self) -> float:
-    price_map = {symbol: price for symbol, price in self.last_prices.items()}
-    return float(self.wallet.total_value(price_map))
-
-def _record_equity_snapshot(self) -> None:
-    equity = self._current_equity()
-    if not self.equity_curve or self.equity_curve[-1][1] != equity:
-        self.equity_curve.append((datetime.utcnow(), equity))
-        if len(self.equity_curve) > 10_000:
-            self.equity_curve = self.equity_curve[-10_000:]
-
-def _equity_series(self) -> pd.Series:
-    if not self.equity_curve:
-        return pd.Series(dtype=float)
-    timestamps, values = zip(*self.equity_curve)
-    return pd.Series(values, index=pd.to_datetime(list(timestamps)))
-
-def _update_risk_pause(self) -> None:
-    series = self._equity_series()
-    if series.empty:
-        return
-    should_pause = self.risk_manager.should_pause_trading(series)
-    if should_pause and not self.paused:
-        loss_pct = self.risk_manager.daily_loss_pct(series)
-        self.notifier.notify(
-            "risk_pause",
-            f"Daily loss limit hit ({loss_pct:.2f}%) â€” pausing entries",
-            min_interval=300,
+    def _fetch_frame(self, symbol: str):
+        try:
+            # the cache only queries bars newer than its tail and returns a view
+            return self.candles.fetch(
+                symbol,
+                self.settings.timeframe,
+                limit=self.history_limit,
+            )
+        except Exception as exc:  # pragma: no cover - network path
+            logger.error("Failed to fetch market data for %s: %s", symbol, exc)
+            return None
+
+    def _compute_features(self, df, symbol: Optional[str] = None):
+        if self.streaming_features is not None and symbol is not None:
+            return self.streaming_features.frame(symbol, df)[list(self.feature_names)]
+        return compute_features(df, names=self.feature_names)
+
+    def _update_model(self, symbol: str, df, features) -> Optional["np.ndarray"]:
+        """Train on rows labelled by the new bars; returns the newest bar's model inputs."""
+        if self.model is None:
+            return None
+        # only bars the buffer has not seen are converted; their rows wait until the next close labels them
+        start = min(self.samples.new_rows(symbol, df.index.asi8), len(df) - 1)
+        rows = features.iloc[start:][self.model.feature_cols].to_numpy(dtype=float)
+        X, y = self.samples.update(symbol, df.index.asi8[start:], df["close"].to_numpy(dtype=float)[start:], rows)
+        if len(y):
+            self.model.partial_fit_on_barclose(X, y)
+            self.checkpointer.maybe_checkpoint(self.model)
+        return rows[-1]
+
+    def _latest_probabilities(self, rows) -> "np.ndarray":
+        if self.model is None or not rows:
+            return np.ones(len(rows))
+        batch = np.stack(rows, out=self._score_rows[: len(rows)])
+        try:
+            scores = self.model.predict_up(batch, out=self._scores[: len(rows)])
+        except Exception as exc:  # pragma: no cover - model edge cases
+            logger.debug("Probability prediction failed: %s", exc)
+            return np.ones(len(rows))
+        # rows still missing inputs leave the gate open, as a failed prediction always has
+        return np.where(np.isnan(scores), 1.0, scores)
+
+    def _enter_position(self, symbol: str, price: float, atr: float) -> None:
+        equity = self._current_equity()
+        quantity = position_size(
+            equity=equity,
+            entry_px=price,
+            atr=atr,
+            risk_per_trade=self.settings.risk_per_trade,
         )
-    elif not should_pause and self.paused:
-        self.notifier.notify("risk_resume", "Trading resumed", min_interval=300)
-    self.paused = should_pause
-
-def _persist_state(self) -> None:
-    equity = self._current_equity()
-    status = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "mode": "paper",
-        "equity": equity,
-        "paused": self.paused,
-        "open_positions": [
-            {
-                "symbol": pos.symbol,
-                "quantity": pos.quantity,
-                "entry_price": pos.entry_price,
-            }
-            for pos in self.positions.values()
-        ],
-    }
-    status_path = status_file()
-    status_path.write_text(json.dumps(status, indent=2))
-
-    if self.equity_curve and pd is not None:
-        equity_path = equity_file()
-        df = pd.DataFrame(self.equity_curve, columns=["timestamp", "equity"])
-        df.to_csv(equity_path, index=False)
-
-def _handle_fill(self, payload: Dict) -> None:
-    record = dict(payload)
-    record["timestamp"] = datetime.utcnow().isoformat()
-    trades_path = trades_file()
-    with trades_path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record) + "\n")
-
-def _fetch_prices(self) -> Dict[str, float]:  # pragma: no cover - helper for future use
-    return dict(self.last_prices)
-all = ["PaperBot", "PositionState"]
+        if quantity <= 0:
+            logger.debug("Position size zero for %s; skipping", symbol)
+            return
+        if not self._risk_allows_entry(quantity, price):
+            logger.info("Risk limits prevented entry for %s", symbol)
+            return
+        # held at the order's size and price until the fill arrives, so risk limits count it
+        self.positions[symbol] = PositionState(symbol=symbol, quantity=quantity, entry_price=price)
+        self.executor.submit_order(symbol, "buy", quantity, price)
+        self._apply_order_events()
+
+    def _exit_position(self, symbol: str, price: float) -> None:
+        position = self.positions.pop(symbol, None)
+        if not position:
+            return
+        self.exiting[symbol] = position
+        self.executor.submit_order(symbol, "sell", position.quantity, price)
+        self._apply_order_events()
+
+    def _apply_order_events(self) -> None:
+        while True:
+            try:
+                kind, payload = self._order_events.get_nowait()
+            except queue.Empty:
+                return
+            symbol, side = payload.get("symbol"), payload.get("side")
+            if kind == "error":
+                if side == "buy":
+                    self.positions.pop(symbol, None)
+                elif symbol in self.exiting:
+                    self.positions[symbol] = self.exiting.pop(symbol)
+                self.notifier.notify(
+                    "order_failed",
+                    f"[{symbol}] {str(side).upper()} order failed: {payload.get('error')}",
+                    min_interval=60,
+                )
+                continue
+            price = float(payload.get("average") or payload.get("price") or 0.0)
+            if side == "buy":
+                position = self.positions.get(symbol)
+                if position is None:
+                    continue
+                position.quantity = float(payload.get("filled") or payload.get("amount") or position.quantity)
+                position.entry_price = price or position.entry_price
+                self.notifier.notify(
+                    "trade_open",
+                    f"[{symbol}] momentum_rsi BUY qty={position.quantity:.6f} @ {position.entry_price:.2f}",
+                    min_interval=10,
+                )
+            else:
+                position = self.exiting.pop(symbol, None)
+                if position is None:
+                    continue
+                pnl = (price - position.entry_price) * position.quantity
+                self.notifier.notify(
+                    "trade_close",
+                    f"[{symbol}] EXIT qty={position.quantity:.6f} @ {price:.2f} PnL={pnl:.2f}",
+                    min_interval=10,
+                )
+
+    def _risk_allows_entry(self, quantity: float, price: float) -> bool:
+        if not self.risk_manager.check_position_limit(len(self.positions)):
+            return False
+        projected = self._projected_exposure(quantity * price)
+        return self.risk_manager.check_exposure(projected)
+
+    def _projected_exposure(self, additional_value: float = 0.0) -> float:
+        equity = self._current_equity()
+        if equity <= 0:
+            return 0.0
+        open_value = 0.0
+        for pos in self.positions.values():
+            open_value += pos.quantity * self.last_prices.get(pos.symbol, pos.entry_price)
+        return (open_value + additional_value) / equity
+
+    def _current_equity(self) -> float:
+        # the wallet holds base assets, so value them by the base of each traded pair
+        price_map = {symbol.split("/")[0]: price for symbol, price in self.last_prices.items()}
+        return float(self.wallet.total_value(price_map))
+
+    def _record_equity_snapshot(self) -> None:
+        equity = self._current_equity()
+        if not self.equity_curve or self.equity_curve[-1][1] != equity:
+            now = self.clock()
+            self.equity_curve.append((now, equity))
+            self.metrics.update(now, equity)
+            if len(self.equity_curve) > 10_000:
+                self.equity_curve = self.equity_curve[-10_000:]
+
+    def _equity_series(self) -> pd.Series:
+        if not self.equity_curve:
+            return pd.Series(dtype=float)
+        timestamps, values = zip(*self.equity_curve)
+        return pd.Series(values, index=pd.to_datetime(list(timestamps)))
+
+    def _update_risk_pause(self) -> None:
+        if self.metrics.count == 0:
+            return
+        loss_pct = self.metrics.period_return("day", now=self.clock())
+        should_pause = self.risk_manager.loss_limit_hit(loss_pct)
+        if should_pause and not self.paused:
+            self.notifier.notify(
+                "risk_pause",
+                f"Daily loss limit hit ({loss_pct:.2f}%) — pausing entries",
+                min_interval=300,
+            )
+        elif not should_pause and self.paused:
+            self.notifier.notify("risk_resume", "Trading resumed", min_interval=300)
+        self.paused = should_pause
+
+    def _persist_state(self) -> None:
+        equity = self._current_equity()
+        status = {
+            "timestamp": self.clock().isoformat(),
+            "mode": "paper",
+            "equity": equity,
+            "paused": self.paused,
+            "metrics": asdict(self.metrics.metrics()),
+            "feature_cache": self.feature_cache.stats(),
+            "open_positions": [
+                {
+                    "symbol": pos.symbol,
+                    "quantity": pos.quantity,
+                    "entry_price": pos.entry_price,
+                }
+                for pos in self.positions.values()
+            ],
+        }
+        status_path = status_file(self.state_path)
+        status_path.write_text(json.dumps(status, indent=2))
+        save_equity_accumulator(self.metrics, self.state_path)
+
+        if self.equity_curve and pd is not None:
+            equity_path = equity_file(self.state_path)
+            df = pd.DataFrame(self.equity_curve, columns=["timestamp", "equity"])
+            df.to_csv(equity_path, index=False)
+
+    def _handle_fill(self, payload: Dict) -> None:
+        # runs on the executor's order threads for live orders
+        record = dict(payload)
+        record["timestamp"] = self.clock().isoformat()
+        trades_path = trades_file(self.state_path)
+        with self._trades_lock, trades_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, default=str) + "\n")
+        self._order_events.put(("fill", record))
+
+    def _handle_order_error(self, payload: Dict, exc: Exception) -> None:
+        self._order_events.put(("error", {**payload, "error": str(exc)}))
+
+    def _fetch_prices(self) -> Dict[str, float]:  # pragma: no cover - helper for future use
+        return dict(self.last_prices)
+
+
+__all__ = ["PaperBot", "PositionState"]
@@ -1,59 +1,122 @@
 ﻿from __future__ import annotations
 
 import logging
+from concurrent.futures import Future
 from dataclasses import dataclass
 from typing import Callable, Dict, Optional
 
 from ..broker.paper_wallet import PaperWallet
 from ..config import get_settings
+from .order_queue import OrderQueue, OrderTicket
 
 logger = logging.getLogger(__name__)
 
+
 @dataclass
 class ExecutionContext:
-mode: str # "paper" or "live"
-wallet: PaperWallet
-order_callback: Optional[Callable] = None
+    mode: str  # "paper" or "live"
+    wallet: PaperWallet
+    order_callback: Optional[Callable] = None
+    # called with (order payload, exception) when an order fails for good
+    error_callback: Optional[Callable] = None
+
 
 class Executor:
-def __init__(self, settings=None, wallet: Optional[PaperWallet] = None) -> None:
-self.settings = settings or get_settings()
-default_wallet = PaperWallet(
-balance={"USDT": 10_000.0},
-fee_bps=self.settings.taker_fee_bps,
-slippage_bps=self.settings.slippage_bps,
-)
-self.context = ExecutionContext(
-mode=(
-"live"
-if self.settings.binance_api_key
-and not self.settings.binance_testnet
-else "paper"
-),
-wallet=wallet or default_wallet,
-)
-
-def execute_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict:
-    if self.context.mode == "paper":
-        fill = self.context.wallet.execute(symbol, side, quantity, price)
-        payload = {
-            "symbol": symbol,
-            "side": side,
-            "amount": quantity,
-            "price": fill.price,
-            "fee": fill.fee,
-            "equity": self.context.wallet.equity_history[-1][1] if self.context.wallet.equity_history else self.context.wallet.total_value(),
-            "mode": "paper",
-        }
-        logger.info("Paper order executed: %s", payload)
+    def __init__(self, settings=None, wallet: Optional[PaperWallet] = None) -> None:
+        self.settings = settings or get_settings()
+        default_wallet = PaperWallet(
+            balance={"USDT": 10_000.0},
+            fee_bps=self.settings.taker_fee_bps,
+            slippage_bps=self.settings.slippage_bps,
+        )
+        self.context = ExecutionContext(
+            mode=(
+                "live"
+                if self.settings.binance_api_key
+                and not self.settings.binance_testnet
+                else "paper"
+            ),
+            wallet=wallet or default_wallet,
+        )
+        self._orders: Optional[OrderQueue] = None
+
+    def submit_order(self, symbol: str, side: str, quantity: float, price: float) -> Future:
+        """Queue an order without waiting for it; the future resolves to the fill.
+
+        Live orders go through a bounded ``OrderQueue`` and reach the callbacks
+        from its worker threads as they complete. Paper orders fill before
+        this returns.
+        """
+        if self.context.mode == "paper":
+            future: Future = Future()
+            try:
+                future.set_result(self.execute_order(symbol, side, quantity, price))
+            except Exception as exc:
+                logger.error("Paper order %s %s failed: %s", side, symbol, exc)
+                if self.context.error_callback:
+                    payload = {"symbol": symbol, "side": side, "amount": quantity, "price": price}
+                    self.context.error_callback(payload, exc)
+                future.set_exception(exc)
+            return future
+        return self._order_queue().submit(symbol, side, quantity, price).future
+
+    def execute_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict:
+        if self.context.mode == "paper":
+            fill = self.context.wallet.execute(symbol, side, quantity, price)
+            payload = {
+                "symbol": symbol,
+                "side": side,
+                "amount": quantity,
+                "price": fill.price,
+                "fee": fill.fee,
+                "equity": self.context.wallet.equity_history[-1][1] if self.context.wallet.equity_history else self.context.wallet.total_value(),
+                "mode": "paper",
+            }
+            logger.info("Paper order executed: %s", payload)
+            if self.context.order_callback:
+                self.context.order_callback(payload)
+            return payload
+        return self.submit_order(symbol, side, quantity, price).result()
+
+    def _order_queue(self) -> OrderQueue:
+        if self._orders is None:
+            from ..broker.binance_adapter import _order_id, get_adapter
+
+            adapter = get_adapter(self.settings)
+
+            def send(ticket: OrderTicket) -> Dict:
+                return adapter.create_order(
+                    ticket.symbol,
+                    ticket.side,
+                    ticket.quantity,
+                    ticket.price,
+                    client_order_id=ticket.client_order_id,
+                )
+
+            self._orders = OrderQueue(
+                send,
+                order_id=_order_id,
+                max_in_flight=self.settings.max_orders_in_flight,
+                on_fill=self._on_fill,
+                on_error=self._on_error,
+            )
+        return self._orders
+
+    def _on_fill(self, payload: Dict) -> None:
         if self.context.order_callback:
             self.context.order_callback(payload)
-        return payload
-    from ..broker.binance_adapter import BinanceAdapter
-
-    adapter = BinanceAdapter(settings=self.settings)
-    response = adapter.create_order(symbol, side, quantity, price)
-    if self.context.order_callback:
-        self.context.order_callback(response)
-    return response
-all = ["Executor", "ExecutionContext"]
+
+    def _on_error(self, ticket: OrderTicket, exc: Exception) -> None:
+        if self.context.error_callback:
+            self.context.error_callback(ticket.payload(), exc)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued orders; True once none are in flight."""
+        return self._orders.drain(timeout) if self._orders is not None else True
+
+    def close(self) -> None:
+        if self._orders is not None:
+            self._orders.close()
+
+
+__all__ = ["Executor", "ExecutionContext"]
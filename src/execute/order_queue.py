@@ -0,0 +1,127 @@
+﻿from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OrderTicket:
+    """One queued order; ``client_order_id`` is fixed at enqueue time and reused by every attempt."""
+
+    symbol: str
+    side: str
+    quantity: float
+    price: Optional[float]
+    client_order_id: str
+    queued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future, repr=False)
+
+    def payload(self) -> Dict:
+        return {
+            "symbol": self.symbol,
+            "side": self.side,
+            "amount": self.quantity,
+            "price": self.price,
+            "client_order_id": self.client_order_id,
+        }
+
+
+class OrderQueue:
+    """Submits orders on at most ``max_in_flight`` threads so the caller never waits on the exchange.
+
+    Orders of one symbol go out in the order they were queued, each after the
+    previous one finished; different symbols run concurrently. ``on_fill``
+    receives each fill (the exchange response over the ticket's fields) as
+    its order completes and ``on_error`` gets ``(ticket, exc)`` for orders
+    that failed after the submitter's own retries. Both run on the worker
+    thread before the ticket's future resolves.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[OrderTicket], Dict],
+        order_id: Callable[[], str],
+        max_in_flight: int = 4,
+        on_fill: Optional[Callable[[Dict], None]] = None,
+        on_error: Optional[Callable[[OrderTicket, Exception], None]] = None,
+    ) -> None:
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self.submit_fn = submit
+        self.order_id = order_id
+        self.on_fill = on_fill
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._last: Dict[str, OrderTicket] = {}
+        self._open: Dict[str, OrderTicket] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="orders")
+
+    def submit(self, symbol: str, side: str, quantity: float, price: Optional[float] = None) -> OrderTicket:
+        ticket = OrderTicket(symbol, side, quantity, price, self.order_id())
+        with self._lock:
+            previous = self._last.get(symbol)
+            self._last[symbol] = ticket
+            self._open[ticket.client_order_id] = ticket
+        # tasks start in queue order, so a symbol's previous order is already running or done
+        self._pool.submit(self._run, ticket, previous)
+        return ticket
+
+    def _run(self, ticket: OrderTicket, previous: Optional[OrderTicket]) -> None:
+        if previous is not None:
+            wait([previous.future])
+        try:
+            response = self.submit_fn(ticket)
+        except Exception as exc:
+            logger.error("Order %s %s %s failed: %s", ticket.client_order_id, ticket.side, ticket.symbol, exc)
+            self._finish(ticket)
+            self._notify(self.on_error, ticket, exc)
+            ticket.future.set_exception(exc)
+            return
+        logger.info(
+            "Order %s %s %s done in %.3fs",
+            ticket.client_order_id,
+            ticket.side,
+            ticket.symbol,
+            time.monotonic() - ticket.queued_at,
+        )
+        # the ticket's fields fill whatever the exchange response leaves out
+        fill = {**ticket.payload(), **{k: v for k, v in dict(response or {}).items() if v is not None}}
+        self._finish(ticket)
+        self._notify(self.on_fill, fill)
+        ticket.future.set_result(fill)
+
+    @staticmethod
+    def _notify(callback: Optional[Callable], *args) -> None:
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as exc:  # pragma: no cover - a callback must not strand the future
+            logger.exception("Order callback failed: %s", exc)
+
+    def _finish(self, ticket: OrderTicket) -> None:
+        with self._lock:
+            self._open.pop(ticket.client_order_id, None)
+            if self._last.get(ticket.symbol) is ticket:
+                del self._last[ticket.symbol]
+
+    def in_flight(self, symbol: Optional[str] = None) -> List[OrderTicket]:
+        with self._lock:
+            return [t for t in self._open.values() if symbol is None or t.symbol == symbol]
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued order; False if some are still open after ``timeout`` seconds."""
+        _, not_done = wait([t.future for t in self.in_flight()], timeout=timeout)
+        return not not_done
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+__all__ = ["OrderQueue", "OrderTicket"]
@@ -5,160 +5,341 @@ import logging
 from typing import List, Optional
 
 import pandas as pd
-import uvicorn
 
-from .api.server import app
+from .backtest.batch import run_backtest_matrix
 from .backtest.engine import BacktestEngine
+from .backtest.monte_carlo import run_monte_carlo
+from .backtest.portfolio import PortfolioBacktestEngine
+from .backtest.replay import run_replay
+from .backtest.vectorized import VectorizedBacktestEngine
 from .config import get_settings
+from .data.backfill import run_backfill
+from .data.columnar_store import ColumnarMarketDataService, migrate_sqlite_to_columnar
 from .data.market_data import MarketDataService, default_market_data_service
-from .data.news_report import build_daily_report, build_weekly_report
+from .data.panel_features import compute_features_many
 from .execute.bot import PaperBot
 from .execute.notifier import Notifier
 from .logging_conf import configure_logging
-from .state.store import compute_equity_metrics
+from .ml.model_store import ModelStore
+from .ml.training import ModelCandidate, run_training
+from .state.store import compute_equity_metrics, state_dir
 from .strategy.breakout_atr import BreakoutATRStrategy
 from .strategy.mean_reversion import MeanReversionStrategy
 from .strategy.momentum_rsi import MomentumRSIStrategy
-from .ui.dashboard import run_dashboard
 
-try: # pragma: no cover - optional dependency
-from apscheduler.schedulers.background import BackgroundScheduler
-except Exception: # pragma: no cover
-BackgroundScheduler = None
+try:  # pragma: no cover - optional dependency
+    from apscheduler.schedulers.background import BackgroundScheduler
+except Exception:  # pragma: no cover
+    BackgroundScheduler = None
 
 logger = logging.getLogger(__name__)
 
+
 def _load_prices(service: MarketDataService, symbol: str, timeframe: str, start: str, end: str) -> pd.DataFrame:
-df = service.fetch(symbol, timeframe)
-df = df.loc[start:end] if start or end else df
-return df
+    return service.fetch_range(symbol, timeframe, start=start or None, end=end or None)
+
 
 def run_backtest(args: argparse.Namespace) -> None:
-settings = get_settings()
-service = default_market_data_service()
-engine = BacktestEngine(settings=settings)
-strategy_map = {
-"momentum": MomentumRSIStrategy(),
-"mean": MeanReversionStrategy(),
-"breakout": BreakoutATRStrategy(),
-}
-strategy = strategy_map.get(args.strategy, MomentumRSIStrategy())
-logger.info("Running backtest for %s", args.symbols)
-frames = []
-for symbol in args.symbols.split(","):
-df = _load_prices(service, symbol.strip(), args.timeframe, args.start, args.end)
-frames.append(df)
-df = pd.concat(frames)
-signals = strategy.generate_signals(df)
-result = engine.run(df, signals, symbol=args.symbols)
-logger.info("Backtest stats: %s", result.stats)
+    settings = get_settings()
+    service = default_market_data_service()
+    if args.engine == "backtesting":
+        engine = BacktestEngine(commission=settings.taker_fee_bps / 10_000)
+    else:
+        engine = VectorizedBacktestEngine.from_settings(settings)
+    strategy_map = {
+        "momentum": MomentumRSIStrategy(),
+        "mean": MeanReversionStrategy(),
+        "breakout": BreakoutATRStrategy(),
+    }
+    strategy = strategy_map.get(args.strategy, MomentumRSIStrategy())
+    logger.info("Running backtest for %s", args.symbols)
+    symbols = [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()]
+    frames = {symbol: _load_prices(service, symbol, args.timeframe, args.start, args.end) for symbol in symbols}
+    # same features and ATR stop distance as run_backtest_matrix
+    features = compute_features_many(frames)
+    signals = {symbol: strategy.generate_signals(df, features=features[symbol]) for symbol, df in frames.items()}
+    if len(symbols) > 1:
+        result = PortfolioBacktestEngine(settings=settings).run(frames, signals)
+    else:
+        symbol = symbols[0]
+        result = engine.run(frames[symbol], signals[symbol], symbol=symbol, atr=features[symbol]["atr"])
+    logger.info("Backtest stats: %s", result.stats)
+    if args.monte_carlo and len(result.trades):
+        mc = run_monte_carlo(result, n_paths=args.monte_carlo, method=args.mc_method)
+        logger.info("Monte Carlo 90%% intervals (%s):\n%s", args.mc_method, mc.summary(0.9).to_string())
+
+
+def run_backtest_batch(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    symbols = [s.strip() for s in args.symbols.split(",")] if args.symbols else settings.symbols_list()
+    timeframes = [t.strip() for t in args.timeframes.split(",")] if args.timeframes else [settings.timeframe]
+    strategies = [s.strip() for s in args.strategies.split(",")] if args.strategies else None
+    output = args.output or state_dir() / "backtest_matrix.csv"
+    result = run_backtest_matrix(
+        default_market_data_service(),
+        symbols,
+        timeframes,
+        output,
+        strategies=strategies,
+        start=args.start,
+        end=args.end,
+        engine=VectorizedBacktestEngine.from_settings(settings),
+        max_workers=args.workers or None,
+        cache_dir=args.cache_dir or None,
+    )
+    logger.info("Backtest matrix finished: %d cells, %d failed", len(result), int(result["error"].notna().sum()))
+
+
+def run_replay_bot(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    if args.symbols:
+        settings = settings.model_copy(update={"base_symbols": [s.strip() for s in args.symbols.split(",")]})
+    result = run_replay(
+        default_market_data_service(),
+        settings=settings,
+        start=args.start or None,
+        end=args.end or None,
+        state_path=args.state_path or None,
+    )
+    logger.info("Replay stats: %s", result.stats)
+
+
+def run_train_model(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    symbols = [s.strip() for s in args.symbols.split(",")] if args.symbols else settings.symbols_list()
+    alphas = [float(a) for a in args.alphas.split(",") if a.strip()]
+    thresholds = [float(t) for t in args.thresholds.split(",") if t.strip()]
+    report = run_training(
+        default_market_data_service(),
+        symbols,
+        args.timeframe or settings.timeframe,
+        args.dataset_dir or state_dir() / "datasets",
+        candidates=[ModelCandidate(alpha=alpha, epochs=args.epochs) for alpha in alphas],
+        thresholds=thresholds,
+        n_splits=args.folds,
+        start=args.start or None,
+        end=args.end or None,
+        store=ModelStore(settings.model_path),
+        max_workers=args.workers or None,
+    )
+    logger.info(
+        "Training: build %.0f rows/s, fit %.0f rows/s, best %s",
+        report.build_rows_per_sec,
+        report.train_rows_per_sec,
+        report.best,
+    )
+
+
+def run_migrate_candles(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    source = MarketDataService(engine_url=settings.db_url)
+    target = ColumnarMarketDataService(root=args.columnar_path or settings.columnar_path)
+    copied = migrate_sqlite_to_columnar(source, target)
+    logger.info("Migrated %d candles across %d series", sum(copied.values()), len(copied))
+
+
+def run_backfill_history(args: argparse.Namespace) -> None:
+    from .broker.binance_adapter import get_adapter
+
+    settings = get_settings()
+    symbols = [s.strip() for s in args.symbols.split(",")] if args.symbols else settings.symbols_list()
+    since_ms = int(pd.Timestamp(args.since).value // 1_000_000)
+    until_ms = int(pd.Timestamp(args.until).value // 1_000_000) if args.until else None
+    report = run_backfill(
+        get_adapter(settings),
+        default_market_data_service(),
+        symbols,
+        args.timeframe or settings.timeframe,
+        since_ms=since_ms,
+        until_ms=until_ms,
+        checkpoint_path=args.checkpoint or state_dir() / "backfill_checkpoint.json",
+        max_workers=args.workers,
+        rate_per_sec=args.rate,
+        page_limit=args.page_limit,
+    )
+    logger.info("Backfill: %.1f pages/s, %.0f bars/s", report.pages_per_sec, report.bars_per_sec)
+
 
 def run_paper(_: argparse.Namespace) -> None:
-settings = get_settings()
-notifier = Notifier(settings=settings)
-schedule_reports(notifier)
-try:
-bot = PaperBot(settings=settings, notifier=notifier)
-except ImportError as exc:
-logger.error("Unable to start paper trading: %s", exc)
-raise SystemExit(1) from exc
-try:
-bot.run_forever()
-except KeyboardInterrupt:
-logger.info("Paper trading stopped by user")
+    settings = get_settings()
+    notifier = Notifier(settings=settings)
+    schedule_reports(notifier)
+    try:
+        bot = PaperBot(settings=settings, notifier=notifier)
+    except ImportError as exc:
+        logger.error("Unable to start paper trading: %s", exc)
+        raise SystemExit(1) from exc
+    try:
+        bot.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Paper trading stopped by user")
+    finally:
+        bot.shutdown()
+
 
 def run_live(_: argparse.Namespace) -> None:
-settings = get_settings()
-if not settings.binance_api_key:
-raise SystemExit("Binance keys missing")
-if settings.binance_testnet:
-raise SystemExit("Disable testnet before starting live trading")
-notifier = Notifier(settings=settings)
-schedule_reports(notifier)
-logger.info("Live trading mode initialised")
+    settings = get_settings()
+    if not settings.binance_api_key:
+        raise SystemExit("Binance keys missing")
+    if settings.binance_testnet:
+        raise SystemExit("Disable testnet before starting live trading")
+    notifier = Notifier(settings=settings)
+    schedule_reports(notifier)
+    logger.info("Live trading mode initialised")
+
 
 def run_report(args: argparse.Namespace) -> None:
-if args.weekly:
-report = build_weekly_report(2.0, -5.0, "momentum_rsi")
-else:
-report = build_daily_report(10_000.0, 1.5)
-logger.info("Report: %s", report)
+    from .data.news_report import build_daily_report, build_weekly_report
+
+    if args.weekly:
+        report = build_weekly_report(2.0, -5.0, "momentum_rsi")
+    else:
+        report = build_daily_report(10_000.0, 1.5)
+    logger.info("Report: %s", report)
+
 
 def run_api(_: argparse.Namespace) -> None:
-uvicorn.run(app, host="0.0.0.0", port=8000)
+    import uvicorn
+
+    from .api.server import app
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+
 
 def run_ui(_: argparse.Namespace) -> None:
-run_dashboard()
+    from .ui.dashboard import run_dashboard
+
+    run_dashboard()
+
 
 def _parse_time_window(spec: str) -> tuple[int, int]:
-hour, minute = spec.split(":")
-return int(hour), int(minute)
+    hour, minute = spec.split(":")
+    return int(hour), int(minute)
+
 
 def schedule_reports(notifier: Notifier) -> Optional[object]:
-settings = get_settings()
-if BackgroundScheduler is None:
-logger.warning("APScheduler not available, skipping scheduled reports")
-return None
-scheduler = BackgroundScheduler(timezone="Europe/Berlin")
-daily_hour, daily_minute = _parse_time_window(settings.telegram_daily_report_time)
-weekly_hour, weekly_minute = _parse_time_window(settings.telegram_weekly_report_time)
-
-def _daily_job() -> None:
-    metrics = compute_equity_metrics()
-    notifier.notify(
-        "daily_report",
-        build_daily_report(metrics.equity, metrics.wtd),
-        min_interval=60,
-    )
+    settings = get_settings()
+    if BackgroundScheduler is None:
+        logger.warning("APScheduler not available, skipping scheduled reports")
+        return None
+    scheduler = BackgroundScheduler(timezone="Europe/Berlin")
+    daily_hour, daily_minute = _parse_time_window(settings.telegram_daily_report_time)
+    weekly_hour, weekly_minute = _parse_time_window(settings.telegram_weekly_report_time)
 
-def _weekly_job() -> None:
-    metrics = compute_equity_metrics()
-    notifier.notify(
-        "weekly_report",
-        build_weekly_report(metrics.wtd, metrics.max_drawdown, "momentum_rsi"),
-        min_interval=60,
+    def _daily_job() -> None:
+        from .data.news_report import build_daily_report
+
+        metrics = compute_equity_metrics()
+        notifier.notify(
+            "daily_report",
+            build_daily_report(metrics.equity, metrics.wtd),
+            min_interval=60,
+        )
+
+    def _weekly_job() -> None:
+        from .data.news_report import build_weekly_report
+
+        metrics = compute_equity_metrics()
+        notifier.notify(
+            "weekly_report",
+            build_weekly_report(metrics.wtd, metrics.max_drawdown, "momentum_rsi"),
+            min_interval=60,
+        )
+
+    scheduler.add_job(_daily_job, "cron", hour=daily_hour, minute=daily_minute)
+    scheduler.add_job(
+        _weekly_job,
+        "cron",
+        day_of_week="sun",
+        hour=weekly_hour,
+        minute=weekly_minute,
     )
+    scheduler.start()
+    logger.info("Scheduled daily and weekly Telegram reports")
+    return scheduler
+
 
-scheduler.add_job(_daily_job, "cron", hour=daily_hour, minute=daily_minute)
-scheduler.add_job(
-    _weekly_job,
-    "cron",
-    day_of_week="sun",
-    hour=weekly_hour,
-    minute=weekly_minute,
-)
-scheduler.start()
-logger.info("Scheduled daily and weekly Telegram reports")
-return scheduler
 def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
-parser = argparse.ArgumentParser(description="TradeIt bot controller")
-sub = parser.add_subparsers(dest="command", required=True)
-
-bt = sub.add_parser("backtest")
-bt.add_argument("--symbols", default="BTC/USDT")
-bt.add_argument("--timeframe", default="1h")
-bt.add_argument("--start", default="")
-bt.add_argument("--end", default="")
-bt.add_argument("--strategy", default="momentum")
-bt.set_defaults(func=run_backtest)
-
-sub.add_parser("paper").set_defaults(func=run_paper)
-sub.add_parser("live").set_defaults(func=run_live)
-
-report = sub.add_parser("report")
-group = report.add_mutually_exclusive_group()
-group.add_argument("--daily", action="store_true")
-group.add_argument("--weekly", action="store_true")
-report.set_defaults(func=run_report)
-
-sub.add_parser("api").set_defaults(func=run_api)
-sub.add_parser("ui").set_defaults(func=run_ui)
-
-return parser.parse_args(argv)
+    parser = argparse.ArgumentParser(description="TradeIt bot controller")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bt = sub.add_parser("backtest")
+    bt.add_argument("--symbols", default="BTC/USDT")
+    bt.add_argument("--timeframe", default="1h")
+    bt.add_argument("--start", default="")
+    bt.add_argument("--end", default="")
+    bt.add_argument("--strategy", default="momentum")
+    bt.add_argument("--engine", choices=["vectorized", "backtesting"], default="vectorized")
+    bt.add_argument("--monte-carlo", type=int, default=0, help="number of resampled paths for confidence intervals")
+    bt.add_argument("--mc-method", choices=["bootstrap", "shuffle", "block"], default="bootstrap")
+    bt.set_defaults(func=run_backtest)
+
+    batch = sub.add_parser("backtest-matrix")
+    batch.add_argument("--symbols", default="")
+    batch.add_argument("--timeframes", default="", help="comma separated, e.g. 1h,4h")
+    batch.add_argument("--strategies", default="", help="defaults to every strategy in prepare_strategies()")
+    batch.add_argument("--start", default="")
+    batch.add_argument("--end", default="")
+    batch.add_argument("--workers", type=int, default=0, help="defaults to one process per core")
+    batch.add_argument("--output", default="")
+    batch.add_argument("--cache-dir", default="", help="reuse results of unchanged cells from this directory")
+    batch.set_defaults(func=run_backtest_batch)
+
+    replay = sub.add_parser("replay", help="run the paper bot over stored candles on a simulated clock")
+    replay.add_argument("--symbols", default="")
+    replay.add_argument("--start", default="")
+    replay.add_argument("--end", default="")
+    replay.add_argument("--state-path", default="", help="defaults to a temporary directory")
+    replay.set_defaults(func=run_replay_bot)
+
+    train = sub.add_parser("train", help="cross-validate the online model offline and checkpoint the winner")
+    train.add_argument("--symbols", default="")
+    train.add_argument("--timeframe", default="")
+    train.add_argument("--start", default="")
+    train.add_argument("--end", default="")
+    train.add_argument("--alphas", default="0.00001,0.0001,0.001", help="SGD regularisation candidates")
+    train.add_argument("--thresholds", default="0.5,0.55,0.6,0.65")
+    train.add_argument("--epochs", type=int, default=1)
+    train.add_argument("--folds", type=int, default=4)
+    train.add_argument("--workers", type=int, default=0, help="defaults to one process per core")
+    train.add_argument("--dataset-dir", default="")
+    train.set_defaults(func=run_train_model)
+
+    migrate = sub.add_parser("migrate-candles")
+    migrate.add_argument("--columnar-path", default="")
+    migrate.set_defaults(func=run_migrate_candles)
+
+    backfill = sub.add_parser("backfill")
+    backfill.add_argument("--symbols", default="")
+    backfill.add_argument("--timeframe", default="")
+    backfill.add_argument("--since", required=True)
+    backfill.add_argument("--until", default="")
+    backfill.add_argument("--workers", type=int, default=4)
+    backfill.add_argument("--rate", type=float, default=10.0, help="exchange requests per second, shared")
+    backfill.add_argument("--page-limit", type=int, default=1000)
+    backfill.add_argument("--checkpoint", default="")
+    backfill.set_defaults(func=run_backfill_history)
+
+    sub.add_parser("paper").set_defaults(func=run_paper)
+    sub.add_parser("live").set_defaults(func=run_live)
+
+    report = sub.add_parser("report")
+    group = report.add_mutually_exclusive_group()
+    group.add_argument("--daily", action="store_true")
+    group.add_argument("--weekly", action="store_true")
+    report.set_defaults(func=run_report)
+
+    sub.add_parser("api").set_defaults(func=run_api)
+    sub.add_parser("ui").set_defaults(func=run_ui)
+
+    return parser.parse_args(argv)
+
+
 def main(argv: List[str] | None = None) -> None:
-configure_logging()
-args = parse_args(argv)
-args.func(args)
+    configure_logging()
+    args = parse_args(argv)
+    args.func(args)
+
 
 if __name__ == "__main__":
-main()
+    main()
@@ -1,23 +1,217 @@
 ﻿from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional, Sequence
 
 import joblib
 
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT = re.compile(r"^(?P<name>.+)-v(?P<version>\d{6})-(?P<digest>[0-9a-f]{12})\.joblib$")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    name: str
+    version: int
+    sha256: str
+    path: Path
+    feature_cols: Optional[List[str]] = None
+    created: float = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["path"] = self.path.name
+        return data
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class ModelStore:
-def __init__(self, base_path: Path) -> None:
-self.base_path = base_path
-self.base_path.mkdir(parents=True, exist_ok=True)
-
-def save(self, model: Any, name: str) -> Path:
-    path = self.base_path / f"{name}.joblib"
-    joblib.dump(model, path)
-    return path
-
-def load(self, name: str) -> Any:
-    path = self.base_path / f"{name}.joblib"
-    if not path.exists():
-        raise FileNotFoundError(path)
-    return joblib.load(path)
-all = ["ModelStore"]
+    """Versioned model checkpoints under ``base_path``.
+
+    Each save writes ``<name>-v<version>-<sha256[:12]>.joblib`` through a
+    temporary file and ``os.replace``, followed by a JSON sidecar holding the
+    full hash and ``feature_cols``; a checkpoint only becomes visible once its
+    sidecar exists, so readers never see partial files. Loaded models stay in
+    an in-memory LRU of ``cache_size`` entries shared by every caller of this
+    store, and only the newest ``keep`` versions of a name are kept on disk.
+    """
+
+    def __init__(self, base_path: Path, keep: int = 5, cache_size: int = 4) -> None:
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def checkpoints(self, name: str) -> List[Checkpoint]:
+        """Complete checkpoints of ``name``, oldest first."""
+        found = []
+        for sidecar in self.base_path.glob(f"{name}-v*.json"):
+            try:
+                meta = json.loads(sidecar.read_text())
+            except (OSError, json.JSONDecodeError):
+                continue
+            path = self.base_path / meta["path"]
+            match = _CHECKPOINT.match(path.name)
+            if not match or match["name"] != name or not path.exists():
+                continue
+            found.append(
+                Checkpoint(
+                    name=name,
+                    version=int(meta["version"]),
+                    sha256=meta["sha256"],
+                    path=path,
+                    feature_cols=meta.get("feature_cols"),
+                    created=float(meta.get("created", 0.0)),
+                )
+            )
+        return sorted(found, key=lambda c: c.version)
+
+    def latest(self, name: str, feature_cols: Optional[Sequence[str]] = None) -> Optional[Checkpoint]:
+        """Newest checkpoint of ``name``, restricted to matching ``feature_cols`` when given."""
+        for checkpoint in reversed(self.checkpoints(name)):
+            if feature_cols is None or checkpoint.feature_cols == list(feature_cols):
+                return checkpoint
+        return None
+
+    def save(self, model: Any, name: str) -> Path:
+        feature_cols = getattr(model, "feature_cols", None)
+        fd, tmp = tempfile.mkstemp(dir=self.base_path, prefix=f".{name}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                joblib.dump(model, handle)
+            digest = _file_digest(Path(tmp))
+            with self._lock:
+                existing = self.checkpoints(name)
+                version = existing[-1].version + 1 if existing else 1
+                path = self.base_path / f"{name}-v{version:06d}-{digest[:12]}.joblib"
+                os.replace(tmp, path)
+                checkpoint = Checkpoint(
+                    name=name,
+                    version=version,
+                    sha256=digest,
+                    path=path,
+                    feature_cols=list(feature_cols) if feature_cols is not None else None,
+                    created=time.time(),
+                )
+                sidecar = path.with_suffix(".json")
+                sidecar_tmp = sidecar.with_suffix(".json.tmp")
+                sidecar_tmp.write_text(json.dumps(checkpoint.to_json()))
+                os.replace(sidecar_tmp, sidecar)
+                self._prune(existing + [checkpoint])
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        logger.info("Saved %s checkpoint v%d (%s)", name, version, digest[:12])
+        return path
+
+    def _prune(self, checkpoints: List[Checkpoint]) -> None:
+        for old in checkpoints[: max(len(checkpoints) - self.keep, 0)]:
+            old.path.with_suffix(".json").unlink(missing_ok=True)
+            old.path.unlink(missing_ok=True)
+            self._cache.pop(old.sha256, None)
+
+    def load_checkpoint(
+        self,
+        checkpoint: Checkpoint,
+        mmap_mode: Optional[str] = None,
+        verify: Optional[bool] = None,
+    ) -> Any:
+        """Load ``checkpoint`` through the LRU.
+
+        ``mmap_mode`` (e.g. ``"r"``) maps large NumPy arrays instead of reading
+        them; the hash check is skipped in that case unless ``verify`` is set,
+        since it would read the whole file.
+        """
+        with self._lock:
+            if checkpoint.sha256 in self._cache:
+                self._cache.move_to_end(checkpoint.sha256)
+                return self._cache[checkpoint.sha256]
+        if verify is None:
+            verify = mmap_mode is None
+        if verify and _file_digest(checkpoint.path) != checkpoint.sha256:
+            raise ValueError(f"Checkpoint {checkpoint.path.name} does not match its recorded hash")
+        model = joblib.load(checkpoint.path, mmap_mode=mmap_mode)
+        with self._lock:
+            self._cache[checkpoint.sha256] = model
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return model
+
+    def load(self, name: str, feature_cols: Optional[Sequence[str]] = None, mmap_mode: Optional[str] = None) -> Any:
+        checkpoint = self.latest(name, feature_cols)
+        if checkpoint is None:
+            raise FileNotFoundError(self.base_path / f"{name}-v*.joblib")
+        return self.load_checkpoint(checkpoint, mmap_mode=mmap_mode)
+
+
+class ModelCheckpointer:
+    """Periodic background checkpoints of one model.
+
+    ``maybe_checkpoint`` is called after training steps: once ``interval``
+    seconds have passed it snapshots the model and hands the write to a single
+    background thread. A step never waits on disk; if the previous write is
+    still running the checkpoint is skipped until the next call. ``close``
+    only writes a final checkpoint when training happened since the last one.
+    """
+
+    def __init__(self, store: ModelStore, name: str, interval: float = 300.0) -> None:
+        self.store = store
+        self.name = name
+        self.interval = interval
+        self._last = time.monotonic()
+        self._pending: Optional[Future] = None
+        self._dirty = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"checkpoint-{name}")
+
+    def maybe_checkpoint(self, model: Any, force: bool = False) -> Optional[Future]:
+        self._dirty = True
+        if not force and time.monotonic() - self._last < self.interval:
+            return None
+        if self._pending is not None and not self._pending.done():
+            return None
+        self._last = time.monotonic()
+        self._dirty = False
+        snapshot = copy.deepcopy(model)
+        self._pending = self._executor.submit(self._write, snapshot)
+        return self._pending
+
+    def _write(self, snapshot: Any) -> Optional[Path]:
+        try:
+            return self.store.save(snapshot, self.name)
+        except Exception as exc:  # pragma: no cover - disk errors must not stop trading
+            logger.error("Checkpoint of %s failed: %s", self.name, exc)
+            return None
+
+    def close(self, model: Any = None) -> None:
+        """Wait for pending writes, then checkpoint ``model`` if it trained since the last snapshot."""
+        if self._pending is not None:
+            self._pending.result()
+        if model is not None and self._dirty:
+            self._dirty = False
+            self._write(copy.deepcopy(model))
+        self._executor.shutdown(wait=True)
+
+
+__all__ = ["Checkpoint", "ModelCheckpointer", "ModelStore"]
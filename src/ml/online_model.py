@@ -1,75 +1,121 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 try:
-import numpy as np
-except ImportError: # pragma: no cover - optional dependency
-np = None # type: ignore
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
 try:
-import pandas as pd
-except ImportError: # pragma: no cover - optional dependency
-pd = None # type: ignore
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
 try:
-from sklearn.linear_model import SGDClassifier
-from sklearn.preprocessing import StandardScaler
-except ImportError: # pragma: no cover - optional dependency
-SGDClassifier = None # type: ignore
-StandardScaler = None # type: ignore
+    from scipy.special import expit
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+except ImportError:  # pragma: no cover - optional dependency
+    expit = None  # type: ignore
+    SGDClassifier = None  # type: ignore
+    StandardScaler = None  # type: ignore
+
+# inputs of the bot's model and the name its checkpoints are stored under
+MODEL_FEATURES = ["sma_10", "sma_50", "sma_200", "rsi", "atr", "roc", "volatility"]
+MODEL_NAME = "online_model"
+
 
 @dataclass
 class OnlineModel:
-feature_cols: List[str]
-probability_threshold: float = 0.55
+    feature_cols: List[str]
+    probability_threshold: float = 0.55
+    alpha: float = 0.0001
+    random_state: Optional[int] = None
+    # set by offline training; the bot keeps a tuned threshold instead of the configured one
+    threshold_tuned: bool = False
+
+    def __post_init__(self) -> None:
+        if StandardScaler is None or SGDClassifier is None:
+            raise ImportError("scikit-learn is required for OnlineModel")
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(
+            loss="log_loss", alpha=self.alpha, max_iter=1, warm_start=True, random_state=self.random_state
+        )
+        self.is_init = False
+        self._model_initialized = False
+        # scaler folded into the SGD weights for ``predict_up``; rebuilt after each fit
+        self._weights: Optional[np.ndarray] = None
+        self._bias = 0.0
+
+    def _values(self, X) -> np.ndarray:
+        # arrays are taken to be in ``feature_cols`` order already
+        if isinstance(X, np.ndarray):
+            return X
+        return X[self.feature_cols].values
+
+    def _prepare(self, X) -> np.ndarray:
+        if pd is None or np is None:
+            raise ImportError("pandas and numpy are required for online model")
+        data = self._values(X)
+        if not self.is_init:
+            self.scaler.fit(data)
+            self.is_init = True
+        else:
+            self.scaler.partial_fit(data)
+        return self.scaler.transform(data)
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        if pd is None or np is None:
+            raise ImportError("pandas and numpy are required for online model")
+        if not self._model_initialized:
+            return np.full((len(X), 2), 0.5)
+        data = self.scaler.transform(X[self.feature_cols].values)
+        return self.model.predict_proba(data)
+
+    def partial_fit_on_barclose(self, X, y: np.ndarray) -> None:
+        """One SGD step on labelled rows; ``X`` is a DataFrame or an array in ``feature_cols`` order."""
+        if pd is None or np is None:
+            raise ImportError("pandas and numpy are required for online model")
+        if len(X) == 0:
+            return
+        mask = ~np.isnan(y)
+        if not mask.any():
+            return
+        X_fit = X[mask] if isinstance(X, np.ndarray) else X.loc[mask]
+        y_fit = y[mask]
+        if len(X_fit) == 0:
+            return
+        data = self._prepare(X_fit)
+        classes = np.array([0, 1])
+        if not self._model_initialized:
+            self.model.partial_fit(data, y_fit, classes=classes)
+            self._model_initialized = True
+        else:
+            self.model.partial_fit(data, y_fit)
+        self._weights = None
 
-def __post_init__(self) -> None:
-    if StandardScaler is None or SGDClassifier is None:
-        raise ImportError("scikit-learn is required for OnlineModel")
-    self.scaler = StandardScaler()
-    self.model = SGDClassifier(loss="log_loss", max_iter=1, warm_start=True)
-    self.is_init = False
-    self._model_initialized = False
+    def predict_up(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """P(class 1) per row of a float array in ``feature_cols`` order.
 
-def _prepare(self, X: pd.DataFrame) -> np.ndarray:
-    if pd is None or np is None:
-        raise ImportError("pandas and numpy are required for online model")
-    data = X[self.feature_cols].values
-    if not self.is_init:
-        self.scaler.fit(data)
-        self.is_init = True
-    else:
-        self.scaler.partial_fit(data)
-    return self.scaler.transform(data)
+        Same values as ``predict_proba(X)[:, 1]`` without DataFrame indexing or
+        sklearn input validation: ``(x - mean) / scale`` is folded into the SGD
+        weights, so scoring is one dot product and a logistic. ``out`` receives
+        the result when given, so a caller can reuse one buffer per bar.
+        """
+        if out is None:
+            out = np.empty(len(X))
+        if not self._model_initialized:
+            out[:] = 0.5
+            return out
+        if self._weights is None:
+            self._weights = self.model.coef_[0] / self.scaler.scale_
+            self._bias = float(self.model.intercept_[0] - self.scaler.mean_ @ self._weights)
+        np.dot(X, self._weights, out=out)
+        out += self._bias
+        return expit(out, out=out)
 
-def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
-    if pd is None or np is None:
-        raise ImportError("pandas and numpy are required for online model")
-    if not self._model_initialized:
-        return np.full((len(X), 2), 0.5)
-    data = self.scaler.transform(X[self.feature_cols].values)
-    return self.model.predict_proba(data)
+    def should_enter(self, probability: float) -> bool:
+        return probability >= self.probability_threshold
 
-def partial_fit_on_barclose(self, X: pd.DataFrame, y: np.ndarray) -> None:
-    if pd is None or np is None:
-        raise ImportError("pandas and numpy are required for online model")
-    if len(X) == 0:
-        return
-    mask = ~np.isnan(y)
-    if not mask.any():
-        return
-    X_fit = X.loc[mask]
-    y_fit = y[mask]
-    if X_fit.empty:
-        return
-    data = self._prepare(X_fit)
-    classes = np.array([0, 1])
-    if not self._model_initialized:
-        self.model.partial_fit(data, y_fit, classes=classes)
-        self._model_initialized = True
-    else:
-        self.model.partial_fit(data, y_fit)
 
-def should_enter(self, probability: float) -> bool:
-    return probability >= self.probability_threshold
-all = ["OnlineModel"]
+__all__ = ["MODEL_FEATURES", "MODEL_NAME", "OnlineModel"]
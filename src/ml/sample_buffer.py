@@ -0,0 +1,81 @@
+﻿from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class _Pending:
+    ts_ns: np.ndarray
+    close: np.ndarray
+    features: np.ndarray
+
+
+class LabeledSampleBuffer:
+    """Feature rows waiting for the bar that labels them, per key (symbol).
+
+    A row's label is whether the close ``horizon`` bars later is above its
+    own close, the target of ``make_feature_label``. Rows are only released
+    once that later bar has closed, so the newest ``horizon`` rows of a key are
+    always held back and nothing is trained on a label from the future. Each
+    update touches only the new bars plus ``horizon`` pending rows.
+    """
+
+    def __init__(self, horizon: int = 1) -> None:
+        if horizon <= 0:
+            raise ValueError("horizon must be positive")
+        self.horizon = horizon
+        self._pending: Dict[Hashable, _Pending] = {}
+
+    def last_timestamp(self, key: Hashable) -> Optional[int]:
+        pending = self._pending.get(key)
+        if pending is None or len(pending.ts_ns) == 0:
+            return None
+        return int(pending.ts_ns[-1])
+
+    def new_rows(self, key: Hashable, ts_ns: np.ndarray) -> int:
+        """Offset of the first bar in ``ts_ns`` (sorted) that the buffer has not seen."""
+        last = self.last_timestamp(key)
+        return 0 if last is None else int(np.searchsorted(ts_ns, last, side="right"))
+
+    def update(
+        self,
+        key: Hashable,
+        ts_ns: np.ndarray,
+        close: np.ndarray,
+        features: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Add closed bars and return the ``(X, y)`` rows whose label bar has now closed.
+
+        Bars at or before the last one seen are ignored, as are released rows
+        with missing feature values (indicator warm-up).
+        """
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        close = np.asarray(close, dtype=np.float64)
+        features = np.asarray(features, dtype=np.float64)
+        start = self.new_rows(key, ts_ns)
+        ts_ns, close, features = ts_ns[start:], close[start:], features[start:]
+        pending = self._pending.get(key)
+        if pending is not None:
+            ts_ns = np.concatenate([pending.ts_ns, ts_ns])
+            close = np.concatenate([pending.close, close])
+            features = np.concatenate([pending.features, features])
+        ready = len(ts_ns) - self.horizon
+        self._pending[key] = _Pending(ts_ns[-self.horizon :], close[-self.horizon :], features[-self.horizon :])
+        if ready <= 0:
+            return features[:0], close[:0]
+        X = features[:ready]
+        y = (close[self.horizon :] > close[:ready]).astype(np.float64)
+        usable = ~np.isnan(X).any(axis=1)
+        return X[usable], y[usable]
+
+    def clear(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._pending.clear()
+        else:
+            self._pending.pop(key, None)
+
+
+__all__ = ["LabeledSampleBuffer"]
@@ -0,0 +1,356 @@
+﻿from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.backfill import timeframe_to_ms
+from ..data.features import make_feature_label
+from ..data.market_data import MarketDataService
+from ..data.panel_features import compute_features_many
+from .model_store import ModelStore
+from .online_model import MODEL_FEATURES, MODEL_NAME, OnlineModel
+
+logger = logging.getLogger(__name__)
+
+# arrays written per symbol by ``build_datasets``
+DATASET_ARRAYS = ("X", "y", "ret", "ts")
+
+# {symbol: {array: memmap}} opened once per worker process by the pool initializer
+_WORKER_DATA: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+
+
+@dataclass(frozen=True)
+class ModelCandidate:
+    """SGD settings of one ``OnlineModel`` configuration under evaluation."""
+
+    alpha: float = 0.0001
+    epochs: int = 1
+    batch_size: int = 256
+
+
+@dataclass(frozen=True)
+class PurgedFold:
+    """Expanding-window split on timestamps (ns); ``train_end`` and ``test_end`` are exclusive.
+
+    Train rows stop a purge gap before ``test_start`` so no training label is
+    computed from a close inside the test window.
+    """
+
+    index: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+@dataclass
+class TrainingReport:
+    rows: Dict[str, int]
+    build_seconds: float
+    train_seconds: float
+    rows_trained: int
+    scores: pd.DataFrame
+    best: Dict[str, object]
+    checkpoint: Optional[Path] = None
+    folds: List[PurgedFold] = field(default_factory=list)
+
+    @property
+    def build_rows_per_sec(self) -> float:
+        return sum(self.rows.values()) / self.build_seconds if self.build_seconds else 0.0
+
+    @property
+    def train_rows_per_sec(self) -> float:
+        return self.rows_trained / self.train_seconds if self.train_seconds else 0.0
+
+
+def _dataset_dir(root: Path, symbol: str) -> Path:
+    return Path(root) / symbol.replace("/", "_")
+
+
+def _write_array(path: Path, values: np.ndarray) -> None:
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=values.dtype, shape=values.shape)
+    out[...] = values
+    out.flush()
+    del out
+
+
+def build_datasets(
+    service: MarketDataService,
+    symbols: Sequence[str],
+    timeframe: str,
+    root: Path,
+    start=None,
+    end=None,
+    feature_cols: Sequence[str] = MODEL_FEATURES,
+) -> Dict[str, Path]:
+    """Write each symbol's labelled feature rows under ``root/<symbol>/``.
+
+    Features come from ``compute_features_many`` over the whole candle history
+    and labels from ``make_feature_label``, so row ``t`` only sees bars up to
+    ``t`` and its label is the next close. Rows still inside the indicator
+    warm-up are dropped. Every array is a ``.npy`` file that training maps
+    read-only: ``X`` (rows x features), ``y`` (0/1), ``ret`` (the forward
+    return behind the label) and ``ts`` (bar open, ns).
+    """
+    frames = {}
+    for symbol in symbols:
+        df = service.fetch_range(symbol, timeframe, start=start, end=end)
+        if df.empty:
+            logger.warning("No %s candles for %s; skipping", timeframe, symbol)
+            continue
+        frames[symbol] = df
+    features = compute_features_many(frames) if frames else {}
+
+    paths = {}
+    for symbol, df in frames.items():
+        X, y = make_feature_label(df, features=features[symbol].reindex(df.index)[list(feature_cols)])
+        forward_return = (df["close"].shift(-1) / df["close"] - 1.0).iloc[:-1]
+        usable = X.notna().all(axis=1).to_numpy()
+        directory = _dataset_dir(root, symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "X": X.to_numpy(dtype=np.float64)[usable],
+            "y": y.to_numpy(dtype=np.float64)[usable],
+            "ret": forward_return.to_numpy(dtype=np.float64)[usable],
+            "ts": pd.DatetimeIndex(X.index).asi8[usable].astype(np.int64),
+        }
+        for name, values in arrays.items():
+            _write_array(directory / f"{name}.npy", values)
+        meta = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "feature_cols": list(feature_cols),
+            "rows": int(usable.sum()),
+        }
+        (directory / "meta.json").write_text(json.dumps(meta))
+        paths[symbol] = directory
+    return paths
+
+
+def load_dataset(path: Path, mmap_mode: Optional[str] = "r") -> Dict[str, np.ndarray]:
+    path = Path(path)
+    return {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in DATASET_ARRAYS}
+
+
+def purged_time_folds(ts_ns: np.ndarray, n_splits: int, purge_ns: int) -> List[PurgedFold]:
+    """Split the sorted unique timestamps into ``n_splits + 1`` blocks; fold ``k`` tests block ``k + 1``.
+
+    Training expands over every earlier block minus the ``purge_ns`` before
+    the test window.
+    """
+    if n_splits <= 0:
+        raise ValueError("n_splits must be positive")
+    stamps = np.unique(np.asarray(ts_ns, dtype=np.int64))
+    if len(stamps) < n_splits + 1:
+        raise ValueError("Not enough timestamps for the requested folds")
+    blocks = np.array_split(stamps, n_splits + 1)
+    folds = []
+    for k, block in enumerate(blocks[1:]):
+        test_start = int(block[0])
+        test_end = int(block[-1]) + 1
+        folds.append(PurgedFold(k, test_start - purge_ns, test_start, test_end))
+    return folds
+
+
+def _rows(data: Dict[str, Dict[str, np.ndarray]], lo: Optional[int], hi: int) -> Tuple[np.ndarray, ...]:
+    """``(X, y, ret)`` of all symbols with ``lo <= ts < hi``, interleaved in time order."""
+    parts = []
+    for arrays in data.values():
+        ts = arrays["ts"]
+        first = 0 if lo is None else int(np.searchsorted(ts, lo, side="left"))
+        last = int(np.searchsorted(ts, hi, side="left"))
+        if last > first:
+            window = slice(first, last)
+            parts.append((ts[window], arrays["X"][window], arrays["y"][window], arrays["ret"][window]))
+    if not parts:
+        width = next(iter(data.values()))["X"].shape[1] if data else 0
+        return np.empty((0, width)), np.empty(0), np.empty(0)
+    order = np.argsort(np.concatenate([p[0] for p in parts]), kind="stable")
+    X = np.concatenate([p[1] for p in parts])[order]
+    y = np.concatenate([p[2] for p in parts])[order]
+    ret = np.concatenate([p[3] for p in parts])[order]
+    return X, y, ret
+
+
+def fit_model(
+    candidate: ModelCandidate,
+    X: np.ndarray,
+    y: np.ndarray,
+    feature_cols: Sequence[str],
+    random_state: Optional[int] = None,
+) -> OnlineModel:
+    """Train an ``OnlineModel`` the way the bot does, in time-ordered mini-batches."""
+    model = OnlineModel(feature_cols=list(feature_cols), alpha=candidate.alpha, random_state=random_state)
+    step = candidate.batch_size
+    for _ in range(candidate.epochs):
+        for offset in range(0, len(y), step):
+            model.partial_fit_on_barclose(X[offset : offset + step], y[offset : offset + step])
+    return model
+
+
+def _init_worker(paths: Dict[str, str]) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = {symbol: load_dataset(path) for symbol, path in paths.items()}
+
+
+def evaluate_candidate(task: tuple, data: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> List[Dict[str, object]]:
+    """Fit one candidate on a fold's training rows and score every threshold on its test rows."""
+    candidate, fold, thresholds, feature_cols, random_state = task
+    data = data or _WORKER_DATA
+    X, y, _ = _rows(data, None, fold.train_end)
+    model = fit_model(candidate, X, y, feature_cols, random_state)
+    X_test, y_test, ret_test = _rows(data, fold.test_start, fold.test_end)
+    proba = model.predict_up(X_test)
+    clipped = np.clip(proba, 1e-12, 1 - 1e-12)
+    log_loss = float(-np.mean(y_test * np.log(clipped) + (1 - y_test) * np.log(1 - clipped))) if len(y_test) else np.nan
+    rows = []
+    for threshold in thresholds:
+        selected = proba >= threshold
+        count = int(selected.sum())
+        rows.append(
+            {
+                **asdict(candidate),
+                "fold": fold.index,
+                "threshold": float(threshold),
+                "train_rows": len(y),
+                "test_rows": len(y_test),
+                "selected": count,
+                "precision": float(y_test[selected].mean()) if count else np.nan,
+                "edge": float(ret_test[selected].mean()) if count else np.nan,
+                "log_loss": log_loss,
+            }
+        )
+    return rows
+
+
+def select_best(scores: pd.DataFrame, min_selected: int = 20) -> Dict[str, object]:
+    """Candidate and threshold with the highest mean forward return per selected row across folds.
+
+    Combinations selecting fewer than ``min_selected`` test rows in total are
+    ignored, so a threshold that almost never fires cannot win on noise.
+    """
+    keys = [*ModelCandidate.__dataclass_fields__, "threshold"]
+    weighted = scores.assign(gain=scores["edge"].fillna(0.0) * scores["selected"])
+    summary = weighted.groupby(keys, as_index=False).agg(
+        selected=("selected", "sum"),
+        gain=("gain", "sum"),
+        precision=("precision", "mean"),
+        log_loss=("log_loss", "mean"),
+    )
+    summary["edge"] = summary["gain"] / summary["selected"].where(summary["selected"] > 0)
+    eligible = summary[summary["selected"] >= min_selected]
+    if eligible.empty:
+        raise ValueError(f"No candidate selected at least {min_selected} test rows")
+    # a one-row frame keeps each column's dtype, so integer fields stay integers
+    best = eligible.loc[[eligible["edge"].idxmax()], [*keys, "selected", "edge", "precision", "log_loss"]]
+    return best.to_dict("records")[0]
+
+
+def run_training(
+    service: MarketDataService,
+    symbols: Sequence[str],
+    timeframe: str,
+    root: Path,
+    candidates: Sequence[ModelCandidate] = (ModelCandidate(),),
+    thresholds: Sequence[float] = (0.5, 0.55, 0.6, 0.65),
+    n_splits: int = 4,
+    start=None,
+    end=None,
+    store: Optional[ModelStore] = None,
+    min_selected: int = 20,
+    max_workers: Optional[int] = None,
+    random_state: Optional[int] = 0,
+) -> TrainingReport:
+    """Build datasets, cross-validate candidates in parallel and save the winner to ``store``.
+
+    Every (candidate, fold) pair is one task in a process pool; workers map
+    the dataset files once in their initializer instead of receiving arrays.
+    The winning candidate is retrained on all rows, given its threshold with
+    ``threshold_tuned`` set, and saved under ``MODEL_NAME`` where the bot's
+    warm start picks it up.
+    """
+    feature_cols = list(MODEL_FEATURES)
+    started = time.perf_counter()
+    paths = build_datasets(service, symbols, timeframe, root, start=start, end=end, feature_cols=feature_cols)
+    build_seconds = time.perf_counter() - started
+    if not paths:
+        raise ValueError("No candles to train on")
+    data = {symbol: load_dataset(path) for symbol, path in paths.items()}
+    rows = {symbol: len(arrays["y"]) for symbol, arrays in data.items()}
+    logger.info(
+        "Built %d rows for %d symbols in %.2fs (%.0f rows/s)",
+        sum(rows.values()),
+        len(rows),
+        build_seconds,
+        sum(rows.values()) / build_seconds if build_seconds else 0.0,
+    )
+
+    # a row's label is the next close, so one bar of training history before each test window is purged
+    stamps = np.concatenate([arrays["ts"] for arrays in data.values()])
+    folds = purged_time_folds(stamps, n_splits, purge_ns=timeframe_to_ms(timeframe) * 1_000_000)
+    tasks = [(c, f, tuple(thresholds), feature_cols, random_state) for c, f in product(candidates, folds)]
+    started = time.perf_counter()
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        outcomes = [evaluate_candidate(task, data) for task in tasks]
+    else:
+        initargs = ({symbol: str(path) for symbol, path in paths.items()},)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            outcomes = list(pool.map(evaluate_candidate, tasks))
+    scores = pd.DataFrame([row for outcome in outcomes for row in outcome])
+    best = select_best(scores, min_selected=min_selected)
+
+    X, y, _ = _rows(data, None, np.iinfo(np.int64).max)
+    candidate = ModelCandidate(**{name: best[name] for name in ModelCandidate.__dataclass_fields__})
+    model = fit_model(candidate, X, y, feature_cols, random_state)
+    train_seconds = time.perf_counter() - started
+    model.probability_threshold = float(best["threshold"])
+    model.threshold_tuned = True
+    checkpoint = store.save(model, MODEL_NAME) if store is not None else None
+
+    # rows passed through SGD: each (candidate, fold) fit, then the final fit on everything
+    fits = scores.drop_duplicates([*ModelCandidate.__dataclass_fields__, "fold"])
+    rows_trained = int((fits["train_rows"] * fits["epochs"]).sum()) + len(y) * candidate.epochs
+    report = TrainingReport(
+        rows=rows,
+        build_seconds=build_seconds,
+        train_seconds=train_seconds,
+        rows_trained=rows_trained,
+        scores=scores,
+        best=best,
+        checkpoint=checkpoint,
+        folds=folds,
+    )
+    logger.info(
+        "Trained %d tasks on %d workers in %.2fs (%.0f rows/s); best %s",
+        len(tasks),
+        workers,
+        train_seconds,
+        report.train_rows_per_sec,
+        best,
+    )
+    return report
+
+
+__all__ = [
+    "DATASET_ARRAYS",
+    "ModelCandidate",
+    "PurgedFold",
+    "TrainingReport",
+    "build_datasets",
+    "evaluate_candidate",
+    "fit_model",
+    "load_dataset",
+    "purged_time_folds",
+    "run_training",
+    "select_best",
+]
@@ -1,23 +1,31 @@
 ﻿from .store import (
-EquityMetrics,
-compute_equity_metrics,
-load_equity_series,
-load_status,
-load_trades,
-state_dir,
-status_file,
-equity_file,
-trades_file,
+    EquityAccumulator,
+    EquityMetrics,
+    compute_equity_metrics,
+    load_equity_accumulator,
+    load_equity_series,
+    load_status,
+    load_trades,
+    metrics_file,
+    save_equity_accumulator,
+    state_dir,
+    status_file,
+    equity_file,
+    trades_file,
 )
 
-all = [
-"EquityMetrics",
-"compute_equity_metrics",
-"load_equity_series",
-"load_status",
-"load_trades",
-"state_dir",
-"status_file",
-"equity_file",
-"trades_file",
+__all__ = [
+    "EquityAccumulator",
+    "EquityMetrics",
+    "compute_equity_metrics",
+    "load_equity_accumulator",
+    "load_equity_series",
+    "load_status",
+    "load_trades",
+    "metrics_file",
+    "save_equity_accumulator",
+    "state_dir",
+    "status_file",
+    "equity_file",
+    "trades_file",
 ]
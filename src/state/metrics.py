@@ -0,0 +1,168 @@
+﻿from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+try:  # pragma: no cover - optional heavy deps
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+    pd = None  # type: ignore
+
+
+@dataclass
+class EquityMetrics:
+    equity: float
+    wtd: float
+    ytd: float
+    max_drawdown: float
+    sharpe: float
+
+
+def _day_start(ts):
+    return ts.normalize()
+
+
+def _week_start(ts):
+    return (ts - pd.Timedelta(days=ts.weekday())).normalize()
+
+
+def _year_start(ts):
+    return ts.replace(month=1, day=1).normalize()
+
+
+# period name -> start of the period containing a timestamp
+PERIODS: Dict[str, Callable] = {"day": _day_start, "week": _week_start, "year": _year_start}
+
+
+@dataclass
+class EquityAccumulator:
+    """Running equity statistics, updated in O(1) per equity point.
+
+    Returns are tracked with Welford's mean/variance, drawdown against the
+    running peak, and each period in ``PERIODS`` remembers the equity at its
+    first point so period-to-date returns need no history. The state is plain
+    JSON via ``to_dict``/``from_dict``.
+    """
+
+    count: int = 0
+    last_value: float = math.nan
+    last_timestamp: Optional[str] = None
+    returns: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    peak: float = -math.inf
+    max_drawdown: float = 0.0
+    period_starts: Dict[str, str] = field(default_factory=dict)
+    period_opens: Dict[str, float] = field(default_factory=dict)
+
+    def update(self, timestamp, value: float) -> None:
+        ts = pd.Timestamp(timestamp)
+        value = float(value)
+        if self.count and self.last_value:
+            ret = value / self.last_value - 1.0
+            self.returns += 1
+            delta = ret - self.mean
+            self.mean += delta / self.returns
+            self.m2 += delta * (ret - self.mean)
+        self.peak = max(self.peak, value)
+        if self.peak > 0:
+            self.max_drawdown = min(self.max_drawdown, value / self.peak - 1.0)
+        for name, start_of in PERIODS.items():
+            start = start_of(ts).isoformat()
+            if self.period_starts.get(name) != start:
+                self.period_starts[name] = start
+                self.period_opens[name] = value
+        self.count += 1
+        self.last_value = value
+        self.last_timestamp = ts.isoformat()
+
+    @classmethod
+    def from_series(cls, series: "pd.Series") -> "EquityAccumulator":
+        """Accumulator state after ``series``, computed in one vectorized pass."""
+        acc = cls()
+        series = series.dropna()
+        if series.empty:
+            return acc
+        index = pd.DatetimeIndex(series.index)
+        values = series.to_numpy(dtype=np.float64)
+        returns = values[1:] / values[:-1] - 1.0
+        returns = returns[np.isfinite(returns)]
+        acc.returns = len(returns)
+        if acc.returns:
+            acc.mean = float(returns.mean())
+            acc.m2 = float(((returns - acc.mean) ** 2).sum())
+        running_max = np.maximum.accumulate(values)
+        acc.peak = float(running_max[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            acc.max_drawdown = float(min(np.nanmin(values / running_max - 1.0), 0.0))
+        last = index[-1]
+        for name, start_of in PERIODS.items():
+            start = start_of(last)
+            acc.period_starts[name] = start.isoformat()
+            acc.period_opens[name] = float(values[index.searchsorted(start)])
+        acc.count = len(values)
+        acc.last_value = float(values[-1])
+        acc.last_timestamp = last.isoformat()
+        return acc
+
+    @property
+    def sharpe(self) -> float:
+        """``mean / std * sqrt(n)`` of point-to-point returns, as in ``compute_metrics``."""
+        if self.returns == 0:
+            return 0.0
+        std = math.sqrt(self.m2 / (self.returns - 1)) if self.returns > 1 else math.nan
+        return self.mean / (std + 1e-9) * math.sqrt(self.returns)
+
+    def period_return(self, period: str, now=None) -> float:
+        """Percent change since the first point of the current ``period``.
+
+        With ``now``, a period that has no points yet (the last point belongs to
+        an earlier one) reports 0.
+        """
+        if self.count == 0:
+            return 0.0
+        start = self.period_starts[period]
+        if now is not None and PERIODS[period](pd.Timestamp(now)).isoformat() != start:
+            return 0.0
+        opened = self.period_opens[period]
+        return (self.last_value / opened - 1.0) * 100.0 if opened else 0.0
+
+    def metrics(self) -> EquityMetrics:
+        if self.count == 0:
+            return EquityMetrics(0.0, 0.0, 0.0, 0.0, 0.0)
+        return EquityMetrics(
+            equity=self.last_value,
+            wtd=self.period_return("week"),
+            ytd=self.period_return("year"),
+            max_drawdown=self.max_drawdown * 100.0,
+            sharpe=self.sharpe,
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "last_value": None if math.isnan(self.last_value) else self.last_value,
+            "last_timestamp": self.last_timestamp,
+            "returns": self.returns,
+            "mean": self.mean,
+            "m2": self.m2,
+            "peak": None if math.isinf(self.peak) else self.peak,
+            "max_drawdown": self.max_drawdown,
+            "period_starts": dict(self.period_starts),
+            "period_opens": dict(self.period_opens),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "EquityAccumulator":
+        values = dict(data)
+        if values.get("last_value") is None:
+            values["last_value"] = math.nan
+        if values.get("peak") is None:
+            values["peak"] = -math.inf
+        return cls(**values)
+
+
+__all__ = ["EquityAccumulator", "EquityMetrics", "PERIODS"]
@@ -1,17 +1,75 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Mapping, Optional, Protocol, Tuple
 
+import numpy as np
 import pandas as pd
 
+
 class Strategy(Protocol):
-def generate_signals(self, df: pd.DataFrame) -> pd.Series: ...
-def name(self) -> str: ...
+    # features ``generate_signals`` reads; see ``src.data.features.FEATURE_REGISTRY``
+    required_features: Tuple[str, ...]
+
+    def generate_signals(self, df: pd.DataFrame, features: Optional[pd.DataFrame] = None) -> pd.Series: ...
+    # ``features`` (aligned with ``df``) is required: this method exists to skip recomputing
+    # indicators over the whole history each bar, so callers keep them incrementally
+    # (StreamingFeatureSet, FeatureCache)
+    def evaluate_latest(self, df: pd.DataFrame, features: pd.DataFrame) -> "LatestSignal": ...
+    def signal_grid(
+        self, df: pd.DataFrame, features: pd.DataFrame, params: Mapping[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]: ...
+    def name(self) -> str: ...
+    def warmup(self) -> int: ...
+
 
 @dataclass
 class SignalResult:
-entries: pd.Series
-exits: pd.Series
+    entries: pd.Series
+    exits: pd.Series
+
+
+@dataclass
+class LatestSignal:
+    """Entry/exit decision for the newest bar only; matches ``generate_signals(...).iloc[-1]``."""
+
+    entry: bool
+    exit: bool
+
+
+def latest_value(series: pd.Series, offset: int = 1) -> float:
+    """``series.iloc[-offset]`` as a float, NaN when the series is too short."""
+    return float(series.iat[-offset]) if len(series) >= offset else float("nan")
+
+
+def grid_param(params: Mapping[str, np.ndarray], name: str, default: float) -> np.ndarray:
+    """A swept parameter as a (1 x runs) row, or its fixed value as (1 x 1), for broadcasting."""
+    return np.atleast_1d(np.asarray(params.get(name, default), dtype=np.float64))[None, :]
+
+
+def grid_runs(params: Mapping[str, np.ndarray]) -> int:
+    return max((len(np.atleast_1d(values)) for values in params.values()), default=1)
+
+
+def column(values: pd.Series) -> np.ndarray:
+    return values.to_numpy(dtype=np.float64)[:, None]
+
+
+def shift_rows(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise ``shift(1)``; the first row is NaN, or False for boolean matrices."""
+    out = np.empty_like(matrix)
+    out[:1] = np.nan if matrix.dtype.kind == "f" else False
+    out[1:] = matrix[:-1]
+    return out
+
 
-all = ["Strategy", "SignalResult"]
+__all__ = [
+    "LatestSignal",
+    "SignalResult",
+    "Strategy",
+    "column",
+    "grid_param",
+    "grid_runs",
+    "latest_value",
+    "shift_rows",
+]
@@ -1,29 +1,74 @@
 ﻿from __future__ import annotations
 
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+
 try:
-import pandas as pd
-except ImportError: # pragma: no cover - optional dependency
-pd = None # type: ignore
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+
+from .base import LatestSignal, SignalResult, column, grid_param, grid_runs, latest_value, shift_rows
+from ..data.features import compute_features, warmup_bars
 
-from .base import SignalResult
-from ..data.features import compute_features
 
 class BreakoutATRStrategy:
-def __init__(self, lookback: int = 20, atr_mult: float = 1.5) -> None:
-self.lookback = lookback
-self.atr_mult = atr_mult
-
-def name(self) -> str:
-    return "breakout_atr"
-
-def generate_signals(self, df: pd.DataFrame) -> SignalResult:
-    if pd is None:
-        raise ImportError("pandas is required for strategy signals")
-    features = compute_features(df)
-    rolling_high = df["close"].rolling(window=self.lookback, min_periods=1).max()
-    trigger = rolling_high + features["atr"] * self.atr_mult
-    entries = (df["close"] > trigger.shift(1)).astype(int)
-    trailing_stop = (df["close"] - features["atr"] * self.atr_mult)
-    exits = (df["close"] < trailing_stop.shift(1)).astype(int)
-    return SignalResult(entries=entries, exits=exits.fillna(0))
-all = ["BreakoutATRStrategy"]
+    required_features = ("atr",)
+
+    def __init__(self, lookback: int = 20, atr_mult: float = 1.5) -> None:
+        self.lookback = lookback
+        self.atr_mult = atr_mult
+
+    def name(self) -> str:
+        return "breakout_atr"
+
+    def warmup(self) -> int:
+        return max(warmup_bars(self.required_features), self.lookback + 1)
+
+    def generate_signals(self, df: pd.DataFrame, features: Optional[pd.DataFrame] = None) -> SignalResult:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if features is None:
+            features = compute_features(df, names=self.required_features)
+        rolling_high = df["close"].rolling(window=self.lookback, min_periods=1).max()
+        trigger = rolling_high + features["atr"] * self.atr_mult
+        entries = (df["close"] > trigger.shift(1)).astype(int)
+        trailing_stop = (df["close"] - features["atr"] * self.atr_mult)
+        exits = (df["close"] < trailing_stop.shift(1)).astype(int)
+        return SignalResult(entries=entries, exits=exits.fillna(0))
+
+    def evaluate_latest(self, df: pd.DataFrame, features: pd.DataFrame) -> LatestSignal:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if len(df) < 2:
+            return LatestSignal(entry=False, exit=False)
+        # yesterday's trigger and stop: the rolling high over the ``lookback`` bars before the newest one
+        closes = df["close"].iloc[-(self.lookback + 1) :].to_numpy(dtype=float)
+        prior = closes[:-1][~np.isnan(closes[:-1])]
+        rolling_high = float(prior.max()) if len(prior) else float("nan")
+        atr = latest_value(features["atr"], 2) * self.atr_mult
+        close = float(closes[-1])
+        entry = close > rolling_high + atr
+        exit_ = close < float(closes[-2]) - atr
+        return LatestSignal(entry=bool(entry), exit=bool(exit_))
+
+    def signal_grid(
+        self, df: pd.DataFrame, features: pd.DataFrame, params: Mapping[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(bar x run) entry/exit matrices, one column per swept parameter set."""
+        shape = (len(df), grid_runs(params))
+        lookbacks = np.broadcast_to(grid_param(params, "lookback", self.lookback)[0], shape[1]).astype(int)
+        unique, which = np.unique(lookbacks, return_inverse=True)
+        # one rolling max per distinct lookback, shared by every atr_mult
+        highs = np.column_stack(
+            [df["close"].rolling(window=int(n), min_periods=1).max().to_numpy(dtype=np.float64) for n in unique]
+        )
+        close = column(df["close"])
+        band = column(features["atr"]) * grid_param(params, "atr_mult", self.atr_mult)
+        entries = close > shift_rows(np.broadcast_to(highs[:, which] + band, shape))
+        exits = close < shift_rows(np.broadcast_to(close - band, shape))
+        return entries, exits
+
+
+__all__ = ["BreakoutATRStrategy"]
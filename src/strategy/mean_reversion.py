@@ -1,26 +1,60 @@
 ﻿from __future__ import annotations
 
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+
 try:
-import pandas as pd
-except ImportError: # pragma: no cover - optional dependency
-pd = None # type: ignore
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+
+from .base import LatestSignal, SignalResult, column, grid_param, grid_runs, latest_value
+from ..data.features import compute_features, warmup_bars
 
-from .base import SignalResult
-from ..data.features import compute_features
 
 class MeanReversionStrategy:
-def __init__(self, rsi_entry: float = 30.0, rsi_exit: float = 45.0) -> None:
-self.rsi_entry = rsi_entry
-self.rsi_exit = rsi_exit
-
-def name(self) -> str:
-    return "mean_reversion"
-
-def generate_signals(self, df: pd.DataFrame) -> SignalResult:
-    if pd is None:
-        raise ImportError("pandas is required for strategy signals")
-    features = compute_features(df)
-    entries = ((features["rsi"] < self.rsi_entry) & (df["close"] < features["bollinger_low"])).astype(int)
-    exits = ((features["rsi"] > self.rsi_exit) | (df["close"] >= features["bollinger_mid"])).astype(int)
-    return SignalResult(entries=entries, exits=exits)
-all = ["MeanReversionStrategy"]
+    required_features = ("rsi", "bollinger_low", "bollinger_mid")
+
+    def __init__(self, rsi_entry: float = 30.0, rsi_exit: float = 45.0) -> None:
+        self.rsi_entry = rsi_entry
+        self.rsi_exit = rsi_exit
+
+    def name(self) -> str:
+        return "mean_reversion"
+
+    def warmup(self) -> int:
+        return warmup_bars(self.required_features)
+
+    def generate_signals(self, df: pd.DataFrame, features: Optional[pd.DataFrame] = None) -> SignalResult:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if features is None:
+            features = compute_features(df, names=self.required_features)
+        entries = ((features["rsi"] < self.rsi_entry) & (df["close"] < features["bollinger_low"])).astype(int)
+        exits = ((features["rsi"] > self.rsi_exit) | (df["close"] >= features["bollinger_mid"])).astype(int)
+        return SignalResult(entries=entries, exits=exits)
+
+    def evaluate_latest(self, df: pd.DataFrame, features: pd.DataFrame) -> LatestSignal:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if len(df) == 0:
+            return LatestSignal(entry=False, exit=False)
+        close = latest_value(df["close"])
+        rsi = latest_value(features["rsi"])
+        entry = rsi < self.rsi_entry and close < latest_value(features["bollinger_low"])
+        exit_ = rsi > self.rsi_exit or close >= latest_value(features["bollinger_mid"])
+        return LatestSignal(entry=bool(entry), exit=bool(exit_))
+
+    def signal_grid(
+        self, df: pd.DataFrame, features: pd.DataFrame, params: Mapping[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(bar x run) entry/exit matrices, one column per swept parameter set."""
+        shape = (len(df), grid_runs(params))
+        close, rsi = column(df["close"]), column(features["rsi"])
+        entries = (rsi < grid_param(params, "rsi_entry", self.rsi_entry)) & (close < column(features["bollinger_low"]))
+        exits = (rsi > grid_param(params, "rsi_exit", self.rsi_exit)) | (close >= column(features["bollinger_mid"]))
+        return np.broadcast_to(entries, shape).copy(), np.broadcast_to(exits, shape).copy()
+
+
+__all__ = ["MeanReversionStrategy"]
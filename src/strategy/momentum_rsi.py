@@ -1,37 +1,87 @@
 ﻿from __future__ import annotations
 
+import math
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+
 try:
-import pandas as pd
-except ImportError: # pragma: no cover - optional dependency
-pd = None # type: ignore
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore
+
+from .base import LatestSignal, SignalResult, column, grid_param, grid_runs, latest_value, shift_rows
+from ..data.features import compute_features, warmup_bars
 
-from .base import SignalResult
-from ..data.features import compute_features
 
 class MomentumRSIStrategy:
-def __init__(
-self,
-rsi_entry: float = 55.0,
-rsi_exit: float = 50.0,
-vol_threshold: float = 0.02,
-) -> None:
-self.rsi_entry = rsi_entry
-self.rsi_exit = rsi_exit
-self.vol_threshold = vol_threshold
-
-def name(self) -> str:
-    return "momentum_rsi"
-
-def generate_signals(self, df: pd.DataFrame) -> SignalResult:
-    if pd is None:
-        raise ImportError("pandas is required for strategy signals")
-    features = compute_features(df)
-    atr_ratio = (features["atr"] / df["close"]).replace([float("inf"), float("-inf")], 0.0).fillna(0.0)
-    volatility_ok = atr_ratio < self.vol_threshold
-    long_condition = (features["sma_50"] > features["sma_200"]) & (features["rsi"] > self.rsi_entry) & volatility_ok
-    exit_condition = (features["rsi"] < self.rsi_exit) | (features["sma_50"] < features["sma_200"])
-
-    entries = long_condition.astype(int).shift(1).fillna(0).astype(int)
-    exits = exit_condition.astype(int).shift(1).fillna(0).astype(int)
-    return SignalResult(entries=entries, exits=exits)
-all = ["MomentumRSIStrategy"]
+    required_features = ("sma_50", "sma_200", "rsi", "atr")
+
+    def __init__(
+        self,
+        rsi_entry: float = 55.0,
+        rsi_exit: float = 50.0,
+        vol_threshold: float = 0.02,
+    ) -> None:
+        self.rsi_entry = rsi_entry
+        self.rsi_exit = rsi_exit
+        self.vol_threshold = vol_threshold
+
+    def name(self) -> str:
+        return "momentum_rsi"
+
+    def warmup(self) -> int:
+        return warmup_bars(self.required_features)
+
+    def generate_signals(self, df: pd.DataFrame, features: Optional[pd.DataFrame] = None) -> SignalResult:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if features is None:
+            features = compute_features(df, names=self.required_features)
+        atr_ratio = (features["atr"] / df["close"]).replace([float("inf"), float("-inf")], 0.0).fillna(0.0)
+        volatility_ok = atr_ratio < self.vol_threshold
+        long_condition = (features["sma_50"] > features["sma_200"]) & (features["rsi"] > self.rsi_entry) & volatility_ok
+        exit_condition = (features["rsi"] < self.rsi_exit) | (features["sma_50"] < features["sma_200"])
+
+        entries = long_condition.astype(int).shift(1).fillna(0).astype(int)
+        exits = exit_condition.astype(int).shift(1).fillna(0).astype(int)
+        return SignalResult(entries=entries, exits=exits)
+
+    def evaluate_latest(self, df: pd.DataFrame, features: pd.DataFrame) -> LatestSignal:
+        if pd is None:
+            raise ImportError("pandas is required for strategy signals")
+        if len(df) < 2:
+            return LatestSignal(entry=False, exit=False)
+        # signals act one bar late, so the newest decision reads the previous row
+        close = latest_value(df["close"], 2)
+        sma_50 = latest_value(features["sma_50"], 2)
+        sma_200 = latest_value(features["sma_200"], 2)
+        rsi = latest_value(features["rsi"], 2)
+        atr_ratio = latest_value(features["atr"], 2) / close if close else 0.0
+        if math.isnan(atr_ratio) or math.isinf(atr_ratio):
+            atr_ratio = 0.0
+        entry = sma_50 > sma_200 and rsi > self.rsi_entry and atr_ratio < self.vol_threshold
+        exit_ = rsi < self.rsi_exit or sma_50 < sma_200
+        return LatestSignal(entry=bool(entry), exit=bool(exit_))
+
+    def signal_grid(
+        self, df: pd.DataFrame, features: pd.DataFrame, params: Mapping[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(bar x run) entry/exit matrices, one column per swept parameter set."""
+        shape = (len(df), grid_runs(params))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            atr_ratio = column(features["atr"]) / column(df["close"])
+        atr_ratio[~np.isfinite(atr_ratio)] = 0.0
+        sma_50, sma_200, rsi = column(features["sma_50"]), column(features["sma_200"]), column(features["rsi"])
+        long_condition = (
+            (sma_50 > sma_200)
+            & (rsi > grid_param(params, "rsi_entry", self.rsi_entry))
+            & (atr_ratio < grid_param(params, "vol_threshold", self.vol_threshold))
+        )
+        exit_condition = (rsi < grid_param(params, "rsi_exit", self.rsi_exit)) | (sma_50 < sma_200)
+        entries = shift_rows(np.broadcast_to(long_condition, shape))
+        exits = shift_rows(np.broadcast_to(exit_condition, shape))
+        return entries, exits
+
+
+__all__ = ["MomentumRSIStrategy"]
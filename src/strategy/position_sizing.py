@@ -1,20 +1,43 @@
 ﻿from __future__ import annotations
 
+import numpy as np
+
+
 def position_size(
-equity: float,
-entry_px: float,
-atr: float,
-risk_per_trade: float,
-stop_atr_mult: float,
+    equity: float,
+    entry_px: float,
+    atr: float,
+    risk_per_trade: float,
+    stop_atr_mult: float = 2.0,
 ) -> float:
-"""Berechnet StÃ¼ckzahl so, dass ATR*mult Verlust ~ risk_per_trade * equity entspricht."""
-if equity <= 0 or entry_px <= 0 or atr <= 0:
-return 0.0
-risk_amount = equity * risk_per_trade
-stop_distance = atr * stop_atr_mult
-if stop_distance <= 0:
-return 0.0
-quantity = risk_amount / stop_distance
-return max(float(quantity), 0.0)
-
-all = ["position_size"]
+    """Berechnet Stückzahl so, dass ATR*mult Verlust ~ risk_per_trade * equity entspricht."""
+    if equity <= 0 or entry_px <= 0 or atr <= 0:
+        return 0.0
+    risk_amount = equity * risk_per_trade
+    stop_distance = atr * stop_atr_mult
+    if stop_distance <= 0:
+        return 0.0
+    quantity = risk_amount / stop_distance
+    return max(float(quantity), 0.0)
+
+
+def position_fraction(
+    entry_px: np.ndarray,
+    atr: np.ndarray,
+    risk_per_trade: float,
+    stop_atr_mult: float,
+) -> np.ndarray:
+    """``position_size(equity, entry_px, atr, ...) * entry_px / equity`` element-wise.
+
+    The share of equity put into a position does not depend on equity, so
+    vectorised callers can size every bar at once. 0 where no position is taken.
+    """
+    entry_px = np.asarray(entry_px, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    stop_distance = atr * stop_atr_mult
+    valid = (entry_px > 0) & (atr > 0) & (stop_distance > 0) & (risk_per_trade > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, risk_per_trade * entry_px / stop_distance, 0.0)
+
+
+__all__ = ["position_fraction", "position_size"]
@@ -5,15 +5,61 @@ from pathlib import Path
 
 import pytest
 
-ROOT = Path(file).resolve().parents[1]
+ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
-sys.path.insert(0, str(SRC))
+    sys.path.insert(0, str(SRC))
+
 
 @pytest.fixture(autouse=True)
 def reset_settings_cache():
-from src.config import get_settings
+    from src.config import get_settings
+
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+HOUR_MS = 3_600_000
+BASE_MS = 1_700_000_000_000
+
+
+def random_walk(
+    n=600,
+    seed=7,
+    base=100.0,
+    drift=0.0,
+    vol=1.0,
+    spread=0.5,
+    spread_vol=0.0,
+    start="2024-01-01",
+    freq="h",
+):
+    """OHLCV frame around a Gaussian random walk of closes.
+
+    High/low sit ``spread`` away from the close, plus ``|N(0, spread_vol)|``
+    per bar when ``spread_vol`` is set.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    close = base + np.cumsum(rng.normal(drift, vol, n))
+    if spread_vol:
+        spread = np.abs(rng.normal(0, spread_vol, n)) + spread
+    idx = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame(
+        {"open": close, "high": close + spread, "low": close - spread, "close": close, "volume": 1.0},
+        index=idx,
+    )
+
+
+def candles(seed, count=400, step=HOUR_MS, drift=0.0):
+    """Raw ``[ts, open, high, low, close, volume]`` rows of a random walk, as MarketDataService.store takes them."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(drift, 1, count))
+    ts = BASE_MS + np.arange(count) * step
+    return np.column_stack([ts, close, close + 0.5, close - 0.5, close, np.ones(count)])
 
-get_settings.cache_clear()
-yield
-get_settings.cache_clear()
@@ -0,0 +1,122 @@
+﻿import sys
+import threading
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.backfill import BackfillCheckpoint, run_backfill, timeframe_to_ms
+from src.data.market_data import MarketDataService
+
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000 - 1_700_000_000_000 % HOUR_MS
+
+
+class FakeExchange:
+    """Minimal ccxt stand-in serving deterministic hourly bars."""
+
+    def __init__(self, bars=250, fail_after=None, last_close=None):
+        self.bars = bars
+        self.fail_after = fail_after
+        # close of the newest bar, e.g. while it is still forming
+        self.last_close = last_close
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        with self._lock:
+            self.calls += 1
+            if self.fail_after is not None and self.calls > self.fail_after:
+                raise ConnectionError("exchange unavailable")
+        first = max(0, (since - START_MS + HOUR_MS - 1) // HOUR_MS)
+        last = min(self.bars, first + limit)
+        offset = 0.0 if symbol.startswith("BTC") else 1000.0
+        rows = [
+            [START_MS + i * HOUR_MS, offset + i, offset + i + 1, offset + i - 1, offset + i + 0.5, 1.0]
+            for i in range(first, last)
+        ]
+        if self.last_close is not None and rows and last == self.bars:
+            rows[-1][4] = self.last_close
+        return rows
+
+
+def count(service, symbol):
+    with service.engine.begin() as conn:
+        return conn.exec_driver_sql("SELECT COUNT(*) FROM candles WHERE symbol = ?", (symbol,)).scalar()
+
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms("1m") == 60_000
+    assert timeframe_to_ms("4h") == 4 * HOUR_MS
+    with pytest.raises(ValueError):
+        timeframe_to_ms("1x")
+
+
+def test_backfill_pages_all_symbols(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    exchange = FakeExchange(bars=250)
+    report = run_backfill(
+        exchange,
+        service,
+        ["BTC/USDT", "ETH/USDT"],
+        "1h",
+        since_ms=START_MS,
+        until_ms=START_MS + 1000 * HOUR_MS,
+        checkpoint_path=tmp_path / "checkpoint.json",
+        max_workers=2,
+        rate_per_sec=0,
+        page_limit=100,
+        flush_rows=150,
+    )
+    assert report.bars == 500
+    assert report.per_symbol == {"BTC/USDT": 250, "ETH/USDT": 250}
+    assert report.bars_per_sec > 0 and report.pages_per_sec > 0
+    assert count(service, "BTC/USDT") == 250
+    assert count(service, "ETH/USDT") == 250
+    checkpoint = BackfillCheckpoint(tmp_path / "checkpoint.json")
+    assert checkpoint.get("BTC/USDT", "1h") == START_MS + 249 * HOUR_MS
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    kwargs = dict(
+        since_ms=START_MS,
+        until_ms=START_MS + 1000 * HOUR_MS,
+        checkpoint_path=tmp_path / "checkpoint.json",
+        max_workers=1,
+        rate_per_sec=0,
+        page_limit=50,
+        flush_rows=50,
+    )
+    with pytest.raises(ConnectionError):
+        run_backfill(FakeExchange(bars=300, fail_after=3), service, ["BTC/USDT"], "1h", **kwargs)
+    assert count(service, "BTC/USDT") == 150
+
+    resumed = FakeExchange(bars=300)
+    report = run_backfill(resumed, service, ["BTC/USDT"], "1h", **kwargs)
+    assert report.bars == 150
+    assert count(service, "BTC/USDT") == 300
+
+
+def test_backfill_leaves_the_open_bar_for_later(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    kwargs = dict(
+        since_ms=START_MS,
+        checkpoint_path=tmp_path / "checkpoint.json",
+        max_workers=1,
+        rate_per_sec=0,
+    )
+    # "now" is half way through bar 249, which the exchange already serves with a provisional close
+    forming = FakeExchange(bars=250, last_close=-1.0)
+    report = run_backfill(forming, service, ["BTC/USDT"], "1h", until_ms=START_MS + 249 * HOUR_MS + HOUR_MS // 2, **kwargs)
+    assert report.bars == 249
+    assert count(service, "BTC/USDT") == 249
+    assert BackfillCheckpoint(tmp_path / "checkpoint.json").get("BTC/USDT", "1h") == START_MS + 248 * HOUR_MS
+
+    # once the bar has closed the next run stores its final values
+    run_backfill(FakeExchange(bars=250), service, ["BTC/USDT"], "1h", until_ms=START_MS + 250 * HOUR_MS, **kwargs)
+    last = service.fetch_range("BTC/USDT", "1h")["close"].iloc[-1]
+    assert count(service, "BTC/USDT") == 250
+    assert last == 249.5
@@ -0,0 +1,71 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.batch import BacktestJob, run_backtest_matrix, run_job
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.data.columnar_store import ColumnarMarketDataService
+from src.data.market_data import MarketDataService
+from tests.conftest import HOUR_MS, candles
+
+
+def fill(service):
+    for seed, symbol in enumerate(["BTC/USDT", "ETH/USDT"]):
+        service.store(symbol, "1h", candles(seed))
+        service.store(symbol, "4h", candles(seed + 10, count=250, step=4 * HOUR_MS))
+
+
+def test_matrix_from_sqlite_is_staged_and_written_incrementally(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'candles.db'}")
+    fill(service)
+    output = tmp_path / "matrix.csv"
+
+    result = run_backtest_matrix(service, ["BTC/USDT", "ETH/USDT"], ["1h", "4h"], output, max_workers=2)
+
+    assert len(result) == 2 * 2 * 3
+    assert result["error"].isna().all()
+    assert (result.loc[result["timeframe"] == "4h", "bars"] == 250).all()
+    written = pd.read_csv(output)
+    assert len(written) == len(result)
+    assert set(written["strategy"]) == {"momentum_rsi", "mean_reversion", "breakout_atr"}
+
+
+def test_matrix_cells_match_single_job_on_columnar_store(tmp_path):
+    service = ColumnarMarketDataService(root=str(tmp_path / "columnar"))
+    fill(service)
+    engine = VectorizedBacktestEngine(commission=0.002)
+
+    result = run_backtest_matrix(
+        service, ["BTC/USDT"], ["1h"], tmp_path / "out.csv", strategies=["breakout_atr"], engine=engine, max_workers=1
+    )
+    single = run_job(BacktestJob("BTC/USDT", "1h", "breakout_atr"), engine, root=service.root)
+
+    assert result.iloc[0]["Equity Final"] == pytest.approx(single["Equity Final"])
+
+
+def test_missing_series_is_reported_not_raised(tmp_path):
+    service = ColumnarMarketDataService(root=str(tmp_path / "columnar"))
+    row = run_job(BacktestJob("NOPE/USDT", "1h", "momentum_rsi"), VectorizedBacktestEngine(), root=service.root)
+    assert "not enough candles" in row["error"]
+
+
+def test_matrix_reuses_cached_cells(tmp_path):
+    service = ColumnarMarketDataService(root=str(tmp_path / "columnar"))
+    fill(service)
+    kwargs = dict(strategies=["breakout_atr", "mean_reversion"], max_workers=2, cache_dir=tmp_path / "cache")
+
+    first = run_backtest_matrix(service, ["BTC/USDT", "ETH/USDT"], ["1h"], tmp_path / "a.csv", **kwargs)
+    second = run_backtest_matrix(service, ["BTC/USDT", "ETH/USDT"], ["1h"], tmp_path / "b.csv", **kwargs)
+
+    assert not first["cached"].any()
+    assert second["cached"].all()
+    key = ["symbol", "strategy"]
+    pd.testing.assert_series_equal(
+        first.sort_values(key)["Equity Final"].reset_index(drop=True),
+        second.sort_values(key)["Equity Final"].reset_index(drop=True),
+    )
@@ -3,30 +3,123 @@ from pathlib import Path
 
 import pytest
 pytest.importorskip("pandas")
+import numpy as np
 import pandas as pd
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from src.backtest.engine import BacktestEngine
+from src.backtest.vectorized import VectorizedBacktestEngine, position_state
 from src.strategy.momentum_rsi import MomentumRSIStrategy
 from src.strategy.base import SignalResult
+from src.strategy.position_sizing import position_size
+
 
 def sample_df():
-idx = pd.date_range("2023-01-01", periods=200, freq="H")
-close = pd.Series(range(200), index=idx) + 100
-df = pd.DataFrame({
-"open": close - 1,
-"high": close + 1,
-"low": close - 2,
-"close": close,
-"volume": 100,
-})
-return df
+    idx = pd.date_range("2023-01-01", periods=200, freq="H")
+    close = pd.Series(range(200), index=idx) + 100
+    df = pd.DataFrame({
+        "open": close - 1,
+        "high": close + 1,
+        "low": close - 2,
+        "close": close,
+        "volume": 100,
+    })
+    return df
+
 
 def test_backtest_engine_runs():
-df = sample_df()
-strategy = MomentumRSIStrategy()
-signals = strategy.generate_signals(df)
-engine = BacktestEngine()
-result = engine.run(df, signals, symbol="BTC/USDT")
-assert not result.equity_curve.empty
-assert isinstance(result.stats, dict)
+    pytest.importorskip("pandas_ta")
+    df = sample_df()
+    strategy = MomentumRSIStrategy()
+    signals = strategy.generate_signals(df)
+    engine = BacktestEngine()
+    result = engine.run(df, signals, symbol="BTC/USDT")
+    assert not result.equity_curve.empty
+    assert isinstance(result.stats, dict)
+
+
+def reference_loop(engine, close, entries, exits, atr):
+    cash, units, equity = engine.cash, 0.0, []
+    for t in range(len(close)):
+        if entries[t] and units == 0:
+            price = close[t] * (1 + engine.slippage)
+            qty = position_size(cash, price, atr[t], engine.risk_per_trade, engine.stop_atr_mult)
+            qty = min(qty, cash / (price * (1 + engine.commission)))
+            if qty > 0:
+                cash -= qty * price * (1 + engine.commission)
+                units = qty
+        elif exits[t] and units > 0:
+            cash += units * close[t] * (1 - engine.slippage) * (1 - engine.commission)
+            units = 0.0
+        equity.append(cash + units * close[t])
+    return np.array(equity)
+
+
+def random_signals(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    atr = np.abs(rng.normal(1.0, 0.5, n))
+    atr[:14] = np.nan
+    return close, rng.random(n) < 0.05, rng.random(n) < 0.05, atr
+
+
+def test_position_state_matches_toggle_loop():
+    _, entries, exits, _ = random_signals(2_000)
+    state, expected = False, []
+    for entry, exit_ in zip(entries, exits):
+        if entry and not state:
+            state = True
+        elif exit_ and state:
+            state = False
+        expected.append(state)
+    assert (position_state(entries, exits) == np.array(expected)).all()
+
+
+def test_vectorized_engine_matches_reference_loop():
+    close, entries, exits, atr = random_signals(5_000)
+    engine = VectorizedBacktestEngine(commission=0.001, slippage=0.0005, risk_per_trade=0.02)
+    equity, trades = engine.simulate(close, entries, exits, atr)
+    expected = reference_loop(engine, close, entries, exits, atr)
+    assert len(trades["pnl"]) > 10
+    assert np.allclose(equity, expected, rtol=1e-9)
+    assert np.isclose(engine.cash + trades["pnl"].sum(), equity[trades["exit_bar"][-1]])
+
+
+def test_vectorized_engine_reads_the_current_bar():
+    df = sample_df()
+    entries = pd.Series(0, index=df.index)
+    exits = pd.Series(0, index=df.index)
+    entries.iloc[10] = 1
+    exits.iloc[30] = 1
+    result = VectorizedBacktestEngine(commission=0.0).run(df, SignalResult(entries, exits), symbol="BTC/USDT")
+    trade = result.trades.iloc[0]
+    assert (trade["EntryBar"], trade["ExitBar"]) == (10, 30)
+    assert trade["EntryPrice"] == df["close"].iloc[10]
+    assert result.stats["Equity Final"] == pytest.approx(result.equity_curve.iloc[-1])
+    assert result.equity_curve.iloc[:10].eq(10_000.0).all()
+
+
+def test_backtest_engine_trades_assets_priced_above_equity():
+    pytest.importorskip("backtesting")
+    df = sample_df() * 300
+    entries = pd.Series(0, index=df.index)
+    exits = pd.Series(0, index=df.index)
+    entries.iloc[10] = 1
+    exits.iloc[30] = 1
+    result = BacktestEngine().run(df, SignalResult(entries, exits), symbol="BTC/USDT")
+    assert df["close"].iloc[10] > BacktestEngine().cash
+    assert len(result.trades) == 1
+    assert 0 < result.trades["Size"].iloc[0] * df["close"].iloc[10] < BacktestEngine().cash
+
+
+def test_backtest_engine_sizes_on_unscaled_prices():
+    pytest.importorskip("backtesting")
+    df = sample_df()
+    entries = pd.Series(0, index=df.index)
+    exits = pd.Series(0, index=df.index)
+    entries.iloc[10] = 1
+    exits.iloc[30] = 1
+    result = BacktestEngine(commission=0.0).run(df, SignalResult(entries, exits), symbol="BTC/USDT")
+    # 1% risk over a 2% stand-in stop puts half of equity into the position
+    cost = result.trades["Size"].iloc[0] * result.trades["EntryPrice"].iloc[0]
+    assert cost == pytest.approx(5_000.0, rel=1e-3)
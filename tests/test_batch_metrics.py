@@ -0,0 +1,57 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.metrics import METRIC_FIELDS, compute_metrics, compute_metrics_batch
+
+
+def ragged_runs(runs=40, bars=600, seed=0):
+    """NaN-padded equity matrix with runs of different lengths and start bars, plus their trades."""
+    rng = np.random.default_rng(seed)
+    equity = np.full((bars, runs), np.nan)
+    for j in range(runs):
+        start = int(rng.integers(0, bars // 3))
+        stop = int(rng.integers(start + 2, bars + 1))
+        equity[start:stop, j] = 1000 * np.cumprod(1 + rng.normal(0.0005, 0.01, stop - start))
+    run = rng.integers(0, runs, 5 * runs)
+    trades = pd.DataFrame({"run": run, "PnL": rng.normal(1.0, 10.0, len(run))})
+    return equity, trades
+
+
+def per_curve(equity, trades):
+    rows = []
+    for j in range(equity.shape[1]):
+        curve = pd.Series(equity[:, j]).dropna()
+        metrics = compute_metrics(curve, trades[trades["run"] == j])
+        rows.append([getattr(metrics, name) for name in METRIC_FIELDS])
+    return pd.DataFrame(rows, columns=METRIC_FIELDS)
+
+
+def test_batch_matches_per_curve_loop_on_ragged_runs():
+    equity, trades = ragged_runs()
+    batch = compute_metrics_batch(equity, trades)
+    expected = per_curve(equity, trades)
+
+    for name in METRIC_FIELDS:
+        np.testing.assert_allclose(batch[name], expected[name], rtol=1e-9, err_msg=name)
+
+
+def test_labelled_runs_and_runs_without_trades():
+    equity = pd.DataFrame({"a": [100.0, 110.0, 99.0, 120.0], "b": [np.nan, 100.0, 100.0, 90.0]})
+    trades = pd.DataFrame({"run": ["a", "a"], "PnL": [10.0, -5.0]})
+
+    batch = compute_metrics_batch(equity, trades)
+
+    assert list(batch.index) == ["a", "b"]
+    assert batch.at["a", "win_rate"] == 0.5
+    assert batch.at["a", "profit_factor"] == pytest.approx(2.0)
+    assert batch.at["b", "win_rate"] == 0.0
+    assert batch.at["b", "max_drawdown"] == pytest.approx(-0.1)
+    with pytest.raises(KeyError):
+        compute_metrics_batch(equity, pd.DataFrame({"run": ["c"], "PnL": [1.0]}))
+
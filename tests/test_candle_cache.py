@@ -0,0 +1,66 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.candle_cache import CachedMarketData, OHLCVRingBuffer
+from src.data.market_data import MarketDataService
+
+HOUR_MS = 3_600_000
+
+
+def rows(start, count, base_ms=1_700_000_000_000):
+    out = []
+    for i in range(start, start + count):
+        out.append([base_ms + i * HOUR_MS, i, i + 1, i - 1, i + 0.5, 1.0])
+    return out
+
+
+class SpyService:
+    def __init__(self, service):
+        self.service = service
+        self.returned = []
+
+    def fetch(self, symbol, timeframe, since=None, limit=500):
+        df = self.service.fetch(symbol, timeframe, since=since, limit=limit)
+        self.returned.append(len(df))
+        return df
+
+
+def test_ring_buffer_window_is_contiguous_view():
+    buf = OHLCVRingBuffer(capacity=4)
+    for i in range(7):
+        buf.append(np.array([i], dtype=np.int64), np.full((1, 5), float(i)))
+    ts, values = buf.window()
+    assert list(ts) == [3, 4, 5, 6]
+    assert values[:, 3].tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert np.shares_memory(values, buf._values)
+    frame = buf.frame(2)
+    assert frame["close"].tolist() == [5.0, 6.0]
+    assert np.shares_memory(frame["close"].to_numpy(), buf._values)
+
+
+def test_cached_market_data_pulls_only_new_bars(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    service.store("BTC/USDT", "1h", rows(0, 30))
+    spy = SpyService(service)
+    cache = CachedMarketData(spy, capacity=20)
+
+    first = cache.fetch("BTC/USDT", "1h", limit=20)
+    assert len(first) == 20
+    assert first["close"].iloc[-1] == 29.5
+
+    assert len(cache.fetch("BTC/USDT", "1h", limit=20)) == 20
+    service.store("BTC/USDT", "1h", rows(30, 3))
+    latest = cache.fetch("BTC/USDT", "1h", limit=20)
+
+    assert spy.returned == [20, 0, 3]
+    assert latest["close"].iloc[-1] == 32.5
+    assert latest.index.is_monotonic_increasing
+    expected = service.fetch("BTC/USDT", "1h", limit=20)
+    assert np.allclose(latest["close"].to_numpy(), expected["close"].to_numpy())
+    assert list(latest.index) == list(expected.index)
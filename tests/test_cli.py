@@ -0,0 +1,69 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def parse(argv):
+    # uvicorn, fastapi, yfinance and streamlit are only imported by the subcommands that need them
+    from src import main
+
+    args = main.parse_args(argv)
+    assert args.command == argv[0]
+    assert callable(args.func)
+    return args
+
+
+def test_backfill_command():
+    args = parse(["backfill", "--since", "2024-01-01", "--workers", "2"])
+    assert args.since == "2024-01-01" and args.workers == 2
+
+
+def test_migrate_candles_command():
+    assert parse(["migrate-candles", "--columnar-path", "data/candles"]).columnar_path == "data/candles"
+
+
+def test_backtest_matrix_command():
+    assert parse(["backtest-matrix", "--workers", "2"]).workers == 2
+
+
+def test_replay_command():
+    assert parse(["replay", "--symbols", "BTC/USDT"]).symbols == "BTC/USDT"
+
+
+def test_backtest_monte_carlo_option():
+    args = parse(["backtest", "--monte-carlo", "100", "--mc-method", "block"])
+    assert args.monte_carlo == 100 and args.mc_method == "block"
+
+
+def test_train_command():
+    assert parse(["train", "--folds", "3"]).folds == 3
+
+
+def test_backtest_passes_the_feature_atr(tmp_path, monkeypatch):
+    import numpy as np
+    from src import main
+    from src.backtest.vectorized import VectorizedBacktestEngine
+    from src.data.market_data import MarketDataService
+
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'candles.db'}")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 300))
+    ts = 1_704_067_200_000 + np.arange(300) * 3_600_000
+    service.store("BTC/USDT", "1h", np.column_stack([ts, close, close + 0.5, close - 0.5, close, np.ones(300)]))
+    monkeypatch.setattr(main, "default_market_data_service", lambda: service)
+    seen = {}
+    original = VectorizedBacktestEngine.run
+
+    def run(self, df, signals, symbol, atr=None):
+        seen["atr"] = atr
+        return original(self, df, signals, symbol, atr=atr)
+
+    monkeypatch.setattr(VectorizedBacktestEngine, "run", run)
+    args = parse(["backtest", "--symbols", "BTC/USDT"])
+    args.func(args)
+    assert seen["atr"] is not None and len(seen["atr"]) == 300
+    assert seen["atr"].iloc[-1] > 0
@@ -0,0 +1,55 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.columnar_store import ColumnarMarketDataService, migrate_sqlite_to_columnar
+from src.data.market_data import MarketDataService
+
+HOUR_MS = 3_600_000
+BASE_MS = 1_700_000_000_000
+
+
+def rows(start, count):
+    return [[BASE_MS + i * HOUR_MS, i, i + 1, i - 1, i + 0.5, 1.0] for i in range(start, start + count)]
+
+
+def test_columnar_append_and_range_views(tmp_path):
+    service = ColumnarMarketDataService(root=str(tmp_path / "candles"))
+    assert service.store("BTC/USDT", "1h", rows(0, 100)).inserted == 100
+    assert service.store("BTC/USDT", "1h", rows(90, 20)).inserted == 10
+
+    tail = service.fetch("BTC/USDT", "1h", limit=5)
+    assert tail["close"].tolist() == [105.5, 106.5, 107.5, 108.5, 109.5]
+
+    start = pd.Timestamp(BASE_MS + 10 * HOUR_MS, unit="ms")
+    end = pd.Timestamp(BASE_MS + 19 * HOUR_MS, unit="ms")
+    window = service.fetch_range("BTC/USDT", "1h", start=start, end=end)
+    assert len(window) == 10
+    assert window.index[0] == start and window.index[-1] == end
+    _, columns = service.store_backend.columns("BTC/USDT", "1h")
+    assert np.shares_memory(window["close"].to_numpy(), columns["close"])
+
+    since = service.fetch("BTC/USDT", "1h", since=BASE_MS + 107 * HOUR_MS)
+    assert since["close"].tolist() == [108.5, 109.5]
+
+
+def test_migrate_sqlite_candles(tmp_path):
+    source = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    source.store("BTC/USDT", "1h", rows(0, 250))
+    source.store("ETH/USDT", "4h", rows(0, 30))
+    target = ColumnarMarketDataService(root=str(tmp_path / "candles"))
+
+    copied = migrate_sqlite_to_columnar(source, target, chunk_rows=64)
+
+    assert copied == {("BTC/USDT", "1h"): 250, ("ETH/USDT", "4h"): 30}
+    expected = source.fetch_range("BTC/USDT", "1h")
+    migrated = target.fetch_range("BTC/USDT", "1h")
+    assert list(migrated.index) == list(expected.index)
+    assert np.allclose(migrated.to_numpy(), expected.to_numpy())
+    assert migrate_sqlite_to_columnar(source, target)[("ETH/USDT", "4h")] == 0
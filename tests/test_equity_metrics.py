@@ -0,0 +1,85 @@
+﻿import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.state.metrics import EquityAccumulator
+from src.state.store import compute_equity_metrics, save_equity_accumulator
+
+
+def equity_series(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2023-12-20", periods=n, freq="4h")
+    return pd.Series(10_000 * np.cumprod(1 + rng.normal(0, 0.01, n)), index=idx)
+
+
+def rescan(series):
+    """The from-scratch pandas computation the accumulator replaces."""
+    last = series.index[-1]
+    week = series[series.index >= (last - pd.Timedelta(days=last.weekday())).normalize()]
+    year = series[series.index >= last.replace(month=1, day=1).normalize()]
+    returns = series.pct_change().dropna()
+    return {
+        "equity": series.iloc[-1],
+        "wtd": (week.iloc[-1] / week.iloc[0] - 1) * 100,
+        "ytd": (year.iloc[-1] / year.iloc[0] - 1) * 100,
+        "max_drawdown": ((series / series.cummax()) - 1).min() * 100,
+        "sharpe": returns.mean() / (returns.std() + 1e-9) * len(returns) ** 0.5,
+    }
+
+
+def test_incremental_and_vectorized_match_rescan():
+    series = equity_series()
+    acc = EquityAccumulator()
+    for ts, value in series.items():
+        acc.update(ts, value)
+    seeded = EquityAccumulator.from_series(series)
+
+    expected = rescan(series)
+    for metrics in (acc.metrics(), seeded.metrics()):
+        for name, value in expected.items():
+            assert getattr(metrics, name) == pytest.approx(value, rel=1e-9), name
+
+
+def test_state_survives_serialisation_mid_stream():
+    series = equity_series(seed=1)
+    acc = EquityAccumulator()
+    for ts, value in series.iloc[:300].items():
+        acc.update(ts, value)
+    acc = EquityAccumulator.from_dict(json.loads(json.dumps(acc.to_dict())))
+    for ts, value in series.iloc[300:].items():
+        acc.update(ts, value)
+
+    assert asdict(acc.metrics()) == pytest.approx(asdict(EquityAccumulator.from_series(series).metrics()))
+    assert EquityAccumulator.from_dict(EquityAccumulator().to_dict()).metrics().equity == 0.0
+
+
+def test_period_return_is_zero_before_the_first_point_of_a_new_day():
+    acc = EquityAccumulator()
+    acc.update("2024-01-01 10:00", 1000.0)
+    acc.update("2024-01-01 12:00", 960.0)
+
+    assert acc.period_return("day", now="2024-01-01 13:00") == pytest.approx(-4.0)
+    assert acc.period_return("day", now="2024-01-02 00:30") == 0.0
+
+
+def test_compute_equity_metrics_reads_the_accumulator(monkeypatch, tmp_path):
+    monkeypatch.setenv("STATE_PATH", str(tmp_path))
+    from src.config import get_settings
+
+    get_settings.cache_clear()
+    series = equity_series()
+    series.rename_axis("timestamp").rename("equity").to_csv(tmp_path / "equity.csv")
+    assert compute_equity_metrics().sharpe == pytest.approx(rescan(series)["sharpe"])
+
+    acc = EquityAccumulator()
+    acc.update("2024-01-01", 5.0)
+    save_equity_accumulator(acc, tmp_path)
+    assert compute_equity_metrics().equity == 5.0
+    get_settings.cache_clear()
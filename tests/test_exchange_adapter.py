@@ -0,0 +1,145 @@
+﻿import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+ccxt = pytest.importorskip("ccxt")
+pytest.importorskip("tenacity")
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.broker import binance_adapter
+from src.broker.binance_adapter import BinanceAdapter, MarketMetadataCache, step_tables
+from src.config import Settings
+from src.execute.executor import Executor
+
+def market(symbol, amount_step, price_step):
+    base, quote = symbol.split("/")
+    return {
+        "id": base + quote,
+        "symbol": symbol,
+        "base": base,
+        "quote": quote,
+        "baseId": base,
+        "quoteId": quote,
+        "type": "spot",
+        "spot": True,
+        "active": True,
+        "precision": {"amount": amount_step, "price": price_step},
+        "limits": {"amount": {"min": amount_step}, "cost": {"min": 5.0}, "price": {}},
+        "info": {},
+    }
+
+
+MARKETS = [market("BTC/USDT", 0.00001, 0.01), market("ETH/USDT", 0.0001, 0.01), market("DOGE/USDT", 1.0, 0.00001)]
+
+
+class FakeExchange(ccxt.binance):
+    """Binance client whose network calls are local; clearing ``release`` holds market loads."""
+
+    def __init__(self):
+        super().__init__({"enableRateLimit": False})
+        self.market_loads = 0
+        self.orders = []
+        self.loading = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def fetch_currencies(self, params={}):
+        return {}
+
+    def fetch_markets(self, params={}):
+        self.market_loads += 1
+        self.loading.set()
+        assert self.release.wait(5)
+        return [dict(m) for m in MARKETS]
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        # ccxt loads markets before every order; this returns at once only when they are already set
+        self.load_markets()
+        self.orders.append((symbol, side, amount, price, params["newClientOrderId"]))
+        return {"symbol": symbol, "side": side, "amount": amount, "price": price, "params": params}
+
+
+def fake_exchanges(monkeypatch):
+    """Every exchange the adapter module builds from here on, in creation order."""
+    exchanges = []
+
+    def build(*_, **__):
+        exchanges.append(FakeExchange())
+        return exchanges[-1]
+
+    monkeypatch.setattr(binance_adapter, "mk_exchange", build)
+    monkeypatch.setattr(binance_adapter, "_ADAPTERS", {})
+    return exchanges
+
+
+def live_settings(tmp_path, **overrides):
+    return Settings(binance_api_key="key", binance_api_secret="secret", binance_testnet=False, state_path=str(tmp_path), **overrides)
+
+
+def send_orders(executor, count=20):
+    for i in range(count):
+        executor.execute_order("BTC/USDT", "buy", 0.0123456 + i * 1e-6, 30000.1234)
+
+
+def test_step_tables_match_ccxt_precision():
+    exchange = FakeExchange()
+    exchange.set_markets(MARKETS)
+    tables = step_tables(exchange.markets, exchange.precisionMode)
+    rng = np.random.default_rng(0)
+    for symbol, scale in [("BTC/USDT", 1.0), ("ETH/USDT", 10.0), ("DOGE/USDT", 1e5)]:
+        for amount, price in zip(rng.uniform(0.001, 2, 200) * scale, rng.uniform(0.01, 5e4, 200) / scale):
+            assert tables[symbol].amount(amount) == float(exchange.amount_to_precision(symbol, amount))
+            assert tables[symbol].price(price) == float(exchange.price_to_precision(symbol, price))
+    assert tables["BTC/USDT"].amount(0.3) == 0.3
+    assert tables["BTC/USDT"].min_cost == 5.0
+
+
+def test_one_adapter_per_process_loads_markets_once(tmp_path, monkeypatch):
+    fake_exchange = fake_exchanges(monkeypatch)
+    send_orders(Executor(settings=live_settings(tmp_path)))
+    send_orders(Executor(settings=live_settings(tmp_path)), count=5)
+
+    # both executors share one adapter, and no order after the first load reloads markets
+    assert len(fake_exchange) == 1 and fake_exchange[0].market_loads == 1
+    assert len(fake_exchange[0].orders) == 25
+    assert len({order[4] for order in fake_exchange[0].orders}) == 25
+    assert fake_exchange[0].orders[0][2:4] == (0.01234, 30000.12)
+
+
+def test_restart_reuses_cached_markets_from_disk(tmp_path, monkeypatch):
+    fake_exchange = fake_exchanges(monkeypatch)
+    send_orders(Executor(settings=live_settings(tmp_path)), count=1)
+    assert (tmp_path / "binance_markets.json").exists()
+
+    monkeypatch.setattr(binance_adapter, "_ADAPTERS", {})
+    send_orders(Executor(settings=live_settings(tmp_path)), count=5)
+
+    restarted = fake_exchange[-1]
+    assert len(fake_exchange) == 2 and restarted.market_loads == 0
+    assert len(restarted.orders) == 5
+
+
+def test_stale_markets_refresh_in_the_background(tmp_path, monkeypatch):
+    fake_exchange = fake_exchanges(monkeypatch)
+    cache = MarketMetadataCache(tmp_path / "markets.json", ttl=60)
+    cache.save(MARKETS, fetched_at=time.time() - 120)
+    adapter = BinanceAdapter(settings=live_settings(tmp_path), cache=cache)
+    exchange = fake_exchange[0]
+    exchange.release.clear()
+
+    adapter.create_order("ETH/USDT", "sell", 1.23456, 2000.005)
+    # the order went out on the cached tables while the reload is still held
+    assert exchange.loading.wait(5)
+    assert not adapter._pending.done()
+    assert exchange.orders[0][2] == 1.2345
+    assert adapter.maybe_refresh() is None  # one refresh at a time
+    exchange.release.set()
+    adapter._pending.result()
+    adapter.close()
+
+    assert exchange.market_loads == 1
+    assert not cache.is_stale(cache.load()[0])
+    assert adapter.maybe_refresh() is None
@@ -0,0 +1,74 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.feature_cache import FeatureCache
+from src.strategy.breakout_atr import BreakoutATRStrategy
+from src.strategy.mean_reversion import MeanReversionStrategy
+from src.strategy.momentum_rsi import MomentumRSIStrategy
+
+
+def sample_df(periods=50):
+    idx = pd.date_range("2023-01-01", periods=periods, freq="h")
+    close = pd.Series(range(periods), index=idx, dtype=float) + 100
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0})
+
+
+def fake_features(df):
+    return pd.DataFrame(
+        {
+            "sma_50": df["close"],
+            "sma_200": df["close"] - 1,
+            "rsi": 60.0,
+            "atr": 1.0,
+            "bollinger_low": df["close"] - 2,
+            "bollinger_mid": df["close"] + 2,
+        },
+        index=df.index,
+    )
+
+
+def test_cache_hits_misses_and_lru_eviction():
+    calls = []
+
+    def compute(df):
+        calls.append(len(df))
+        return fake_features(df)
+
+    cache = FeatureCache(maxsize=2)
+    df = sample_df()
+    first = cache.get_or_compute("BTC/USDT", "1h", df, compute=compute)
+    assert cache.get_or_compute("BTC/USDT", "1h", df, compute=compute) is first
+    cache.get_or_compute("ETH/USDT", "1h", df, compute=compute)
+    cache.get_or_compute("BTC/USDT", "1h", df.iloc[:-1], compute=compute)
+
+    assert calls == [50, 50, 49]
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["evictions"] == 1 and stats["size"] == 2
+    cache.get_or_compute("BTC/USDT", "1h", df, compute=compute)
+    assert calls[-1] == 50
+
+
+def test_strategies_use_precomputed_features(monkeypatch):
+    import src.data.features as features_module
+    from src.strategy import breakout_atr, mean_reversion, momentum_rsi
+
+    def fail(_df):
+        raise AssertionError("features must not be recomputed")
+
+    for module in (features_module, breakout_atr, mean_reversion, momentum_rsi):
+        monkeypatch.setattr(module, "compute_features", fail)
+
+    df = sample_df()
+    features = fake_features(df)
+    for strategy in (MomentumRSIStrategy(), MeanReversionStrategy(), BreakoutATRStrategy()):
+        signals = strategy.generate_signals(df, features=features)
+        assert len(signals.entries) == len(df)
+
+    feats, label = features_module.make_feature_label(df, features=features)
+    assert len(feats) == len(label) == len(df) - 1
@@ -5,28 +5,61 @@ import pytest
 pytest.importorskip("pandas")
 import pandas as pd
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
-from src.data.features import compute_features, make_feature_label
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.features import FEATURE_COLUMNS, compute_features, make_feature_label, resolve_features, warmup_bars
+
 
 def sample_df():
-idx = pd.date_range("2023-01-01", periods=300, freq="H")
-data = {
-"open": range(300),
-"high": [v + 1 for v in range(300)],
-"low": [v - 1 for v in range(300)],
-"close": [v + 0.5 for v in range(300)],
-"volume": [100] * 300,
-}
-return pd.DataFrame(data, index=idx)
+    idx = pd.date_range("2023-01-01", periods=300, freq="H")
+    data = {
+        "open": range(300),
+        "high": [v + 1 for v in range(300)],
+        "low": [v - 1 for v in range(300)],
+        "close": [v + 0.5 for v in range(300)],
+        "volume": [100] * 300,
+    }
+    return pd.DataFrame(data, index=idx)
+
 
 def test_compute_features_shapes():
-df = sample_df()
-feats = compute_features(df)
-assert {"sma_10", "rsi", "atr"}.issubset(feats.columns)
-assert len(feats) == len(df)
+    pytest.importorskip("pandas_ta")
+    df = sample_df()
+    feats = compute_features(df)
+    assert {"sma_10", "rsi", "atr"}.issubset(feats.columns)
+    assert len(feats) == len(df)
+
 
 def test_make_feature_label_alignment():
-df = sample_df()
-feats, label = make_feature_label(df)
-assert len(feats) == len(label)
-assert set(label.unique()).issubset({0, 1})
+    pytest.importorskip("pandas_ta")
+    df = sample_df()
+    feats, label = make_feature_label(df)
+    assert len(feats) == len(label)
+    assert set(label.unique()).issubset({0, 1})
+
+
+def test_named_features_compute_only_requested_and_dependencies():
+    df = sample_df()
+    feats = compute_features(df, names=["bollinger_low", "sma_10"])
+    assert list(feats.columns) == ["bollinger_low", "sma_10", "bollinger_mid", "bollinger_std"]
+    close = df["close"]
+    expected = close.rolling(20).mean() - 2.0 * close.rolling(20).std(ddof=0)
+    assert feats["bollinger_low"].equals(expected)
+
+
+def test_named_features_match_full_frame():
+    pytest.importorskip("pandas_ta")
+    df = sample_df()
+    full = compute_features(df)
+    subset = compute_features(df, names=["atr", "bollinger_high"])
+    assert list(full.columns) == FEATURE_COLUMNS
+    for col in ("atr", "bollinger_high"):
+        assert subset[col].equals(full[col])
+
+
+def test_resolve_and_warmup():
+    assert resolve_features(["bollinger_high"]) == ["bollinger_mid", "bollinger_std", "bollinger_high"]
+    assert warmup_bars(["atr"]) == 15
+    assert warmup_bars(["rsi", "bollinger_low"]) == 20
+    assert warmup_bars() == 200
+    with pytest.raises(KeyError):
+        resolve_features(["nope"])
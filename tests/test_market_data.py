@@ -0,0 +1,83 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.market_data import MarketDataService
+
+
+def sample_rows(n=300, start_ms=1_700_000_000_000):
+    rows = []
+    for i in range(n):
+        price = 100.0 + i
+        rows.append([start_ms + i * 3_600_000, price, price + 1, price - 1, price + 0.5, 10.0])
+    return rows
+
+
+def count_rows(service):
+    with service.engine.begin() as conn:
+        return conn.exec_driver_sql("SELECT COUNT(*) FROM candles").scalar()
+
+
+def test_store_dedupes_and_chunks(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    rows = sample_rows()
+
+    report = service.store("BTC/USDT", "1h", rows, chunk_rows=64)
+    assert report.rows == 300
+    assert report.inserted == 300
+    assert report.rows_per_sec > 0
+
+    again = service.store("BTC/USDT", "1h", rows[-50:] + sample_rows(10, start_ms=rows[-1][0] + 3_600_000))
+    assert again.inserted == 10
+    assert count_rows(service) == 310
+
+    df = service.fetch("BTC/USDT", "1h", limit=5)
+    assert len(df) == 5
+    assert df["close"].iloc[-1] == 109.5
+
+
+def test_store_accepts_arrays_and_frames(tmp_path):
+    service = MarketDataService(engine_url=f"sqlite:///{tmp_path / 'bot.db'}")
+    array = np.asarray(sample_rows(20))
+    service.store("ETH/USDT", "1h", array)
+
+    frame = pd.DataFrame(
+        array[:, 1:],
+        columns=["open", "high", "low", "close", "volume"],
+        index=pd.to_datetime(array[:, 0].astype(np.int64), unit="ms"),
+    )
+    assert service.store("ETH/USDT", "1h", frame).inserted == 0
+    assert service.store("ETH/USDT", "4h", frame).inserted == 20
+
+    fetched = service.fetch("ETH/USDT", "1h", limit=100)
+    assert list(fetched.index) == list(frame.index)
+    assert np.allclose(fetched["close"].to_numpy(), frame["close"].to_numpy())
+
+
+def test_existing_duplicates_removed_on_startup(tmp_path):
+    from sqlalchemy import create_engine
+
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE candles (id INTEGER PRIMARY KEY, symbol VARCHAR NOT NULL, timeframe VARCHAR NOT NULL, "
+            "timestamp DATETIME NOT NULL, open FLOAT NOT NULL, high FLOAT NOT NULL, low FLOAT NOT NULL, "
+            "close FLOAT NOT NULL, volume FLOAT NOT NULL)"
+        )
+        for _ in range(3):
+            conn.exec_driver_sql(
+                "INSERT INTO candles (symbol, timeframe, timestamp, open, high, low, close, volume) "
+                "VALUES ('BTC/USDT', '1h', '2024-01-01 00:00:00.000000', 1, 2, 0.5, 1.5, 10)"
+            )
+    engine.dispose()
+
+    service = MarketDataService(engine_url=url)
+    assert count_rows(service) == 1
+    assert service.store("BTC/USDT", "1h", [[1_704_067_200_000, 1, 2, 0.5, 1.5, 10]]).inserted == 0
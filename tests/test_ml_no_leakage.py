@@ -7,18 +7,89 @@ pytest.importorskip("sklearn")
 import numpy as np
 import pandas as pd
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.features import make_feature_label
 from src.ml.online_model import OnlineModel
+from src.ml.sample_buffer import LabeledSampleBuffer
+
 
 def test_partial_fit_ignores_nan_labels():
-model = OnlineModel(feature_cols=["feat"], probability_threshold=0.55)
-df = pd.DataFrame({"feat": [1.0, 2.0, 3.0]})
-labels = np.array([0, 1, np.nan])
+    model = OnlineModel(feature_cols=["feat"], probability_threshold=0.55)
+    df = pd.DataFrame({"feat": [1.0, 2.0, 3.0]})
+    labels = np.array([0, 1, np.nan])
+
+    model.partial_fit_on_barclose(df, labels)
+
+    assert model._model_initialized is True
+    probs = model.predict_proba(df)
+    assert probs.shape == (3, 2)
+    assert model.should_enter(0.60) is True
+    assert model.should_enter(0.50) is False
+
+
+def bars(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq="h")
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)), index=idx)
+    feats = pd.DataFrame({"a": close.pct_change(), "b": close.rolling(5).mean() / close}, index=idx)
+    return pd.DataFrame({"close": close}), feats
+
+
+def test_buffer_releases_rows_only_after_their_label_bar_closes():
+    df, feats = bars()
+    buffer = LabeledSampleBuffer()
+    released = []
+    count = 0
+    for t in range(1, len(df) + 1):
+        window = df.iloc[:t]
+        start = buffer.new_rows("X", window.index.asi8)
+        X, y = buffer.update(
+            "X",
+            window.index.asi8[start:],
+            window["close"].to_numpy()[start:],
+            feats.iloc[:t].iloc[start:].to_numpy(),
+        )
+        # everything released so far was labelled by a bar that had already closed
+        count += len(y)
+        assert count <= t - 1
+        released.append((X, y))
+
+    X = np.concatenate([x for x, _ in released])
+    y = np.concatenate([y for _, y in released])
+    expected_X, expected_y = make_feature_label(df, features=feats)
+    usable = expected_X.notna().all(axis=1).to_numpy()
+    np.testing.assert_array_equal(X, expected_X.to_numpy()[usable])
+    np.testing.assert_array_equal(y, expected_y.to_numpy()[usable])
+
+
+def test_future_bars_do_not_change_released_labels():
+    df, feats = bars(seed=1)
+    ts, close, values = df.index.asi8, df["close"].to_numpy(), feats.to_numpy()
+    first = LabeledSampleBuffer()
+    X1, y1 = first.update("X", ts[:40], close[:40], values[:40])
+    shocked = close.copy()
+    shocked[40:] *= 10
+    second = LabeledSampleBuffer()
+    X2, y2 = second.update("X", ts[:40], shocked[:40], values[:40])
+
+    np.testing.assert_array_equal(y1, y2)
+    assert first.last_timestamp("X") == ts[39]
+    # repeated bars are ignored
+    assert len(first.update("X", ts[:40], close[:40], values[:40])[1]) == 0
+
+
+def test_numpy_and_frame_training_agree():
+    df, feats = bars(seed=2)
+    X, y = make_feature_label(df, features=feats)
+    X = X.dropna()
+    y = y.loc[X.index].to_numpy(dtype=float)
+    from_frame = OnlineModel(feature_cols=["a", "b"])
+    from_array = OnlineModel(feature_cols=["a", "b"])
+    from_frame.model.set_params(random_state=0)
+    from_array.model.set_params(random_state=0)
 
-model.partial_fit_on_barclose(df, labels)
+    from_frame.partial_fit_on_barclose(X, y)
+    from_array.partial_fit_on_barclose(X.to_numpy(), y)
 
-assert model._model_initialized is True
-probs = model.predict_proba(df)
-assert probs.shape == (3, 2)
-assert model.should_enter(0.60) is True
-assert model.should_enter(0.50) is False
+    np.testing.assert_allclose(from_frame.model.coef_, from_array.model.coef_)
+    np.testing.assert_allclose(from_frame.predict_proba(X), from_array.predict_proba(X))
@@ -0,0 +1,117 @@
+﻿import sys
+import threading
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.ml.model_store import ModelCheckpointer, ModelStore
+from src.ml.online_model import MODEL_NAME, OnlineModel
+
+
+def trained(feature_cols=("a", "b"), seed=0):
+    rng = np.random.default_rng(seed)
+    model = OnlineModel(feature_cols=list(feature_cols))
+    X = rng.normal(size=(50, len(feature_cols)))
+    model.partial_fit_on_barclose(X, (X[:, 0] > 0).astype(float))
+    return model, X
+
+
+def test_versioned_atomic_checkpoints(tmp_path):
+    store = ModelStore(tmp_path, keep=2)
+    model, X = trained()
+    first = store.save(model, "online_model")
+    second = store.save(model, "online_model")
+    latest, _ = trained(seed=1)
+    third = store.save(latest, "online_model")
+
+    assert [c.version for c in store.checkpoints("online_model")] == [2, 3]
+    assert not first.exists() and second.exists()
+    assert third.name.startswith("online_model-v000003-")
+    assert not list(tmp_path.glob("*.tmp"))
+    loaded = store.load("online_model")
+    np.testing.assert_allclose(loaded.predict_up(X), latest.predict_up(X))
+
+
+def test_latest_skips_incompatible_feature_sets(tmp_path):
+    store = ModelStore(tmp_path)
+    store.save(trained(("a", "b"))[0], "online_model")
+    store.save(trained(("a", "b", "c"))[0], "online_model")
+
+    assert store.latest("online_model", feature_cols=["a", "b"]).version == 1
+    assert store.latest("online_model").version == 2
+    assert store.latest("online_model", feature_cols=["x"]) is None
+
+
+def test_lru_shares_instances_and_detects_corruption(tmp_path):
+    store = ModelStore(tmp_path, cache_size=1)
+    store.save(trained()[0], "m1")
+    store.save(trained()[0], "m2")
+
+    m1 = store.load("m1")
+    assert store.load("m1") is m1
+    store.load("m2")
+    assert store.load("m1") is not m1
+
+    store = ModelStore(tmp_path)
+    checkpoint = store.latest("m2")
+    checkpoint.path.write_bytes(checkpoint.path.read_bytes()[:-1] + b"\0")
+    with pytest.raises(ValueError):
+        store.load_checkpoint(checkpoint)
+
+
+def test_memory_mapped_loading(tmp_path):
+    store = ModelStore(tmp_path)
+    store.save({"weights": np.arange(100_000, dtype=np.float64)}, "embedding")
+
+    loaded = store.load("embedding", mmap_mode="r")
+
+    assert isinstance(loaded["weights"], np.memmap)
+    assert loaded["weights"][-1] == 99_999
+
+
+def test_checkpointer_writes_in_background_and_skips_while_busy(tmp_path, monkeypatch):
+    store = ModelStore(tmp_path)
+    model, _ = trained()
+    release = threading.Event()
+    original = store.save
+
+    def slow_save(obj, name):
+        release.wait(5)
+        return original(obj, name)
+
+    monkeypatch.setattr(store, "save", slow_save)
+    checkpointer = ModelCheckpointer(store, "online_model", interval=0.0)
+    pending = checkpointer.maybe_checkpoint(model)
+    assert pending is not None and not pending.done()
+    assert checkpointer.maybe_checkpoint(model) is None
+    release.set()
+    assert pending.result(5).exists()
+    checkpointer.close(model)
+    # the skipped step is flushed on close
+    assert len(store.checkpoints("online_model")) == 2
+
+
+def test_paper_bot_warm_starts_from_latest_checkpoint(tmp_path):
+    from src.backtest.replay import ReplayMarketData, SimulatedClock
+    from src.config import Settings
+    from src.execute.bot import PaperBot
+
+    settings = Settings(model_path=str(tmp_path / "models"), ml_probability_threshold=0.6)
+    bot = PaperBot(settings=settings, market_data=ReplayMarketData({}, SimulatedClock()), state_path=tmp_path / "state")
+    assert bot.model._model_initialized is False
+    model, _ = trained(bot.model_features)
+    ModelStore(tmp_path / "models").save(model, MODEL_NAME)
+    bot.shutdown()
+
+    restarted = PaperBot(settings=settings, market_data=ReplayMarketData({}, SimulatedClock()), state_path=tmp_path / "state")
+    assert restarted.model._model_initialized is True
+    assert restarted.model.probability_threshold == 0.6
+    X = np.random.default_rng(3).normal(size=(4, len(bot.model_features)))
+    np.testing.assert_allclose(restarted.model.predict_up(X), model.predict_up(X))
+    restarted.shutdown()
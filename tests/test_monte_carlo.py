@@ -0,0 +1,74 @@
+﻿import functools
+import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.metrics import METRIC_FIELDS, compute_metrics
+from src.backtest.monte_carlo import path_metrics, run_monte_carlo, trade_returns
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.data.streaming_features import StreamingFeatureEngine
+from src.strategy.mean_reversion import MeanReversionStrategy
+
+
+@functools.lru_cache(maxsize=None)
+def sample_backtest():
+    rng = np.random.default_rng(4)
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1.0, 1500)), index=pd.date_range("2024-01-01", periods=1500, freq="h"))
+    df = pd.DataFrame({"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 1.0})
+    signals = MeanReversionStrategy(rsi_entry=45.0).generate_signals(df, features=StreamingFeatureEngine().seed(df))
+    result = VectorizedBacktestEngine().run(df, signals, symbol="X")
+    assert len(result.trades) >= 10
+    return result
+
+
+def test_path_metrics_match_compute_metrics():
+    rng = np.random.default_rng(0)
+    equity = 1000 * np.cumprod(1 + rng.normal(0.001, 0.01, (300, 5)), axis=0)
+    batch = path_metrics(equity)
+    for j in range(equity.shape[1]):
+        curve = pd.Series(equity[:, j])
+        expected = compute_metrics(curve, pd.DataFrame({"PnL": curve.diff().dropna()}))
+        for name in METRIC_FIELDS:
+            assert batch.at[j, name] == pytest.approx(getattr(expected, name), rel=1e-9), name
+
+
+def test_shuffle_keeps_terminal_wealth_but_spreads_drawdown():
+    backtest = sample_backtest()
+    mc = run_monte_carlo(backtest, n_paths=500, method="shuffle", seed=1, keep_paths=True)
+
+    final = backtest.equity_curve.iloc[0] * np.prod(1 + trade_returns(backtest))
+    assert mc.paths.shape == (len(backtest.trades) + 1, 500)
+    np.testing.assert_allclose(mc.paths[-1], final)
+    assert mc.metrics["win_rate"].nunique() == 1
+    assert mc.metrics["max_drawdown"].std() > 0
+    assert (mc.metrics["max_drawdown"] <= 0).all()
+
+
+def test_block_resampling_of_whole_curve_is_a_rotation():
+    backtest = sample_backtest()
+    bars = len(backtest.equity_curve) - 1
+    mc = run_monte_carlo(backtest, n_paths=50, method="block", block_size=bars, seed=2)
+    point = compute_metrics(backtest.equity_curve, backtest.trades)
+
+    np.testing.assert_allclose(mc.metrics["cagr"], point.cagr)
+    np.testing.assert_allclose(mc.metrics["sharpe"], point.sharpe)
+
+
+def test_confidence_intervals_cover_every_metric():
+    backtest = sample_backtest()
+    mc = run_monte_carlo(backtest, n_paths=2000, seed=3, max_cells=5000)
+
+    assert len(mc.metrics) == 2000
+    table = mc.confidence_intervals()
+    assert list(table.index) == METRIC_FIELDS
+    assert (table[0.05] <= table[0.5]).all() and (table[0.5] <= table[0.95]).all()
+    summary = mc.summary(0.9)
+    assert list(summary.columns) == ["lower", "median", "upper"]
+    assert summary.loc["cagr", "lower"] == pytest.approx(table.loc["cagr", 0.05])
+    with pytest.raises(ValueError):
+        run_monte_carlo(backtest, method="jackknife")
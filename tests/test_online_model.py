@@ -0,0 +1,43 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.ml.online_model import OnlineModel
+
+COLUMNS = ["sma_10", "rsi", "atr", "roc"]
+
+
+def trained_model(seed=0, batches=5):
+    rng = np.random.default_rng(seed)
+    model = OnlineModel(feature_cols=COLUMNS)
+    for _ in range(batches):
+        X = pd.DataFrame(rng.normal([100, 50, 2, 0], [10, 15, 0.5, 1], (64, 4)), columns=COLUMNS)
+        model.partial_fit_on_barclose(X, (X["roc"] + rng.normal(0, 1, 64) > 0).astype(float).to_numpy())
+    return model, rng
+
+
+def test_fast_path_matches_predict_proba():
+    model, rng = trained_model()
+    X = rng.normal([100, 50, 2, 0], [10, 15, 0.5, 1], (32, 4))
+
+    expected = model.predict_proba(pd.DataFrame(X, columns=COLUMNS))[:, 1]
+    np.testing.assert_allclose(model.predict_up(X), expected, rtol=1e-12, atol=1e-15)
+
+    out = np.empty(32)
+    assert model.predict_up(X, out=out) is out
+    # weights are refolded after further training
+    model.partial_fit_on_barclose(X, np.ones(32))
+    expected = model.predict_proba(pd.DataFrame(X, columns=COLUMNS))[:, 1]
+    np.testing.assert_allclose(model.predict_up(X, out=out), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_untrained_model_scores_one_half():
+    model = OnlineModel(feature_cols=COLUMNS)
+    np.testing.assert_array_equal(model.predict_up(np.zeros((3, 4))), 0.5)
+
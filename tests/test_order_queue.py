@@ -0,0 +1,187 @@
+﻿import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.config import Settings
+from src.execute.order_queue import OrderQueue
+
+
+def ids():
+    counter = iter(range(1_000_000))
+    return lambda: f"bot-{next(counter):016d}"
+
+
+def test_slow_order_does_not_hold_up_other_symbols():
+    sending = threading.Event()
+    release = threading.Event()
+
+    def send(ticket):
+        if ticket.symbol == "BTC/USDT":
+            sending.set()
+            release.wait(5)
+        return {"status": "closed"}
+
+    fills = []
+    orders = OrderQueue(send, order_id=ids(), max_in_flight=2, on_fill=fills.append)
+    slow = orders.submit("BTC/USDT", "buy", 1.0, 100.0)
+    fast = orders.submit("ETH/USDT", "buy", 2.0, 10.0)
+    # both submits returned while the BTC order is held at the exchange
+    assert sending.wait(2)
+
+    assert fast.future.result(timeout=2)["symbol"] == "ETH/USDT"
+    assert not slow.future.done()
+    assert [t.client_order_id for t in orders.in_flight()] == [slow.client_order_id]
+    release.set()
+    assert orders.drain(timeout=2)
+    assert [fill["symbol"] for fill in fills] == ["ETH/USDT", "BTC/USDT"]
+    assert fills[1] == {**slow.payload(), "status": "closed"}
+    orders.close()
+
+
+def test_orders_of_one_symbol_go_out_in_queue_order():
+    sent = []
+
+    def send(ticket):
+        if ticket.side == "buy":
+            time.sleep(0.05)
+        sent.append(ticket.side)
+        return {}
+
+    orders = OrderQueue(send, order_id=ids(), max_in_flight=4)
+    orders.submit("BTC/USDT", "buy", 1.0, 100.0)
+    orders.submit("BTC/USDT", "sell", 1.0, 101.0)
+    orders.drain(timeout=2)
+    orders.close()
+    assert sent == ["buy", "sell"]
+
+
+def test_failed_orders_reach_the_error_callback():
+    errors = []
+
+    def send(ticket):
+        raise RuntimeError("rejected")
+
+    orders = OrderQueue(send, order_id=ids(), on_error=lambda ticket, exc: errors.append((ticket.symbol, str(exc))))
+    ticket = orders.submit("BTC/USDT", "buy", 1.0, 100.0)
+    with pytest.raises(RuntimeError):
+        ticket.future.result(timeout=2)
+    orders.close()
+    assert errors == [("BTC/USDT", "rejected")]
+
+
+def test_retries_reuse_the_client_order_id(monkeypatch):
+    ccxt = pytest.importorskip("ccxt")
+    tenacity = pytest.importorskip("tenacity")
+    from src.broker import binance_adapter
+
+    class FlakyExchange:
+        def __init__(self, failures, duplicate=False):
+            self.failures = failures
+            self.duplicate = duplicate
+            self.attempts = []
+
+        def load_markets(self, reload=False):
+            return {}
+
+        def amount_to_precision(self, symbol, amount):
+            return str(amount)
+
+        def price_to_precision(self, symbol, price):
+            return str(price)
+
+        def create_order(self, symbol, order_type, side, amount, price, params):
+            self.attempts.append(params["newClientOrderId"])
+            if len(self.attempts) <= self.failures:
+                raise ccxt.RequestTimeout("timed out")
+            if self.duplicate:
+                raise ccxt.InvalidOrder('binance {"code":-2010,"msg":"Duplicate order sent."}')
+            return {"id": "1", "clientOrderId": params["newClientOrderId"]}
+
+        def fetch_order(self, id, symbol, params):
+            return {"id": "1", "clientOrderId": params["origClientOrderId"], "status": "closed"}
+
+    monkeypatch.setattr(binance_adapter.BinanceAdapter._send_order.retry, "wait", tenacity.wait_none())
+    settings = Settings(binance_api_key="key", binance_testnet=False, state_path="")
+
+    flaky = FlakyExchange(failures=2)
+    order = binance_adapter.BinanceAdapter(settings=settings, exchange=flaky).create_order("BTC/USDT", "buy", 1.0, 100.0)
+    assert len(flaky.attempts) == 3 and len(set(flaky.attempts)) == 1
+    assert order["clientOrderId"] == flaky.attempts[0]
+
+    # the first attempt reached the exchange but timed out locally; the retry is rejected as a duplicate
+    landed = FlakyExchange(failures=1, duplicate=True)
+    adapter = binance_adapter.BinanceAdapter(settings=settings, exchange=landed)
+    order = adapter.create_order("BTC/USDT", "buy", 1.0, 100.0, client_order_id="bot-0000000000000042")
+    assert landed.attempts == ["bot-0000000000000042"] * 2
+    assert order == {"id": "1", "clientOrderId": "bot-0000000000000042", "status": "closed"}
+
+
+def test_bot_keeps_trading_while_live_orders_are_in_flight(tmp_path, monkeypatch):
+    pytest.importorskip("ccxt")
+    from src.backtest.replay import ReplayMarketData, SimulatedClock
+    from src.broker import binance_adapter
+    from src.execute.bot import PaperBot
+
+    sending = threading.Event()
+    release = threading.Event()
+
+    class SlowAdapter:
+        def __init__(self):
+            self.ids = []
+            self.sent = []
+
+        def create_order(self, symbol, side, amount, price=None, client_order_id=None):
+            if symbol == "BTC/USDT":
+                sending.set()
+                release.wait(5)
+            self.ids.append(client_order_id)
+            self.sent.append(symbol)
+            return {"symbol": symbol, "side": side, "filled": amount, "average": price * 1.001}
+
+    adapter = SlowAdapter()
+    monkeypatch.setattr(binance_adapter, "get_adapter", lambda settings=None: adapter)
+    settings = Settings(
+        binance_api_key="key",
+        binance_testnet=False,
+        model_path=str(tmp_path / "models"),
+        telegram_bot_token="",
+    )
+    bot = PaperBot(settings=settings, market_data=ReplayMarketData({}, SimulatedClock()), state_path=tmp_path / "state")
+    assert bot.executor.context.mode == "live"
+
+    bot._enter_position("BTC/USDT", 100.0, atr=2.0)
+    bot._enter_position("ETH/USDT", 10.0, atr=0.2)
+    # both entries returned while the BTC order is held at the exchange
+    assert sending.wait(2)
+    assert "BTC/USDT" not in adapter.sent
+    # both count as open positions for the risk checks while their orders are out
+    assert set(bot.positions) == {"BTC/USDT", "ETH/USDT"}
+
+    release.set()
+    assert bot.executor.drain(timeout=5)
+    bot._apply_order_events()
+    assert bot.positions["BTC/USDT"].entry_price == pytest.approx(100.1)
+    assert len(set(adapter.ids)) == 2 and all(i.startswith("bot-") for i in adapter.ids)
+    assert len((tmp_path / "state" / "trades.jsonl").read_text().splitlines()) == 2
+    bot.shutdown()
+
+
+def test_paper_order_failure_drops_the_pending_position(tmp_path):
+    from src.backtest.replay import ReplayMarketData, SimulatedClock
+    from src.execute.bot import PaperBot, PositionState
+
+    settings = Settings(model_path=str(tmp_path / "models"))
+    bot = PaperBot(settings=settings, market_data=ReplayMarketData({}, SimulatedClock()), state_path=tmp_path / "state")
+    bot.wallet.balance["USDT"] = 0.0
+    bot.positions["BTC/USDT"] = PositionState("BTC/USDT", 1.0, 100.0)
+
+    order = bot.executor.submit_order("BTC/USDT", "buy", 1.0, 100.0)
+    assert isinstance(order.exception(), ValueError)
+    bot._apply_order_events()
+    assert "BTC/USDT" not in bot.positions
+    bot.shutdown()
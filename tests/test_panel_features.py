@@ -0,0 +1,78 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.features import FEATURE_COLUMNS
+from src.data.panel_features import (
+    PricePanel,
+    compute_features_many,
+    compute_panel_features,
+    ewm_mean,
+    rolling_mean,
+    rolling_std,
+)
+from src.data.streaming_features import StreamingFeatureEngine
+from tests.conftest import random_walk
+
+
+def universe():
+    return {
+        "BTC/USDT": random_walk(600, seed=1, base=101, spread=0.01, spread_vol=0.6),
+        "ETH/USDT": random_walk(600, seed=2, base=102, spread=0.01, spread_vol=0.6),
+        # listed later: leading NaNs in the panel
+        "NEW/USDT": random_walk(350, seed=3, base=103, spread=0.01, spread_vol=0.6, start="2024-01-11 10:00"),
+    }
+
+
+def test_kernels_match_pandas():
+    rng = np.random.default_rng(0)
+    x = rng.normal(50, 5, (400, 3))
+    x[:30, 1] = np.nan
+    frame = pd.DataFrame(x)
+
+    assert np.allclose(rolling_mean(x, 20), frame.rolling(20, min_periods=20).mean(), equal_nan=True)
+    assert np.allclose(rolling_std(x, 20, ddof=0), frame.rolling(20, min_periods=20).std(ddof=0), equal_nan=True)
+    ewm = frame.ewm(alpha=1 / 14, min_periods=14).mean()
+    assert np.allclose(ewm_mean(x, 1 / 14, min_periods=14), ewm, rtol=1e-12, equal_nan=True)
+
+
+def test_panel_matches_streaming_per_symbol():
+    frames = universe()
+    result = compute_features_many(frames)
+
+    for symbol, df in frames.items():
+        expected = StreamingFeatureEngine().seed(df)
+        got = result[symbol]
+        assert got.index.equals(df.index)
+        assert (got.isna() == expected.isna()).all().all()
+        assert np.allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-8, atol=1e-10, equal_nan=True)
+
+
+def test_panel_matches_compute_features():
+    pytest.importorskip("pandas_ta")
+    from src.data.features import compute_features
+
+    frames = universe()
+    result = compute_features_many(frames)
+
+    for symbol, df in frames.items():
+        expected = compute_features(df)[FEATURE_COLUMNS]
+        assert (result[symbol].isna() == expected.isna()).all().all()
+        assert np.allclose(result[symbol].to_numpy(), expected.to_numpy(), rtol=1e-8, atol=1e-10, equal_nan=True)
+
+
+def test_panel_shapes_and_alignment():
+    panel = PricePanel.from_frames(universe())
+    assert panel.close.shape == (600, 3)
+    assert np.isnan(panel.close[:250, 2]).all()
+
+    features = compute_panel_features(panel.high, panel.low, panel.close)
+    assert set(features) == set(FEATURE_COLUMNS)
+    assert all(values.shape == (600, 3) for values in features.values())
+    with pytest.raises(ValueError):
+        compute_panel_features(panel.high, panel.low[:-1], panel.close)
@@ -0,0 +1,98 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.portfolio import PortfolioBacktestEngine
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.config import Settings
+from src.strategy.base import SignalResult
+
+
+def make_frame(close, start="2024-01-01"):
+    idx = pd.date_range(start, periods=len(close), freq="h")
+    close = pd.Series(close, index=idx, dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 1.0})
+
+
+def flags(df, bars):
+    series = pd.Series(0, index=df.index)
+    series.iloc[list(bars)] = 1
+    return series
+
+
+def permissive_settings(**overrides):
+    values = {"max_concurrent_positions": 10, "max_total_exposure": 10.0, "max_daily_loss": 1.0, "slippage_bps": 5}
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_single_symbol_matches_vectorized_engine():
+    rng = np.random.default_rng(5)
+    df = make_frame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 800))))
+    signals = SignalResult(
+        entries=pd.Series(rng.random(800) < 0.05, index=df.index).astype(int),
+        exits=pd.Series(rng.random(800) < 0.05, index=df.index).astype(int),
+    )
+    atr = np.full(800, 1.5)
+    settings = permissive_settings()
+
+    portfolio = PortfolioBacktestEngine(settings=settings).run({"BTC/USDT": df}, {"BTC/USDT": signals}, atr=atr[:, None])
+    single = VectorizedBacktestEngine.from_settings(settings).run(df, signals, symbol="BTC/USDT", atr=atr)
+
+    assert len(portfolio.trades) == len(single.trades) > 5
+    assert np.allclose(portfolio.equity_curve.to_numpy(), single.equity_curve.to_numpy(), rtol=1e-9)
+
+
+def test_position_limit_applies_in_symbol_order():
+    frames = {sym: make_frame(np.linspace(100, 110, 60)) for sym in ("A", "B", "C")}
+    signals = {sym: SignalResult(entries=flags(df, [20]), exits=flags(df, [])) for sym, df in frames.items()}
+
+    result = PortfolioBacktestEngine(settings=permissive_settings(max_concurrent_positions=2)).run(
+        frames, signals, atr=np.full((60, 3), 5.0)
+    )
+
+    assert result.stats["Trades"] == 0
+    # two positions are open at the end, the third entry was refused
+    assert result.equity_curve.iloc[-1] > 10_000.0
+    blocked = PortfolioBacktestEngine(settings=permissive_settings(max_concurrent_positions=0)).run(
+        frames, signals, atr=np.full((60, 3), 5.0)
+    )
+    assert blocked.equity_curve.eq(10_000.0).all()
+
+
+def test_exposure_limit_and_daily_loss_pause():
+    crash = np.r_[np.full(10, 100.0), np.full(50, 90.0)]
+    frames = {"A": make_frame(crash), "B": make_frame(np.full(60, 50.0))}
+    signals = {
+        "A": SignalResult(entries=flags(frames["A"], [5]), exits=flags(frames["A"], [])),
+        "B": SignalResult(entries=flags(frames["B"], [20]), exits=flags(frames["B"], [])),
+    }
+    settings = permissive_settings(max_total_exposure=0.9, max_daily_loss=0.03)
+
+    # risk 1% over a 2 x 0.5 ATR stop asks for 100% of equity in A: over the exposure cap
+    refused = PortfolioBacktestEngine(settings=settings).run(frames, signals, atr=np.full((60, 2), 0.5))
+    assert refused.equity_curve.iloc[:20].eq(10_000.0).all()
+
+    # 80% in A; the 10% drop loses 8% of the day and pauses B's small entry on bar 20
+    atr = np.tile([0.625, 5.0], (60, 1))
+    result = PortfolioBacktestEngine(settings=settings).run(frames, signals, atr=atr)
+    assert result.stats["Paused Bars"] > 0
+    assert result.equity_curve.iloc[10] < 0.93 * 10_000.0
+    assert result.equity_curve.iloc[-1] == pytest.approx(result.equity_curve.iloc[10])
+
+
+def test_symbols_with_different_histories_are_aligned():
+    frames = {"A": make_frame(np.full(48, 100.0)), "B": make_frame(np.full(24, 10.0), start="2024-01-02")}
+    signals = {sym: SignalResult(entries=flags(df, [1]), exits=flags(df, [len(df) - 1])) for sym, df in frames.items()}
+
+    result = PortfolioBacktestEngine(settings=permissive_settings()).run(frames, signals, atr=np.full((48, 2), 1.0))
+
+    assert len(result.equity_curve) == 48
+    assert set(result.trades["Symbol"]) == {"A", "B"}
+    b_trade = result.trades.set_index("Symbol").loc["B"]
+    assert b_trade["EntryTime"] == frames["B"].index[1]
@@ -1,12 +1,28 @@
 ﻿import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
-from src.strategy.position_sizing import position_size
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.strategy.position_sizing import position_fraction, position_size
+
 
 def test_position_size_basic():
-qty = position_size(equity=10_000, entry_price=20_000, atr=200, risk_per_trade=0.01, stop_atr_mult=2)
-expected = (10_000 * 0.01) / (200 * 2)
-assert qty == expected
-qty2 = position_size(equity=0, entry_price=20_000, atr=200, risk_per_trade=0.01, stop_atr_mult=2)
-assert qty2 == 0.0
+    qty = position_size(equity=10_000, entry_px=20_000, atr=200, risk_per_trade=0.01, stop_atr_mult=2)
+    expected = (10_000 * 0.01) / (200 * 2)
+    assert qty == expected
+    qty2 = position_size(equity=0, entry_px=20_000, atr=200, risk_per_trade=0.01, stop_atr_mult=2)
+    assert qty2 == 0.0
+
+
+def test_position_fraction_matches_position_size():
+    equity = 10_000.0
+    entry_px = np.array([20_000.0, 150.0, 3.5, 20_000.0, 0.0])
+    atr = np.array([200.0, 4.0, 0.1, 0.0, 1.0])
+    fraction = position_fraction(entry_px, atr, risk_per_trade=0.01, stop_atr_mult=2)
+    expected = [
+        position_size(equity, px, a, risk_per_trade=0.01, stop_atr_mult=2) * px / equity
+        for px, a in zip(entry_px, atr)
+    ]
+    assert fraction == pytest.approx(expected)
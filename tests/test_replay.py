@@ -0,0 +1,59 @@
+﻿import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.replay import ReplayMarketData, SimulatedClock, run_replay
+from src.config import Settings
+from src.data.columnar_store import ColumnarMarketDataService
+from tests.conftest import BASE_MS, HOUR_MS, candles
+
+
+def frame(count=10):
+    idx = pd.date_range("2024-01-01", periods=count, freq="h")
+    close = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0}, index=idx)
+
+
+def test_replay_feed_only_reveals_bars_up_to_the_clock():
+    clock = SimulatedClock()
+    feed = ReplayMarketData({("BTC/USDT", "1h"): frame()}, clock)
+
+    assert feed.fetch("BTC/USDT", "1h").empty
+    clock.advance_to("2024-01-01 04:00")
+    assert feed.fetch("BTC/USDT", "1h")["close"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert feed.fetch("BTC/USDT", "1h", limit=2).index[0] == pd.Timestamp("2024-01-01 03:00")
+    since = int(pd.Timestamp("2024-01-01 02:00").value // 1_000_000)
+    assert feed.fetch("BTC/USDT", "1h", since=since)["close"].tolist() == [103.0, 104.0]
+    assert clock() == datetime(2024, 1, 1, 4)
+    with pytest.raises(ValueError):
+        clock.advance_to("2024-01-01 03:00")
+
+
+def test_replay_drives_paper_bot_on_simulated_time(tmp_path):
+    service = ColumnarMarketDataService(root=str(tmp_path / "candles"))
+    for seed, symbol in enumerate(["BTC/USDT", "ETH/USDT"]):
+        service.store(symbol, "1h", candles(seed, drift=0.05))
+    settings = Settings(base_symbols=["BTC/USDT", "ETH/USDT"], timeframe="1h", telegram_chat_id="42")
+
+    result = run_replay(service, settings=settings, state_path=tmp_path / "state")
+
+    assert result.steps > 0
+    assert result.bars == 2 * result.steps
+    assert result.bars_per_sec > 0
+    last_bar = pd.Timestamp(BASE_MS + 399 * HOUR_MS, unit="ms")
+    assert result.equity_curve.index.max() <= last_bar
+    status = json.loads((tmp_path / "state" / "status.json").read_text())
+    assert pd.Timestamp(status["timestamp"]) == last_bar
+    assert status["metrics"]["equity"] == pytest.approx(result.equity_curve.iloc[-1])
+    assert (tmp_path / "state" / "metrics.json").exists()
+    assert len(result.trades) > 0
+    assert pd.to_datetime(result.trades["timestamp"]).max() <= last_bar
+    assert set(result.trades["mode"]) == {"paper"}
@@ -0,0 +1,64 @@
+﻿import os
+import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.result_cache import BacktestResultCache, result_key
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.data.streaming_features import StreamingFeatureEngine
+from src.strategy.mean_reversion import MeanReversionStrategy
+from tests.conftest import random_walk
+
+
+def test_key_changes_with_candles_params_and_engine():
+    df = random_walk(500, seed=2)
+    strategy, engine = MeanReversionStrategy(), VectorizedBacktestEngine()
+    key = result_key(df, strategy, engine)
+    assert key == result_key(df.copy(), MeanReversionStrategy(), VectorizedBacktestEngine())
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc("close")] += 1
+    assert result_key(changed, strategy, engine) != key
+    assert result_key(df, MeanReversionStrategy(rsi_entry=25.0), engine) != key
+    assert result_key(df, strategy, VectorizedBacktestEngine(commission=0.002)) != key
+
+
+def test_cached_run_roundtrips_result(tmp_path, monkeypatch):
+    df = random_walk(500, seed=2)
+    features = StreamingFeatureEngine().seed(df)
+    cache = BacktestResultCache(tmp_path)
+    strategy = MeanReversionStrategy(rsi_entry=45.0)
+    engine = VectorizedBacktestEngine()
+
+    first = cache.run(engine, strategy, df, "BTC/USDT", features=features)
+    assert len(first.trades) > 0
+    monkeypatch.setattr(strategy, "generate_signals", lambda *a, **k: pytest.fail("recomputed"))
+    second = cache.run(engine, strategy, df, "BTC/USDT", features=features)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_series_equal(first.equity_curve, second.equity_curve)
+    pd.testing.assert_frame_equal(first.trades, second.trades)
+    assert second.stats == pytest.approx(first.stats)
+
+
+def test_lru_eviction_keeps_recently_read_entries(tmp_path):
+    df = random_walk(500, seed=2)
+    engine = VectorizedBacktestEngine()
+    cache = BacktestResultCache(tmp_path)
+    keys = []
+    for i, rsi_entry in enumerate([20.0, 30.0, 40.0]):
+        strategy = MeanReversionStrategy(rsi_entry=rsi_entry)
+        cache.run(engine, strategy, df, "X", features=StreamingFeatureEngine().seed(df))
+        keys.append(result_key(df, strategy, engine))
+        path = tmp_path / f"{keys[-1]}.npz"
+        os.utime(path, (1_000 + i, 1_000 + i))
+    assert cache.get(keys[0]) is not None  # refreshes the oldest entry
+    entry_size = (tmp_path / f"{keys[1]}.npz").stat().st_size
+    cache.max_bytes = cache.size_bytes() - entry_size // 2
+    cache._evict()
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
@@ -1,20 +1,30 @@
 ﻿import sys
+from datetime import datetime
 from pathlib import Path
 
 import pytest
 pytest.importorskip("pandas")
 import pandas as pd
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from src.config import Settings
 from src.strategy.risk import RiskManager
 
+
 def test_daily_loss_triggers_pause():
-settings = Settings()
-settings.max_daily_loss = 0.03
-risk = RiskManager(settings=settings)
-idx = pd.date_range("2024-01-01", periods=2, freq="H")
-equity = pd.Series([1000.0, 960.0], index=idx)
-
-assert risk.should_pause_trading(equity) is True
-assert risk.check_daily_loss(equity) is False
+    settings = Settings()
+    settings.max_daily_loss = 0.03
+    risk = RiskManager(settings=settings, clock=lambda: datetime(2024, 1, 1, 1))
+    idx = pd.date_range("2024-01-01", periods=2, freq="h")
+    equity = pd.Series([1000.0, 960.0], index=idx)
+
+    assert risk.should_pause_trading(equity) is True
+    assert risk.check_daily_loss(equity) is False
+
+
+def test_previous_days_do_not_count_towards_daily_loss():
+    risk = RiskManager(settings=Settings(max_daily_loss=0.03), clock=lambda: datetime(2024, 1, 2, 1))
+    idx = pd.to_datetime(["2024-01-01 00:00", "2024-01-01 23:00", "2024-01-02 00:00", "2024-01-02 01:00"])
+    equity = pd.Series([1000.0, 900.0, 900.0, 895.0], index=idx)
+
+    assert risk.should_pause_trading(equity) is False
@@ -5,38 +5,69 @@ import pytest
 pytest.importorskip("pandas")
 import pandas as pd
 
-sys.path.insert(0, str(Path(file).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from src.strategy.momentum_rsi import MomentumRSIStrategy
 from src.strategy.mean_reversion import MeanReversionStrategy
 from src.strategy.breakout_atr import BreakoutATRStrategy
+from src.data.streaming_features import StreamingFeatureEngine
+from tests.conftest import random_walk
+
 
 def sample_df():
-idx = pd.date_range("2023-01-01", periods=100, freq="H")
-close = pd.Series(range(100), index=idx) + 100
-df = pd.DataFrame({
-"open": close - 1,
-"high": close + 1,
-"low": close - 2,
-"close": close,
-"volume": 100,
-})
-return df
+    idx = pd.date_range("2023-01-01", periods=100, freq="H")
+    close = pd.Series(range(100), index=idx) + 100
+    df = pd.DataFrame({
+        "open": close - 1,
+        "high": close + 1,
+        "low": close - 2,
+        "close": close,
+        "volume": 100,
+    })
+    return df
+
 
 def test_momentum_signals():
-df = sample_df()
-strategy = MomentumRSIStrategy()
-signals = strategy.generate_signals(df)
-assert len(signals.entries) == len(df)
-assert signals.entries.iloc[0] == 0
+    df = sample_df()
+    strategy = MomentumRSIStrategy()
+    signals = strategy.generate_signals(df)
+    assert len(signals.entries) == len(df)
+    assert signals.entries.iloc[0] == 0
+
 
 def test_mean_reversion_signals():
-df = sample_df()
-strategy = MeanReversionStrategy()
-signals = strategy.generate_signals(df)
-assert len(signals.entries) == len(df)
+    df = sample_df()
+    strategy = MeanReversionStrategy()
+    signals = strategy.generate_signals(df)
+    assert len(signals.entries) == len(df)
+
 
 def test_breakout_signals():
-df = sample_df()
-strategy = BreakoutATRStrategy()
-signals = strategy.generate_signals(df)
-assert len(signals.entries) == len(df)
+    df = sample_df()
+    strategy = BreakoutATRStrategy()
+    signals = strategy.generate_signals(df)
+    assert len(signals.entries) == len(df)
+
+
+def test_strategies_declare_features_and_warmup():
+    assert MeanReversionStrategy().warmup() == 20
+    assert BreakoutATRStrategy(lookback=30).warmup() == 31
+    assert MomentumRSIStrategy().warmup() == 200
+    features = MeanReversionStrategy().required_features
+    assert "sma_200" not in features and "rsi" in features
+
+
+def test_evaluate_latest_matches_generate_signals():
+    df = random_walk(320, seed=11, vol=1.5, spread=0.1, spread_vol=1.0)
+    features = StreamingFeatureEngine().seed(df)
+    strategies = [
+        MomentumRSIStrategy(rsi_entry=50.0, vol_threshold=0.05),
+        MeanReversionStrategy(rsi_entry=45.0),
+        BreakoutATRStrategy(atr_mult=0.2),
+    ]
+    for strategy in strategies:
+        signals = strategy.generate_signals(df, features=features)
+        assert signals.entries.sum() > 0 and signals.exits.sum() > 0
+        for end in range(1, len(df) + 1):
+            latest = strategy.evaluate_latest(df.iloc[:end], features=features.iloc[:end])
+            assert latest.entry == bool(signals.entries.iloc[end - 1]), (strategy.name(), end)
+            assert latest.exit == bool(signals.exits.iloc[end - 1]), (strategy.name(), end)
@@ -0,0 +1,69 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.streaming_features import FEATURE_COLUMNS, StreamingFeatureEngine, StreamingFeatureSet
+from tests.conftest import random_walk
+
+# BTC-like price level with wide high/low ranges
+WALK = dict(base=30_000, vol=50, spread=1, spread_vol=30)
+
+
+def test_streaming_matches_batch_features():
+    pytest.importorskip("pandas_ta")
+    from src.data.features import compute_features
+
+    df = random_walk(**WALK)
+    expected = compute_features(df)[FEATURE_COLUMNS]
+    streamed = StreamingFeatureEngine().seed(df)
+
+    assert (streamed.isna() == expected.isna()).all().all()
+    assert np.allclose(streamed.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_seeded_engine_continues_like_full_replay():
+    df = random_walk(400, **WALK)
+    full = StreamingFeatureEngine().seed(df).iloc[-1].to_numpy()
+
+    features = StreamingFeatureSet()
+    features.seed("BTC/USDT", df.iloc[:350])
+    for ts, row in df.iloc[340:].iterrows():
+        features.update("BTC/USDT", ts, row["high"], row["low"], row["close"])
+
+    latest = np.array([features.latest("BTC/USDT")[col] for col in FEATURE_COLUMNS])
+    assert np.allclose(latest, full, rtol=1e-12, equal_nan=True)
+    assert features.update_frame("BTC/USDT", df) is None
+
+
+def test_warmup_produces_nan_until_window_filled():
+    engine = StreamingFeatureEngine()
+    df = random_walk(30, **WALK)
+    out = engine.seed(df)
+    assert out["sma_10"].isna().sum() == 9
+    assert out["rsi"].isna().sum() == 14
+    assert out["roc"].isna().sum() == 12
+    assert out["sma_50"].isna().all()
+
+
+def test_frame_follows_a_sliding_window_and_reseeds_after_a_gap():
+    df = random_walk(400, **WALK)
+    features = StreamingFeatureSet(history=300)
+    for end in range(300, 320):
+        frame = features.frame("BTC/USDT", df.iloc[end - 300 : end])
+    assert features.reseeds == 1
+    assert frame.index.equals(df.index[19:319])
+    # bars seen since the first window carry on the state of the seed
+    replay = StreamingFeatureEngine()
+    replay.seed(df.iloc[:300])
+    continued = replay.seed(df.iloc[300:319])
+    assert np.allclose(frame.iloc[-19:].to_numpy(), continued.to_numpy(), rtol=1e-12, equal_nan=True)
+
+    # the feed skipped bars 320-349: the window no longer continues the seen ones
+    gapped = df.iloc[350:400]
+    frame = features.frame("BTC/USDT", gapped)
+    assert features.reseeds == 2
+    assert np.allclose(frame.to_numpy(), StreamingFeatureEngine().seed(gapped).to_numpy(), equal_nan=True)
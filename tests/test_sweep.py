@@ -0,0 +1,57 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.sweep import parameter_grid, run_sweep
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.data.streaming_features import StreamingFeatureEngine
+from src.strategy.breakout_atr import BreakoutATRStrategy
+from src.strategy.mean_reversion import MeanReversionStrategy
+from src.strategy.momentum_rsi import MomentumRSIStrategy
+from tests.conftest import random_walk
+
+GRIDS = [
+    (MomentumRSIStrategy, {"rsi_entry": [45.0, 55.0], "rsi_exit": [40.0, 50.0], "vol_threshold": [0.01, 0.05]}),
+    (MeanReversionStrategy, {"rsi_entry": [30.0, 45.0], "rsi_exit": [45.0, 60.0]}),
+    (BreakoutATRStrategy, {"lookback": [5, 20], "atr_mult": [0.0, 0.3, 1.5]}),
+]
+
+
+def test_parameter_grid_is_cartesian():
+    grid = parameter_grid(a=[1, 2], b=[0.1, 0.2, 0.3])
+    assert len(grid) == 6
+    assert list(grid.columns) == ["a", "b"]
+
+
+def test_signal_grid_matches_generate_signals():
+    df = random_walk(600, seed=4, vol=1.2, spread=0.1, spread_vol=0.8)
+    features = StreamingFeatureEngine().seed(df)
+    for strategy_cls, grid in GRIDS:
+        params = parameter_grid(**grid)
+        entries, exits = strategy_cls().signal_grid(df, features, {name: params[name].to_numpy() for name in params})
+        assert entries.shape == exits.shape == (len(df), len(params))
+        for j, row in params.iterrows():
+            kwargs = {name: (int(value) if name == "lookback" else value) for name, value in row.items()}
+            signals = strategy_cls(**kwargs).generate_signals(df, features=features)
+            assert (entries[:, j] == signals.entries.to_numpy().astype(bool)).all(), (strategy_cls.__name__, j)
+            assert (exits[:, j] == signals.exits.to_numpy().astype(bool)).all(), (strategy_cls.__name__, j)
+
+
+def test_sweep_scores_match_single_runs():
+    df = random_walk(600, seed=4, vol=1.2, spread=0.1, spread_vol=0.8)
+    features = StreamingFeatureEngine().seed(df)
+    engine = VectorizedBacktestEngine(commission=0.001)
+    grid = {"rsi_entry": [30.0, 40.0, 45.0], "rsi_exit": [50.0, 60.0]}
+
+    scores = run_sweep(MeanReversionStrategy(), df, grid, features=features, engine=engine, chunk_size=4)
+
+    assert len(scores) == 6
+    for _, row in scores.iterrows():
+        strategy = MeanReversionStrategy(rsi_entry=row["rsi_entry"], rsi_exit=row["rsi_exit"])
+        single = engine.run(df, strategy.generate_signals(df, features=features), symbol="X")
+        assert row["Equity Final"] == pytest.approx(single.stats["Equity Final"])
+        assert row["Sharpe"] == pytest.approx(single.stats["Sharpe"])
+        assert row["Trades"] == single.stats["Trades"]
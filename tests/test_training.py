@@ -0,0 +1,135 @@
+﻿import json
+import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("sqlalchemy")
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.columnar_store import ColumnarMarketDataService
+from src.data.features import make_feature_label
+from src.data.panel_features import compute_features_many
+from src.ml.model_store import ModelStore
+from src.ml.online_model import MODEL_FEATURES, MODEL_NAME
+from src.ml.training import (
+    ModelCandidate,
+    build_datasets,
+    evaluate_candidate,
+    load_dataset,
+    purged_time_folds,
+    run_training,
+)
+from tests.conftest import HOUR_MS, candles
+
+HOUR_NS = HOUR_MS * 1_000_000
+
+
+def service_with(tmp_path, symbols=("BTC/USDT", "ETH/USDT")):
+    service = ColumnarMarketDataService(root=str(tmp_path / "candles"))
+    for seed, symbol in enumerate(symbols):
+        service.store(symbol, "1h", candles(seed, count=600, drift=0.02))
+    return service
+
+
+def test_datasets_match_make_feature_label_and_are_memory_mapped(tmp_path):
+    service = service_with(tmp_path)
+    paths = build_datasets(service, ["BTC/USDT", "ETH/USDT"], "1h", tmp_path / "datasets")
+
+    df = service.fetch_range("BTC/USDT", "1h")
+    features = compute_features_many({"BTC/USDT": df})["BTC/USDT"][MODEL_FEATURES]
+    X, y = make_feature_label(df, features=features)
+    usable = X.notna().all(axis=1)
+    data = load_dataset(paths["BTC/USDT"])
+
+    assert isinstance(data["X"], np.memmap)
+    np.testing.assert_allclose(data["X"], X[usable].to_numpy())
+    np.testing.assert_array_equal(data["y"], y[usable].to_numpy())
+    assert data["ts"][-1] == df.index[-2].value  # the last bar has no label yet
+    assert (data["y"] == (data["ret"] > 0)).all()
+    meta = json.loads((paths["BTC/USDT"] / "meta.json").read_text())
+    assert meta["rows"] == len(data["y"]) and meta["feature_cols"] == MODEL_FEATURES
+
+
+def test_purged_folds_keep_training_labels_out_of_the_test_window():
+    ts = np.arange(100, dtype=np.int64) * HOUR_NS
+    folds = purged_time_folds(ts, n_splits=4, purge_ns=HOUR_NS)
+
+    assert len(folds) == 4
+    for fold, later in zip(folds, folds[1:]):
+        assert later.train_end > fold.train_end  # expanding window
+    for fold in folds:
+        # a training row's label bar opens one hour after it, strictly before the test window
+        assert fold.train_end + HOUR_NS <= fold.test_start
+        assert fold.test_end > fold.test_start
+
+
+def test_fold_tasks_are_the_same_in_a_worker_and_inline(tmp_path):
+    from src.ml import training
+
+    service = service_with(tmp_path)
+    paths = build_datasets(service, ["BTC/USDT", "ETH/USDT"], "1h", tmp_path / "datasets")
+    data = {symbol: load_dataset(path) for symbol, path in paths.items()}
+    fold = purged_time_folds(data["BTC/USDT"]["ts"], 3, HOUR_NS)[-1]
+    task = (ModelCandidate(), fold, (0.5, 0.6), MODEL_FEATURES, 0)
+
+    training._init_worker({symbol: str(path) for symbol, path in paths.items()})
+    try:
+        assert evaluate_candidate(task) == evaluate_candidate(task, data)
+    finally:
+        training._WORKER_DATA = None
+    rows = evaluate_candidate(task, data)
+    assert [row["threshold"] for row in rows] == [0.5, 0.6]
+    assert rows[0]["test_rows"] > 0 and rows[0]["selected"] >= rows[1]["selected"]
+
+
+def test_training_saves_tuned_winner_for_the_bot(tmp_path):
+    from src.backtest.replay import ReplayMarketData, SimulatedClock
+    from src.config import Settings
+    from src.execute.bot import PaperBot
+
+    service = service_with(tmp_path)
+    store = ModelStore(tmp_path / "models")
+    report = run_training(
+        service,
+        ["BTC/USDT", "ETH/USDT"],
+        "1h",
+        tmp_path / "datasets",
+        candidates=[ModelCandidate(alpha=0.0001), ModelCandidate(alpha=0.01)],
+        thresholds=(0.0, 0.5),
+        n_splits=3,
+        store=store,
+        min_selected=1,
+        max_workers=2,
+    )
+
+    assert set(report.scores["fold"]) == {0, 1, 2}
+    assert len(report.scores) == 2 * 3 * 2
+    assert report.build_rows_per_sec > 0 and report.train_rows_per_sec > 0
+    assert report.checkpoint is not None and report.checkpoint.exists()
+    saved = store.load(MODEL_NAME, feature_cols=MODEL_FEATURES)
+    assert saved.threshold_tuned and saved.probability_threshold == report.best["threshold"]
+
+    settings = Settings(model_path=str(tmp_path / "models"), ml_probability_threshold=0.9)
+    bot = PaperBot(settings=settings, market_data=ReplayMarketData({}, SimulatedClock()), state_path=tmp_path / "state")
+    assert bot.model.probability_threshold == report.best["threshold"]
+    bot.shutdown()
+
+
+def test_selection_ignores_thresholds_that_rarely_fire(tmp_path):
+    from src.ml.training import select_best
+
+    scores = pd.DataFrame(
+        [
+            {"alpha": 0.1, "epochs": 1, "batch_size": 256, "fold": 0, "threshold": 0.5, "selected": 40,
+             "edge": 0.001, "precision": 0.55, "log_loss": 0.69},
+            {"alpha": 0.1, "epochs": 1, "batch_size": 256, "fold": 0, "threshold": 0.9, "selected": 2,
+             "edge": 0.05, "precision": 1.0, "log_loss": 0.69},
+        ]
+    )
+    assert select_best(scores, min_selected=20)["threshold"] == 0.5
+    with pytest.raises(ValueError):
+        select_best(scores, min_selected=100)
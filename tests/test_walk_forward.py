@@ -0,0 +1,41 @@
+﻿import sys
+from pathlib import Path
+
+import pytest
+pytest.importorskip("pandas")
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.backtest.vectorized import VectorizedBacktestEngine
+from src.backtest.walk_forward import run_walk_forward, walk_forward_folds
+from src.data.streaming_features import StreamingFeatureEngine
+from src.strategy.mean_reversion import MeanReversionStrategy
+from tests.conftest import random_walk
+
+
+def test_folds_roll_forward_without_overlapping_tests():
+    folds = walk_forward_folds(1000, train_bars=400, test_bars=100)
+    assert len(folds) == 6
+    assert folds[0].train_end == folds[0].test_start == 400
+    assert all(a.test_end == b.test_start for a, b in zip(folds, folds[1:]))
+    assert walk_forward_folds(450, 400, 100) == []
+
+
+def test_walk_forward_parallel_matches_sequential_and_stitches():
+    df = random_walk(900, seed=8, spread=0.1, spread_vol=0.6)
+    features = StreamingFeatureEngine().seed(df)
+    grid = {"rsi_entry": [30.0, 40.0, 45.0], "rsi_exit": [50.0, 60.0]}
+    engine = VectorizedBacktestEngine(commission=0.001)
+    kwargs = dict(train_bars=300, test_bars=150, features=features, engine=engine)
+
+    sequential = run_walk_forward(MeanReversionStrategy(), df, grid, max_workers=1, **kwargs)
+    parallel = run_walk_forward(MeanReversionStrategy(), df, grid, max_workers=2, **kwargs)
+
+    assert len(sequential.folds) == 4
+    assert sequential.equity_curve.index[0] == df.index[300]
+    assert len(sequential.equity_curve) == 600
+    pd.testing.assert_series_equal(sequential.equity_curve, parallel.equity_curve)
+    assert sequential.folds[["rsi_entry", "rsi_exit"]].equals(parallel.folds[["rsi_entry", "rsi_exit"]])
+    # each fold continues from the previous fold's final equity
+    growth = (1 + sequential.folds["out_of_sample_return"]).prod()
+    assert sequential.stats["Equity Final"] == pytest.approx(engine.cash * growth)